@@ -15,7 +15,9 @@ from classes.strategies import (
     MACDStrategy, EMAStrategy, StochRSIStrategy, AwesomeOscillatorStrategy,
     SuperTrendStrategy, SqueezeMomentumStrategy, ADXStrategy
 )
-from classes.risk_manager import RiskManager
+from classes.risk_manager import RiskManager, BatchRiskManager
+from classes.trades import extract_trades, trade_stats, signal_markers
+from utils.metrics import start_exporter, track_st_cache, mark_cache_miss
 import config as cfg
 
 # ============================================
@@ -29,6 +31,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Endpoint de métricas (una vez por proceso)
+start_exporter()
+
 # CSS personalizado
 st.markdown("""
 <style>
@@ -103,27 +108,43 @@ def instanciar_estrategia(strat_name: str):
     return None
 
 
+@track_st_cache("historical_data")
 @st.cache_data(ttl=cfg.APP.cache_ttl_seconds, show_spinner=False)
+def get_historical_data(symbol: str) -> pd.DataFrame:
+    """Descarga el histórico del activo con cache"""
+    mark_cache_miss()
+    return AssetScout(symbol).data
+
+
 def get_best_strategy(symbol: str) -> tuple:
-    """Obtiene la mejor estrategia para un activo con cache"""
+    """
+    Obtiene la mejor estrategia para un activo con latencia acotada.
+    
+    Espera como máximo AppConfig.optimizacion_deadline_ms; si el grid no ha
+    terminado devuelve el mejor resultado parcial y sigue en segundo plano.
+    
+    Returns:
+        (winner, df, progreso) con progreso = dict de completitud o None
+    """
     try:
         # Validar que el ticker existe
         if symbol not in cfg.TICKERS:
-            return None, None
+            return None, None, None
         
-        scout = AssetScout(symbol)
+        df = get_historical_data(symbol)
         
         # Verificar que hay datos
-        if scout.data is None or scout.data.empty:
-            return None, None
+        if df is None or df.empty:
+            return None, None, None
         
-        winner = scout.optimize()
+        progress = AssetScout(symbol, data=df).optimize_anytime()
+        winner = progress["winner"]
         
         # Verificar que la optimización fue exitosa
         if winner is None:
-            return None, None
+            return None, None, progress
             
-        return winner, scout.data
+        return winner, df, progress
         
     except Exception as e:
         import traceback
@@ -131,7 +152,7 @@ def get_best_strategy(symbol: str) -> tuple:
         st.error(f"Detalle: {str(e)}")
         with st.expander("Ver detalles técnicos"):
             st.code(traceback.format_exc())
-        return None, None
+        return None, None, None
 
 
 def crear_grafico_avanzado(df: pd.DataFrame, strat_name: str, params: Dict) -> go.Figure:
@@ -161,9 +182,8 @@ def crear_grafico_avanzado(df: pd.DataFrame, strat_name: str, params: Dict) -> g
         row=1, col=1
     )
     
-    # 2. SEÑALES DE COMPRA/VENTA
-    buy_signals = df[df['Signal'].diff() == 1]
-    sell_signals = df[df['Signal'].diff() == -1]
+    # 2. SEÑALES DE COMPRA/VENTA (entradas y salidas de cada operación)
+    buy_signals, sell_signals = signal_markers(df)
     
     if not buy_signals.empty:
         fig.add_trace(
@@ -421,7 +441,15 @@ with st.sidebar:
 st.markdown('<h1 class="main-header">⚡ TradeXpert: Piloto Automático</h1>', unsafe_allow_html=True)
 
 with st.spinner(f"🤖 Analizando {ticker} con IA..."):
-    winner, df = get_best_strategy(ticker)
+    winner, df, progress = get_best_strategy(ticker)
+
+if progress and not progress["done"]:
+    st.info(
+        f"⏳ Resultado parcial: {progress['evaluated']}/{progress['total']} combinaciones "
+        f"evaluadas ({progress['completeness']:.0%}). La optimización sigue en segundo plano."
+    )
+    # Cualquier interacción relanza la página con el resultado más reciente
+    st.button("🔄 Actualizar resultado")
 
 if winner and df is not None and not df.empty:
     today = df.iloc[-1]
@@ -469,10 +497,13 @@ if winner and df is not None and not df.empty:
         col_p1, col_p2 = st.columns(2)
         with col_p1:
             st.markdown("### 📊 Métricas Clave")
+            stats = trade_stats(extract_trades(df.get('Signal', pd.Series(0, index=df.index)).values, df['Close'].values))
             metrics_data = {
-                "Métrica": ["Retorno Total", "Sharpe Ratio", "Max Drawdown", "Retorno Anualizado"],
+                "Métrica": ["Retorno Total", "Sharpe Ratio", "Max Drawdown", "Retorno Anualizado",
+                            "Operaciones", "Win Rate", "Duración Media"],
                 "Valor": [f"{winner['Retorno']*100:.2f}%", f"{winner['Sharpe']:.2f}", 
-                         f"{winner['Drawdown']*100:.2f}%", f"{(winner['Retorno']/2)*100:.2f}%"]
+                         f"{winner['Drawdown']*100:.2f}%", f"{(winner['Retorno']/2)*100:.2f}%",
+                         f"{stats['trades']}", f"{stats['win_rate']*100:.1f}%", f"{stats['avg_bars_held']:.1f} velas"]
             }
             st.dataframe(pd.DataFrame(metrics_data), use_container_width=True, hide_index=True)
         
@@ -496,12 +527,14 @@ if winner and df is not None and not df.empty:
     # TAB 3: TRADING SETUP
     with tab3:
         st.subheader("🎯 Setup de Trading Recomendado")
-        risk_mgr = RiskManager(df)
+        # Mismo motor de riesgo que el escaneo del radar (BatchRiskManager)
+        risk_mgr = BatchRiskManager.from_frames({ticker: df})
         signal_actual = df.iloc[-1].get('Signal', 0)
         direction = "LONG" if signal_actual == 1 else "SHORT"
-        setup = risk_mgr.get_trade_setup(entry_price=today['Close'], direction=direction, 
-                                         atr_multiplier=cfg.RISK.atr_multiplier, 
-                                         risk_reward_ratio=cfg.RISK.rr_ratio)
+        stops = winner.get('Stops') or {}
+        setups = risk_mgr.get_trade_setups(atr_multiplier=stops.get('atr_multiplier', cfg.RISK.atr_multiplier), 
+                                           risk_reward_ratio=stops.get('rr_ratio', cfg.RISK.rr_ratio))
+        setup = risk_mgr.get_setup_dict(setups, ticker, direction)
         
         if setup:
             col_s1, col_s2, col_s3 = st.columns(3)
@@ -516,7 +549,7 @@ if winner and df is not None and not df.empty:
             with col_s2:
                 st.markdown("### 💵 Gestión de Capital")
                 riesgo_decimal = riesgo_pct / 100
-                units = risk_mgr.calculate_position_size(capital, riesgo_decimal, setup)
+                units = RiskManager.position_size(capital, riesgo_decimal, setup)
                 inversion = units * setup['entry']
                 st.metric("📦 Unidades", f"{units:.4f}")
                 st.metric("💰 Inversión Total", f"${inversion:,.2f}")
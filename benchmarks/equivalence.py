@@ -0,0 +1,424 @@
+# benchmarks/equivalence.py - EQUIVALENCIA REFERENCIA vs OPTIMIZADO
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from classes import strategies as fast
+from classes import strategies_pro as pro
+from classes.strategies import (
+    calculate_rsi_numba, calculate_tr_numba, generate_position_signals,
+    generate_short_positions, backtest_kernel, metrics_from_returns
+)
+from classes.risk_manager import RiskManager, _atr_matrix_numba
+from classes.trades import extract_trades, simulate_trades
+from classes.scout import PARAM_GRID
+
+from synthetic import synthetic_ohlcv
+
+"""
+Arnés diferencial: cada kernel optimizado (Numba / vectorizado) se ejecuta
+junto a una implementación de referencia lenta y legible sobre:
+1. Series aleatorias (varias semillas)
+2. Casos límite: barras NaN, precios planos, gaps, series muy cortas
+
+Comprueba igualdad con tolerancia (NaN == NaN) y mide el speedup sobre una
+serie larga. Las referencias documentan la semántica actual de los kernels
+(p.ej. la semilla de period+1 deltas del RSI); cambiar esa semántica exige
+cambiar las dos implementaciones a la vez.
+
+Uso:
+    python benchmarks/equivalence.py
+    python benchmarks/equivalence.py --seeds 20 --bench-bars 200000
+"""
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+# ============================================
+# IMPLEMENTACIONES DE REFERENCIA
+# ============================================
+
+def rsi_reference(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI de Wilder en Python puro (semilla de period+1 deltas, rsi[period] = 0)"""
+    n = len(prices)
+    rsi = [0.0] * n
+    deltas = [prices[i + 1] - prices[i] for i in range(n - 1)]
+
+    def to_rsi(up, down):
+        rs = up / down if down != 0 else 0
+        return 100 - (100 / (1 + rs))
+
+    seed = deltas[:period + 1]
+    up = sum(d for d in seed if d >= 0) / period
+    down = -sum(d for d in seed if d < 0) / period
+    for i in range(min(period, n)):
+        rsi[i] = to_rsi(up, down)
+
+    for i in range(period, len(deltas)):
+        delta = deltas[i]
+        up = (up * (period - 1) + max(delta, 0.0)) / period
+        down = (down * (period - 1) + max(-delta, 0.0)) / period
+        rsi[i + 1] = to_rsi(up, down)
+    return np.array(rsi, dtype=np.float64)
+
+
+def tr_reference(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True Range con pandas (como strategies_pro); primera barra = High - Low"""
+    high, low, close = pd.Series(high), pd.Series(low), pd.Series(close)
+    tr = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    # Barras sin precio: NaN (pandas ignora NaN en max salvo si todo es NaN)
+    tr[high.isna() | low.isna()] = np.nan
+    return tr.values
+
+
+def position_reference(condition: np.ndarray) -> np.ndarray:
+    """Latch: 1 desde la primera barra con condición"""
+    return np.maximum.accumulate(condition.astype(np.float64)) if len(condition) else np.zeros(0)
+
+
+def short_reference(entry: np.ndarray, hold: np.ndarray) -> np.ndarray:
+    out, position = [], 0
+    for e, h in zip(entry, hold):
+        if position == 0 and e and h:
+            position = -1
+        elif position == -1 and not h:
+            position = 0
+        out.append(position)
+    return np.array(out, dtype=np.float64)
+
+
+def backtest_reference(close: np.ndarray, signal: np.ndarray) -> Tuple[float, float, float]:
+    """Cuerpo de BaseStrategy.backtest con pandas"""
+    close, signal = pd.Series(close), pd.Series(signal)
+    strategy_returns = close.pct_change(fill_method=None) * signal.shift(1)
+    equity = (1 + strategy_returns).cumprod()
+    dd = ((equity - equity.expanding().max()) / equity.expanding().max()).min()
+    std = strategy_returns.std()
+    sharpe = 0 if std == 0 or np.isnan(std) else strategy_returns.mean() / std * np.sqrt(252)
+    return float(equity.iloc[-1] - 1), float(sharpe), float(dd)
+
+
+def metrics_reference(matrix: np.ndarray) -> np.ndarray:
+    rows = []
+    for r in matrix:
+        s = pd.Series(r)
+        equity = (1 + s).cumprod()
+        valid = equity.dropna()
+        ret = equity.iloc[-1] - 1
+        dd = ((valid - valid.cummax()) / valid.cummax()).min() if len(valid) else np.nan
+        std = s.std()
+        sharpe = 0 if std == 0 or np.isnan(std) else s.mean() / std * np.sqrt(252)
+        rows.append((ret, sharpe, dd))
+    return np.array(rows, dtype=np.float64)
+
+
+def atr_matrix_reference(frames: List[pd.DataFrame], index: pd.Index, period: int) -> np.ndarray:
+    """RiskManager.calculate_atr sobre cada ticker por separado, alineado a `index`"""
+    return np.column_stack([
+        pd.Series(RiskManager(df).calculate_atr(period).values, index=df.index).reindex(index).values
+        for df in frames
+    ])
+
+
+def trades_reference(position: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """(entry_idx, exit_idx, direction) recorriendo la serie en Python"""
+    rows, side, entry = [], 0, 0
+    for i, p in enumerate(position):
+        current = 0 if np.isnan(p) or p == 0 else int(np.sign(p))
+        if side != 0 and current != side:
+            rows.append((entry, i, side))
+        if current != 0 and current != side:
+            entry = i
+        side = current
+    if side != 0:
+        rows.append((entry, len(position) - 1, side))
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+# ============================================
+# DATOS
+# ============================================
+
+def edge_cases(seed: int) -> Dict[str, pd.DataFrame]:
+    """Series límite de ~300 velas más series muy cortas"""
+    base = synthetic_ohlcv(300, seed)
+    cases = {}
+
+    nan_bars = base.copy()
+    nan_bars.iloc[[5, 50, 51, 52, 200]] = np.nan
+    cases["barras_nan"] = nan_bars
+
+    flat = base.copy()
+    flat[["Open", "High", "Low", "Close"]] = 100.0
+    cases["precio_plano"] = flat
+
+    gaps = base.copy()
+    factor = np.ones(len(gaps))
+    factor[[60, 150, 240]] = [1.3, 0.7, 1.5]
+    gaps[["Open", "High", "Low", "Close"]] = gaps[["Open", "High", "Low", "Close"]].mul(np.cumprod(factor), axis=0)
+    cases["gaps"] = gaps
+
+    for n in (1, 2, 3, 14, 15, 16, 25):
+        cases[f"corta_{n}"] = base.iloc[:n].copy()
+    return cases
+
+
+def datasets(n_seeds: int) -> Dict[str, pd.DataFrame]:
+    data = {f"aleatoria_{s}": synthetic_ohlcv(int(np.random.default_rng(s).integers(60, 2000)), s) for s in range(n_seeds)}
+    data.update(edge_cases(n_seeds))
+    return data
+
+
+# ============================================
+# PARES (REFERENCIA, OPTIMIZADO)
+# ============================================
+
+def _signal(df: pd.DataFrame, seed: int = 0) -> np.ndarray:
+    """Señal 0/1 aleatoria con la primera barra fuera de mercado"""
+    sig = (np.random.default_rng(seed).random(len(df)) > 0.5).astype(np.float64)
+    if len(sig):
+        sig[0] = 0
+    return sig
+
+
+def _strategy_pair(name: str, params: Dict, columns: List[str]) -> Dict:
+    ref_cls, opt_cls = getattr(pro, name), getattr(fast, name)
+    return {
+        "name": f"{name}{params}",
+        "min_bars": 2,
+        "ref": lambda df: ref_cls().generate_signals(df.copy(), params)[columns].values,
+        "opt": lambda df: opt_cls().generate_signals(df.copy(), params)[columns].values
+    }
+
+
+PAIRS: List[Dict] = [
+    {
+        "name": "calculate_rsi_numba",
+        "min_bars": 1,
+        "ref": lambda df: rsi_reference(df['Close'].values, 14),
+        "opt": lambda df: calculate_rsi_numba(df['Close'].values, 14)
+    },
+    {
+        "name": "calculate_tr_numba",
+        "min_bars": 1,
+        "ref": lambda df: tr_reference(df['High'].values, df['Low'].values, df['Close'].values),
+        "opt": lambda df: calculate_tr_numba(df['High'].values, df['Low'].values, df['Close'].values)
+    },
+    {
+        "name": "generate_position_signals",
+        "min_bars": 0,
+        "ref": lambda df: position_reference((df['Close'].pct_change(fill_method=None) < -0.03).values),
+        "opt": lambda df: generate_position_signals((df['Close'].pct_change(fill_method=None) < -0.03).values)
+    },
+    {
+        "name": "generate_short_positions",
+        "min_bars": 0,
+        "ref": lambda df: short_reference(*_short_inputs(df)),
+        "opt": lambda df: generate_short_positions(*_short_inputs(df))
+    },
+    {
+        "name": "backtest_kernel",
+        "min_bars": 2,
+        "ref": lambda df: backtest_reference(df['Close'].values, _signal(df)),
+        "opt": lambda df: backtest_kernel(
+            df['Close'].values, _signal(df), -np.inf, -np.inf, np.inf, 1.0, 0.1, 0.5
+        )[:3]
+    },
+    {
+        "name": "metrics_from_returns",
+        "min_bars": 2,
+        "ref": lambda df: metrics_reference(_returns_matrix(df)),
+        "opt": lambda df: np.column_stack([
+            metrics_from_returns(_returns_matrix(df))[k] for k in ("return", "sharpe", "drawdown")
+        ])
+    },
+    {
+        "name": "_atr_matrix_numba",
+        "min_bars": 28,
+        "ref": lambda df: atr_matrix_reference(_atr_frames(df), df.index, 14),
+        "opt": lambda df: _atr_matrix_numba(*_atr_inputs(df), 14)
+    },
+    {
+        "name": "extract_trades",
+        "min_bars": 1,
+        "ref": lambda df: trades_reference(_signed_signal(df), df['Close'].values),
+        "opt": lambda df: _trade_columns(extract_trades(_signed_signal(df), df['Close'].values))
+    },
+    {
+        "name": "simulate_trades (stops lejanos)",
+        "min_bars": 14,
+        "ref": lambda df: backtest_reference(df['Close'].values, _signal(df))[:2],
+        "opt": lambda df: _simulate_far_stops(df)
+    },
+    _strategy_pair("SuperTrendStrategy", {'period': 10, 'multiplier': 3.0}, ['SuperTrend', 'Trend_Dir', 'Signal']),
+    _strategy_pair("SqueezeMomentumStrategy", {'bb_len': 20, 'bb_mult': 2.0, 'kc_len': 20, 'kc_mult': 1.5}, ['Momentum', 'Signal']),
+    _strategy_pair("ADXStrategy", {'period': 14, 'adx_threshold': 25}, ['ADX', 'Signal']),
+]
+
+
+def _short_inputs(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    ret = df['Close'].pct_change(fill_method=None).values
+    return ret > 0.01, ret > -0.02
+
+
+def _returns_matrix(df: pd.DataFrame) -> np.ndarray:
+    ret = df['Close'].pct_change(fill_method=None).values
+    return np.vstack([ret * np.roll(_signal(df, s), 1) for s in range(4)])
+
+
+def _signed_signal(df: pd.DataFrame) -> np.ndarray:
+    return _signal(df) - _signal(df, 1)
+
+
+def _trade_columns(trades: np.ndarray) -> np.ndarray:
+    return np.column_stack([trades['entry_idx'], trades['exit_idx'], trades['direction']]).astype(np.float64).reshape(-1, 3)
+
+
+def _atr_frames(df: pd.DataFrame) -> List[pd.DataFrame]:
+    # Segundo ticker con huecos (días sin cotización) para probar la máscara
+    return [df, df.iloc[::2]]
+
+
+def _atr_inputs(df: pd.DataFrame):
+    """Panel fechas x tickers; las fechas sin cotización quedan fuera de la máscara"""
+    frames = _atr_frames(df)
+    panel = [
+        pd.concat([f[col].rename(i) for i, f in enumerate(frames)], axis=1).reindex(df.index).values
+        for col in ('High', 'Low', 'Close')
+    ]
+    present = np.column_stack([df.index.isin(f.index) for f in frames])
+    return (*panel, present)
+
+
+def _simulate_far_stops(df: pd.DataFrame) -> Tuple[float, float]:
+    r = simulate_trades(df, _signal(df), atr_multiplier=1e12, rr_ratio=1.0)
+    return r["return"], r["sharpe"]
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def _as_array(value) -> np.ndarray:
+    if isinstance(value, tuple):
+        value = list(value)
+    return np.asarray(value, dtype=np.float64)
+
+
+def compare(ref, opt) -> Tuple[bool, float]:
+    """(iguales con tolerancia, máxima diferencia absoluta)"""
+    a, b = _as_array(ref), _as_array(opt)
+    if a.shape != b.shape:
+        return False, np.inf
+    if a.size == 0:
+        return True, 0.0
+    same = np.isclose(a, b, rtol=RTOL, atol=ATOL, equal_nan=True)
+    # inf del mismo signo cuenta como igual
+    same |= np.isinf(a) & (a == b)
+    finite = np.isfinite(a) & np.isfinite(b)
+    max_diff = float(np.abs(a[finite] - b[finite]).max()) if finite.any() else 0.0
+    return bool(same.all()), max_diff
+
+
+def run_pair(pair: Dict, data: Dict[str, pd.DataFrame]) -> Dict:
+    failures, checked, max_diff = [], 0, 0.0
+    for case, df in data.items():
+        if len(df) < pair["min_bars"]:
+            continue
+        outcome = []
+        for side in ("ref", "opt"):
+            try:
+                outcome.append((pair[side](df), None))
+            except Exception as e:
+                outcome.append((None, type(e).__name__))
+        (ref, ref_err), (opt, opt_err) = outcome
+        checked += 1
+
+        if ref_err or opt_err:
+            # Ambas fallan igual = comportamiento consistente
+            if ref_err != opt_err:
+                failures.append(f"{case}: ref={ref_err or 'ok'} opt={opt_err or 'ok'}")
+            continue
+        ok, diff = compare(ref, opt)
+        max_diff = max(max_diff, diff)
+        if not ok:
+            failures.append(f"{case}: diferencia máx {diff:.3g}")
+    return {"checked": checked, "failures": failures, "max_diff": max_diff}
+
+
+def speedup(pair: Dict, df: pd.DataFrame, repeat: int = 3) -> Tuple[float, float]:
+    """Mejor tiempo (s) de referencia y optimizado (tras una llamada de warm-up)"""
+    times = []
+    for side in ("ref", "opt"):
+        pair[side](df)
+        best = np.inf
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            pair[side](df)
+            best = min(best, time.perf_counter() - t0)
+        times.append(best)
+    return times[0], times[1]
+
+
+def degenerate_strategies(data: Dict[str, pd.DataFrame]) -> List[str]:
+    """Estrategias cuya señal es constante en todas las series aleatorias"""
+    random_frames = [df for name, df in data.items() if name.startswith("aleatoria")]
+    warnings = []
+    for name, strat_cls in fast.STRATEGY_REGISTRY.items():
+        params = PARAM_GRID.get(name, [{}])[0]
+        try:
+            signals = [strat_cls().generate_signals(df.copy(), params)['Signal'].values for df in random_frames]
+        except Exception as e:
+            warnings.append(f"{name}: {type(e).__name__}: {e}")
+            continue
+        if all(len(np.unique(s)) <= 1 for s in signals):
+            warnings.append(f"{name}: señal constante en todas las series aleatorias")
+    return warnings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Equivalencia referencia vs kernels optimizados")
+    parser.add_argument("--seeds", type=int, default=8, help="Series aleatorias")
+    parser.add_argument("--bench-bars", type=int, default=100_000, help="Longitud para medir el speedup")
+    args = parser.parse_args(argv)
+
+    data = datasets(args.seeds)
+    bench_df = synthetic_ohlcv(args.bench_bars, seed=12345)
+
+    print(f"🔬 {len(PAIRS)} kernels x {len(data)} series (rtol={RTOL}, atol={ATOL})\n")
+    print(f"{'Kernel':<62} {'Casos':>5} {'Dif. máx':>10} {'Ref (ms)':>10} {'Opt (ms)':>10} {'Speedup':>8}")
+
+    n_failed = 0
+    for pair in PAIRS:
+        result = run_pair(pair, data)
+        try:
+            t_ref, t_opt = speedup(pair, bench_df)
+            timing = f"{t_ref*1000:10.2f} {t_opt*1000:10.2f} {t_ref/t_opt:7.1f}x"
+        except Exception as e:
+            timing = f"{'—':>10} {'—':>10} {'—':>8}  ({type(e).__name__})"
+
+        status = "✅" if not result["failures"] else "❌"
+        print(f"{status} {pair['name']:<60} {result['checked']:>5} {result['max_diff']:>10.2g} {timing}")
+        for failure in result["failures"]:
+            print(f"      ↳ {failure}")
+        n_failed += bool(result["failures"])
+
+    warnings = degenerate_strategies(data)
+    if warnings:
+        print("\n⚠️ Avisos:")
+        for w in warnings:
+            print(f"   {w}")
+
+    print(f"\n{'✅ Todo equivalente' if not n_failed else f'❌ {n_failed} kernels con diferencias'}")
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
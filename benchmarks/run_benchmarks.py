@@ -0,0 +1,257 @@
+# benchmarks/run_benchmarks.py - SUITE DE BENCHMARKS (SIN CONEXIÓN)
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import numba
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from classes.scout import AssetScout, PARAM_GRID
+from classes.risk_manager import RiskManager
+from classes.scanner import _procesar_ticker
+import config as cfg
+
+from synthetic import synthetic_ohlcv, synthetic_universe
+
+"""
+Mide sobre OHLCV sintético (500 a 1M velas):
+1. generate_signals de cada estrategia y BaseStrategy.backtest
+2. AssetScout._run_grid_search (backtests/s)
+3. RiskManager (ATR + setup + tamaño de posición)
+4. Escaneo completo de un universo sintético (mismos pasos que el radar)
+
+Cada caso reporta mediana/mínimo, throughput y pico de memoria
+(tracemalloc, en una pasada aparte). El warm-up JIT (primera llamada en el
+proceso, con compilación Numba) se mide por separado sobre una serie corta.
+
+Los tiempos dependen de la máquina, así que la baseline no se versiona:
+se genera una vez en la máquina de medida (--save-baseline, desde el
+commit de referencia) y las ejecuciones posteriores se comparan con ella.
+
+Uso:
+    python benchmarks/run_benchmarks.py --bars 500,5000,100000
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json
+"""
+
+RESULTS_DIR = Path(__file__).parent / "results"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+WARMUP_BARS = 500
+
+# Primera combinación de PARAM_GRID de cada estrategia
+STRATEGY_PARAMS = {name: grid[0] for name, grid in PARAM_GRID.items()}
+
+
+# ============================================
+# MEDICIÓN
+# ============================================
+
+def measure(fn: Callable, repeat: int, memory: bool = True) -> Dict[str, float]:
+    """Mediana y mínimo de `repeat` ejecuciones + pico de memoria (MB)"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    return {"seconds": float(np.median(times)), "min_seconds": float(min(times)), "peak_mb": peak_mb}
+
+
+def first_call(fn: Callable) -> Dict[str, float]:
+    """Primera llamada (incluye compilación JIT) frente a la siguiente"""
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fn()
+    warm = time.perf_counter() - t0
+    return {"first_call_s": first, "warm_call_s": warm, "warmup_s": max(first - warm, 0.0)}
+
+
+# ============================================
+# CASOS
+# ============================================
+
+def _scan_ticker(ticker: str, df: pd.DataFrame) -> Optional[Dict]:
+    """procesar_ticker del radar (classes.scanner) sin descargas"""
+    return _procesar_ticker(ticker, cfg.CAPITAL_TOTAL, cfg.RIESGO_POR_OPERACION, False, data=df)
+
+
+def _risk_case(df: pd.DataFrame):
+    risk_mgr = RiskManager(df)
+    setup = risk_mgr.get_trade_setup(entry_price=df['Close'].iloc[-1])
+    if setup:
+        risk_mgr.calculate_position_size(cfg.RISK.capital_total, cfg.RISK.riesgo_por_operacion, setup)
+
+
+def build_cases(n_bars: int, n_tickers: int, max_grid_bars: int) -> List[Dict]:
+    """Lista de casos: nombre, función, unidad y trabajo por ejecución"""
+    df = synthetic_ohlcv(n_bars)
+    scout = AssetScout("SYN", data=df)
+    cases = []
+
+    for strat in scout.strategies:
+        params = STRATEGY_PARAMS.get(strat.name)
+        cases.append({
+            "name": f"generate_signals/{strat.name}/{n_bars}",
+            "fn": lambda s=strat, p=params: s.generate_signals(df, p),
+            "unit": "bars/s", "work": n_bars
+        })
+        cases.append({
+            "name": f"backtest/{strat.name}/{n_bars}",
+            "fn": lambda s=strat, p=params: s.backtest(df, p),
+            "unit": "bars/s", "work": n_bars
+        })
+
+    cases.append({
+        "name": f"risk_manager/{n_bars}",
+        "fn": lambda: _risk_case(df),
+        "unit": "bars/s", "work": n_bars
+    })
+
+    if n_bars <= max_grid_bars:
+        n_candidates = len(scout.grid_candidates())
+        cases.append({
+            "name": f"grid_search/{n_bars}",
+            "fn": lambda: AssetScout("SYN", data=df)._run_grid_search(),
+            "unit": "backtests/s", "work": n_candidates
+        })
+
+        universe = synthetic_universe(n_tickers, n_bars)
+        cases.append({
+            "name": f"scan/{n_tickers}x{n_bars}",
+            "fn": lambda: [_scan_ticker(t, d) for t, d in universe.items()],
+            "unit": "tickers/s", "work": n_tickers
+        })
+    return cases
+
+
+# ============================================
+# EJECUCIÓN Y COMPARACIÓN
+# ============================================
+
+def run(bars: List[int], repeat: int, n_tickers: int, max_grid_bars: int, memory: bool) -> Dict:
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "numba": numba.__version__,
+            "bars": bars,
+            "repeat": repeat,
+            "tickers": n_tickers
+        },
+        "jit": {},
+        "cases": {},
+        "errors": {}
+    }
+
+    # 1. Warm-up JIT: primera llamada de cada caso sobre una serie corta
+    print(f"🔥 Warm-up JIT ({WARMUP_BARS} velas)")
+    for case in build_cases(WARMUP_BARS, 1, WARMUP_BARS):
+        try:
+            stats = first_call(case["fn"])
+        except Exception as e:
+            results["errors"][case["name"]] = repr(e)
+            continue
+        results["jit"][case["name"]] = stats
+        if stats["warmup_s"] > 0.05:
+            print(f"   {case['name']:<55} {stats['warmup_s']:.2f}s")
+    results["meta"]["jit_total_s"] = sum(s["warmup_s"] for s in results["jit"].values())
+
+    # 2. Casos en caliente
+    for n_bars in bars:
+        print(f"\n⏱️ {n_bars:,} velas")
+        for case in build_cases(n_bars, n_tickers, max_grid_bars):
+            try:
+                stats = measure(case["fn"], repeat, memory)
+            except Exception as e:
+                # Un caso roto no invalida el resto de la suite
+                results["errors"][case["name"]] = repr(e)
+                print(f"   {case['name']:<55} ❌ {e}")
+                continue
+            stats["unit"] = case["unit"]
+            stats["throughput"] = case["work"] / stats["seconds"] if stats["seconds"] > 0 else float("inf")
+            results["cases"][case["name"]] = stats
+
+            mem = f"{stats['peak_mb']:8.1f} MB" if stats["peak_mb"] is not None else ""
+            print(f"   {case['name']:<55} {stats['seconds']*1000:10.2f} ms "
+                  f"{stats['throughput']:14,.0f} {case['unit']:<12} {mem}")
+    return results
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Casos comunes más lentos que baseline * (1 + tolerance)"""
+    regressions = []
+    for name, stats in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or base["seconds"] <= 0:
+            continue
+        ratio = stats["seconds"] / base["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append({"case": name, "baseline_s": base["seconds"], "current_s": stats["seconds"], "ratio": ratio})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de estrategias, backtest y escaneo")
+    parser.add_argument("--bars", default="500,5000,50000", help="Longitudes separadas por comas (hasta 1000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por caso")
+    parser.add_argument("--tickers", type=int, default=10, help="Tickers del escaneo sintético")
+    parser.add_argument("--max-grid-bars", type=int, default=200_000, help="Longitud máxima para grid search y escaneo")
+    parser.add_argument("--no-memory", action="store_true", help="No medir pico de memoria")
+    parser.add_argument("--output", type=Path, help="JSON de salida (por defecto results/<fecha>.json)")
+    parser.add_argument("--baseline", type=Path, help="JSON de referencia para detectar regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="Regresión si es más lento que baseline*(1+tolerance)")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar también como baseline.json")
+    args = parser.parse_args(argv)
+    if args.baseline and not args.baseline.exists():
+        print(f"❌ No existe la baseline '{args.baseline}': genérala con --save-baseline")
+        return 2
+
+    bars = [int(b) for b in args.bars.split(",") if b.strip()]
+    results = run(bars, args.repeat, args.tickers, args.max_grid_bars, not args.no_memory)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\n✅ Resultados guardados en '{output}'")
+    if results["errors"]:
+        print(f"⚠️ {len(results['errors'])} casos fallaron (ver 'errors' en el JSON)")
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, indent=2))
+        print(f"📌 Baseline actualizada: '{BASELINE_FILE}'")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        results["regressions"] = regressions
+        output.write_text(json.dumps(results, indent=2))
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresiones (> {args.tolerance:.0%} más lento):")
+            for r in regressions:
+                print(f"   {r['case']:<55} {r['baseline_s']*1000:.2f} → {r['current_s']*1000:.2f} ms (x{r['ratio']:.2f})")
+            return 1
+        print(f"\n✅ Sin regresiones frente a '{args.baseline}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
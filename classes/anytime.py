@@ -0,0 +1,111 @@
+# classes/anytime.py - OPTIMIZACIÓN ANYTIME (LATENCIA ACOTADA)
+import time
+import threading
+from typing import Dict, Optional
+import config as cfg
+
+"""
+Optimización con resultado parcial para páginas interactivas:
+1. El grid se evalúa en un hilo de fondo (orden round-robin por estrategia)
+2. La página espera como máximo el deadline y muestra el mejor resultado
+   hasta ese momento con su grado de completitud
+3. El hilo sigue refinando; el registro del módulo conserva el trabajo
+   entre reruns de Streamlit, de modo que cada recarga ve un resultado
+   más completo hasta llegar al óptimo del grid
+4. Los resultados completos se reutilizan hasta cache_ttl_seconds o hasta
+   que llegan barras nuevas (la clave incluye el rango de fechas)
+"""
+
+
+class AnytimeOptimization:
+    """Grid search en segundo plano con mejor resultado consultable"""
+
+    def __init__(self, scout):
+        # Copia propia del histórico: la página sigue usando (y mutando con
+        # generate_signals) el DataFrame del llamador mientras el hilo evalúa
+        self.scout = type(scout)(scout.ticker, data=scout.data.copy(), period=scout.period)
+        self.candidates = self.scout.grid_candidates(interleave=True)
+        self.total = len(self.candidates)
+        self.evaluated = 0
+        self.best: Optional[Dict] = None
+        self.best_score = -999
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "AnytimeOptimization":
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for strat_obj, params in self.candidates:
+                evaluated = self.scout._evaluate_candidate(strat_obj, params, self.best_score)
+                with self._lock:
+                    self.evaluated += 1
+                    if evaluated is not None and evaluated[0] > self.best_score:
+                        self.best_score, self.best = evaluated
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Bloquea hasta terminar o agotar el timeout. Devuelve done"""
+        return self._done.wait(timeout)
+
+    def expired(self) -> bool:
+        return self.done and time.time() - self.finished_at > cfg.APP.cache_ttl_seconds
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "winner": dict(self.best) if self.best else None,
+                "completeness": self.evaluated / self.total if self.total else 1.0,
+                "evaluated": self.evaluated,
+                "total": self.total,
+                "done": self.done
+            }
+
+
+# Registro de optimizaciones: (ticker, primera fecha, última fecha) -> AnytimeOptimization
+_JOBS: Dict[tuple, AnytimeOptimization] = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def optimize_anytime(scout, deadline: Optional[float] = None, restart: bool = False) -> Dict:
+    """
+    Mejor resultado disponible para el ticker del scout dentro del deadline.
+
+    Si ya hay una optimización en curso (o terminada y vigente) para el
+    mismo histórico se reutiliza; si no, se lanza una nueva en segundo plano.
+
+    Args:
+        scout: AssetScout con datos descargados
+        deadline: segundos máximos de espera (AppConfig.optimizacion_deadline_ms)
+        restart: descartar el resultado anterior y volver a optimizar
+    """
+    if deadline is None:
+        deadline = cfg.APP.optimizacion_deadline_ms / 1000
+    key = (scout.ticker, scout.data.index[0], scout.data.index[-1])
+
+    with _JOBS_LOCK:
+        job = _JOBS.get(key)
+        if job is None or job.expired() or (restart and job.done):
+            # Históricos anteriores del mismo ticker ya no sirven
+            for old_key in [k for k in _JOBS if k[0] == scout.ticker]:
+                del _JOBS[old_key]
+            job = AnytimeOptimization(scout).start()
+            _JOBS[key] = job
+
+    if job.wait(max(deadline, 0.0)):
+        # El torneo del scout parte de las señales que ya calculó el job
+        scout.adopt_signals(job.scout)
+    return job.snapshot()
+
@@ -0,0 +1,92 @@
+# classes/data_cache.py - CACHE DE OHLCV EN DISCO (PROCESOS SIN STREAMLIT)
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import config as cfg
+from utils.metrics import track_fetch, cache_hit, cache_miss, MonitoredThreadPool
+from utils.telemetry import span
+
+"""
+Equivalente en disco de @st.cache_data para CLI, cron y workers:
+1. Un pickle por (ticker, periodo) en CACHE_DIR/ohlcv, válido durante
+   APP.cache_ttl_seconds (edad del fichero)
+2. Escritura atómica (tmp + rename): procesos concurrentes nunca leen
+   un fichero a medias
+3. load_many descarga en paralelo con el pool monitorizado y separa errores
+"""
+
+OHLCV_CACHE_DIR = cfg.PATHS.CACHE_DIR / "ohlcv"
+
+
+def _cache_path(ticker: str, period: str):
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", ticker.upper())
+    return OHLCV_CACHE_DIR / f"{safe}_{period}.pkl"
+
+
+def load_ohlcv(
+    ticker: str,
+    period: str = "2y",
+    ttl: Optional[float] = None,
+    refresh: bool = False
+) -> pd.DataFrame:
+    """
+    Histórico OHLCV del ticker desde la cache de disco o yfinance.
+    Las excepciones de descarga se propagan; un histórico vacío no se cachea.
+    """
+    import yfinance as yf
+
+    ttl = cfg.APP.cache_ttl_seconds if ttl is None else ttl
+    path = _cache_path(ticker, period)
+    if not refresh and path.exists() and time.time() - path.stat().st_mtime < ttl:
+        try:
+            df = pd.read_pickle(path)
+            cache_hit("ohlcv_disk")
+            return df
+        except Exception:
+            pass   # Fichero corrupto: se vuelve a descargar
+    cache_miss("ohlcv_disk")
+
+    with span("download", ticker), track_fetch("yfinance"):
+        df = yf.Ticker(ticker).history(period=period)
+
+    if not df.empty:
+        OHLCV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_pickle(tmp)
+        os.replace(tmp, path)
+    return df
+
+
+def load_many(
+    tickers: List[str],
+    period: str = "2y",
+    max_workers: Optional[int] = None,
+    refresh: bool = False
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+    """
+    Descarga (o lee de cache) varios tickers en paralelo.
+
+    Returns:
+        (frames con datos suficientes, errores por ticker)
+    """
+    def fetch(ticker):
+        try:
+            df = load_ohlcv(ticker, period, refresh=refresh)
+        except Exception as e:
+            return ticker, None, str(e)
+        if len(df) < cfg.APP.min_datos_historicos:
+            return ticker, None, f"Datos insuficientes ({len(df)} velas)"
+        return ticker, df, None
+
+    frames, errors = {}, {}
+    with MonitoredThreadPool("data_fetch", max_workers=max_workers or cfg.APP.max_workers_paralelo) as executor:
+        for ticker, df, error in executor.map(fetch, tickers):
+            if error:
+                errors[ticker] = error
+            else:
+                frames[ticker] = df
+    return frames, errors
@@ -0,0 +1,219 @@
+# classes/panel.py - PANEL ALINEADO (FECHAS x TICKERS)
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+import config as cfg
+
+"""
+Contenedor OHLCV de todo el universo sobre un calendario unión:
+1. Una matriz 2-D float64 por campo (fechas x tickers), en orden Fortran para
+   que la serie de cada ticker sea un bloque contiguo (vistas sin copia)
+2. Máscara explícita de días con cotización (cripto 7 días, acciones 5)
+3. Exportación directa a los kernels Numba y al BatchRiskManager
+"""
+
+
+def normalize_index(index: pd.Index) -> pd.DatetimeIndex:
+    """Convierte un índice de yfinance a fechas naive normalizadas (sin hora ni zona)"""
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize()
+
+
+class AssetPanel:
+    """
+    Panel OHLCV alineado para cálculo vectorizado sobre el universo.
+
+    Los días sin cotización de un ticker quedan como NaN en todas sus
+    matrices y con mask=False.
+    """
+
+    FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+    def __init__(
+        self,
+        dates: pd.DatetimeIndex,
+        tickers: List[str],
+        data: Dict[str, np.ndarray],
+        mask: Optional[np.ndarray] = None
+    ):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self._ticker_idx = {t: j for j, t in enumerate(self.tickers)}
+
+        shape = (len(self.dates), len(self.tickers))
+        self._data = {}
+        for field in self.FIELDS:
+            arr = data.get(field)
+            if arr is None:
+                arr = np.full(shape, np.nan)
+            arr = np.asarray(arr, dtype=np.float64)
+            if arr.ndim == 2 and arr.strides[0] != arr.itemsize:
+                # Cada columna (ticker) debe ser un bloque contiguo
+                arr = np.asfortranarray(arr)
+            if arr.shape != shape:
+                raise ValueError(f"{field}: forma {arr.shape}, se esperaba {shape}")
+            self._data[field] = arr
+
+        if mask is None:
+            mask = ~np.isnan(self._data['Close'])
+        self.mask = np.asarray(mask, dtype=np.bool_)
+
+    # ----------------------------------------
+    # Construcción
+    # ----------------------------------------
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "AssetPanel":
+        """Alinea DataFrames por ticker (formato yfinance) en el calendario unión"""
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            raise ValueError("Se requiere al menos un ticker con datos")
+
+        normalized = {}
+        for ticker, df in frames.items():
+            missing = [col for col in ['High', 'Low', 'Close'] if col not in df.columns]
+            if missing:
+                raise ValueError(f"{ticker}: faltan columnas: {missing}")
+            df = df.copy()
+            df.index = normalize_index(df.index)
+            normalized[ticker] = df[~df.index.duplicated(keep='last')]
+
+        dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in normalized.values()))))
+        tickers = list(normalized.keys())
+
+        data = {field: np.full((len(dates), len(tickers)), np.nan, order='F') for field in cls.FIELDS}
+        mask = np.zeros((len(dates), len(tickers)), dtype=np.bool_, order='F')
+
+        for j, ticker in enumerate(tickers):
+            df = normalized[ticker]
+            rows = dates.get_indexer(df.index)
+            mask[rows, j] = True
+            for field in cls.FIELDS:
+                if field in df.columns:
+                    data[field][rows, j] = df[field].values
+
+        return cls(dates, tickers, data, mask)
+
+    @classmethod
+    def download(
+        cls,
+        tickers: List[str],
+        period: str = "2y",
+        max_workers: Optional[int] = None
+    ) -> "AssetPanel":
+        """Descarga el histórico de varios tickers en paralelo y los alinea"""
+        import yfinance as yf
+        from utils.metrics import track_fetch, MonitoredThreadPool
+
+        def fetch(ticker):
+            try:
+                with track_fetch("yfinance"):
+                    return ticker, yf.Ticker(ticker).history(period=period)
+            except Exception:
+                return ticker, None
+
+        workers = max_workers or cfg.APP.max_workers_paralelo
+        with MonitoredThreadPool("panel_download", max_workers=workers) as executor:
+            frames = dict(executor.map(fetch, tickers))
+
+        # Mantener el orden pedido
+        return cls.from_frames({t: frames[t] for t in tickers if frames.get(t) is not None})
+
+    # ----------------------------------------
+    # Acceso (sin copia)
+    # ----------------------------------------
+
+    @property
+    def shape(self):
+        return (len(self.dates), len(self.tickers))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._ticker_idx
+
+    def index_of(self, ticker: str) -> int:
+        if ticker not in self._ticker_idx:
+            raise KeyError(f"Ticker no está en el panel: {ticker}")
+        return self._ticker_idx[ticker]
+
+    def field(self, name: str) -> np.ndarray:
+        """Matriz completa de un campo (fechas x tickers), sin copia"""
+        if name not in self._data:
+            raise KeyError(f"Campo inválido: {name}")
+        return self._data[name]
+
+    def column(self, name: str, ticker: str) -> np.ndarray:
+        """Serie 1-D contigua de un ticker en el calendario unión (vista, sin copia)"""
+        return self._data[name][:, self.index_of(ticker)]
+
+    def trading_days(self, ticker: str) -> np.ndarray:
+        """Máscara de días con cotización de un ticker (vista)"""
+        return self.mask[:, self.index_of(ticker)]
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """
+        DataFrame OHLCV del ticker solo con sus días de cotización,
+        listo para BaseStrategy.generate_signals / RiskManager.
+        """
+        j = self.index_of(ticker)
+        rows = self.mask[:, j]
+        return pd.DataFrame(
+            {field: self._data[field][rows, j] for field in self.FIELDS},
+            index=self.dates[rows]
+        )
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        return {t: self.frame(t) for t in self.tickers}
+
+    # ----------------------------------------
+    # Operaciones de panel
+    # ----------------------------------------
+
+    def filled(self, name: str) -> np.ndarray:
+        """Campo con forward-fill por ticker (precio vigente en días sin cotización)"""
+        arr = self._data[name]
+        idx = np.where(self.mask, np.arange(arr.shape[0])[:, None], 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        out = arr[idx, np.arange(arr.shape[1])]
+        # Antes de la primera cotización no hay precio vigente
+        started = np.maximum.accumulate(self.mask, axis=0)
+        return np.asfortranarray(np.where(started, out, np.nan))
+
+    def returns(self) -> np.ndarray:
+        """Retornos diarios del cierre vigente (0 en días sin cotización)"""
+        close = self.filled('Close')
+        out = np.zeros_like(close)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[1:] = close[1:] / close[:-1] - 1
+        return np.asfortranarray(np.nan_to_num(out, nan=0.0, posinf=0.0, neginf=0.0))
+
+    def last_valid(self, name: str) -> np.ndarray:
+        """Último valor con cotización de cada ticker"""
+        arr = self._data[name]
+        has_rows = self.mask.any(axis=0)
+        last_idx = arr.shape[0] - 1 - np.argmax(self.mask[::-1], axis=0)
+        values = arr[last_idx, np.arange(arr.shape[1])]
+        return np.where(has_rows, values, np.nan)
+
+    def subset(self, tickers: List[str]) -> "AssetPanel":
+        """Panel con un subconjunto de tickers"""
+        cols = [self.index_of(t) for t in tickers]
+        data = {field: self._data[field][:, cols] for field in self.FIELDS}
+        return AssetPanel(self.dates, tickers, data, self.mask[:, cols])
+
+    def tail(self, n: int) -> "AssetPanel":
+        """Últimas n fechas del calendario (vistas sin copia)"""
+        data = {field: self._data[field][-n:] for field in self.FIELDS}
+        return AssetPanel(self.dates[-n:], self.tickers, data, self.mask[-n:])
+
+    def risk_manager(self):
+        """BatchRiskManager sobre las matrices del panel (sin copia)"""
+        from classes.risk_manager import BatchRiskManager
+        return BatchRiskManager(
+            self._data['High'], self._data['Low'], self._data['Close'],
+            tickers=self.tickers, mask=self.mask
+        )
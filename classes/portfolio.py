@@ -0,0 +1,282 @@
+# classes/portfolio.py - GESTIÓN DE RIESGO A NIVEL DE CARTERA
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable
+import config as cfg
+
+"""
+Presupuesto de riesgo de cartera:
+1. Límite de posiciones simultáneas (RiskConfig.max_posiciones_simultaneas)
+2. Límite de riesgo total (RiskConfig.max_riesgo_portafolio), medido como
+   "heat" correlacionado: sqrt(w' ρ w), con w = riesgo en $ firmado por dirección;
+   los pares sin correlación conocida suman su riesgo (ρ = signo·signo), así
+   que un LONG y un SHORT sin datos nunca se compensan
+3. Matriz de covarianza móvil actualizada barra a barra (O(k²) por barra)
+"""
+
+# ============================================
+# COVARIANZA MÓVIL INCREMENTAL
+# ============================================
+
+class RollingCovariance:
+    """
+    Covarianza móvil de k activos sobre las últimas `window` barras.
+    
+    Mantiene sumas y productos cruzados acumulados en un buffer circular,
+    de modo que cada barra nueva cuesta O(k²) en lugar de recalcular la
+    ventana completa. Los retornos NaN (días sin cotización) cuentan como 0.
+    """
+    
+    def __init__(self, tickers: List[str], window: int = 60):
+        if window < 2:
+            raise ValueError(f"window debe ser >= 2")
+        self.tickers = list(tickers)
+        self.window = window
+        self._idx = {t: i for i, t in enumerate(self.tickers)}
+        
+        k = len(self.tickers)
+        self._buffer = np.zeros((window, k))
+        self._sum = np.zeros(k)
+        self._cross = np.zeros((k, k))
+        self._pos = 0
+        self.count = 0
+    
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, window: int = 60) -> "RollingCovariance":
+        """Inicializa la ventana con un histórico (fechas x tickers)"""
+        cov = cls(list(returns.columns), window=window)
+        for row in returns.tail(window).values:
+            cov.update(row)
+        return cov
+    
+    def update(self, returns: np.ndarray):
+        """Añade una barra nueva (vector de retornos en el orden de tickers)"""
+        x = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+        
+        if self.count == self.window:
+            old = self._buffer[self._pos]
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        
+        self._buffer[self._pos] = x
+        self._sum += x
+        self._cross += np.outer(x, x)
+        self._pos = (self._pos + 1) % self.window
+    
+    def covariance(self) -> np.ndarray:
+        """Covarianza muestral (ddof=1) de la ventana actual"""
+        n = self.count
+        k = len(self.tickers)
+        if n < 2:
+            return np.full((k, k), np.nan)
+        return (self._cross - np.outer(self._sum, self._sum) / n) / (n - 1)
+    
+    def correlation(self) -> np.ndarray:
+        """Correlación de la ventana actual (NaN para activos sin varianza)"""
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+    
+    def correlation_for(self, tickers: List[str], default: float = np.nan) -> np.ndarray:
+        """
+        Submatriz de correlación para `tickers`.
+        Pares desconocidos o sin datos usan `default` (NaN: decide el llamador;
+        un 1.0 fijo no es conservador con riesgo de signo contrario).
+        """
+        corr = self.correlation()
+        n = len(tickers)
+        out = np.full((n, n), default)
+        positions = [self._idx.get(t) for t in tickers]
+        
+        known = [i for i, p in enumerate(positions) if p is not None]
+        if known:
+            src = np.array([positions[i] for i in known])
+            sub = corr[np.ix_(src, src)]
+            out[np.ix_(known, known)] = np.where(np.isnan(sub), default, sub)
+        
+        np.fill_diagonal(out, 1.0)
+        return out
+
+
+def returns_frame(series_by_ticker: Dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Alinea retornos diarios de varios tickers en un calendario común.
+    Normaliza los índices a fecha (sin zona horaria) para que cripto y
+    acciones compartan días.
+    """
+    aligned = {}
+    for ticker, series in series_by_ticker.items():
+        if series is None or len(series) == 0:
+            continue
+        s = series.copy()
+        if isinstance(s.index, pd.DatetimeIndex):
+            if s.index.tz is not None:
+                s.index = s.index.tz_localize(None)
+            s.index = s.index.normalize()
+        aligned[ticker] = s[~s.index.duplicated(keep='last')]
+    
+    if not aligned:
+        return pd.DataFrame()
+    return pd.concat(aligned, axis=1).sort_index().fillna(0.0)
+
+
+# ============================================
+# ASIGNADOR DE CARTERA
+# ============================================
+
+@dataclass
+class AllocationResult:
+    """Resultado de la asignación de cartera"""
+    
+    seleccionados: List[Dict] = field(default_factory=list)
+    rechazados: List[Dict] = field(default_factory=list)
+    posiciones_abiertas: int = 0
+    heat_abierto: float = 0.0
+    heat_total: float = 0.0
+    presupuesto_riesgo: float = 0.0
+
+
+class PortfolioAllocator:
+    """
+    Selecciona y dimensiona oportunidades del escaneo respetando el límite
+    de posiciones y el presupuesto de riesgo total de la cartera.
+    
+    Algoritmo greedy O(n²): recorre candidatos por prioridad y mantiene
+    incrementalmente ρ·w, de modo que añadir un candidato cuesta O(n).
+    Si un candidato no cabe completo se reduce su tamaño hasta agotar el
+    presupuesto, siempre que quede al menos `min_fraccion` del tamaño original.
+    """
+    
+    def __init__(
+        self,
+        risk_config: Optional[cfg.RiskConfig] = None,
+        min_fraccion: float = 0.25
+    ):
+        self.risk = risk_config or cfg.RISK
+        self.min_fraccion = min_fraccion
+    
+    @staticmethod
+    def open_positions_from_journal(df_journal: pd.DataFrame) -> List[Dict]:
+        """Convierte las posiciones ABIERTA de la bitácora en riesgo firmado"""
+        if df_journal is None or df_journal.empty or 'Status' not in df_journal.columns:
+            return []
+        
+        abiertas = df_journal[df_journal['Status'] == 'ABIERTA']
+        positions = []
+        for _, row in abiertas.iterrows():
+            entry = float(row.get('Precio_Entrada', 0) or 0)
+            stop = float(row.get('Stop_Loss', 0) or 0)
+            units = float(row.get('Unidades', 0) or 0)
+            positions.append({
+                'ticker': row['Ticker'],
+                'direction': row.get('Accion', 'LONG'),
+                'riesgo_usd': abs(entry - stop) * units if stop > 0 else entry * units
+            })
+        return positions
+    
+    def allocate(
+        self,
+        candidates: List[Dict],
+        open_positions: Optional[List[Dict]] = None,
+        capital: Optional[float] = None,
+        covariance: Optional[RollingCovariance] = None,
+        priority: Optional[Callable[[Dict], float]] = None
+    ) -> AllocationResult:
+        """
+        Asigna capital de riesgo a los candidatos.
+        
+        Args:
+            candidates: resultados del escaneo (claves ticker, direction,
+                precio, stop_loss, units)
+            open_positions: posiciones abiertas (ver open_positions_from_journal)
+            capital: capital de la cuenta (por defecto RiskConfig.capital_total)
+            covariance: covarianza móvil para ajustar por correlación
+            priority: clave de ordenación (por defecto Sharpe descendente)
+        """
+        capital = capital if capital is not None else self.risk.capital_total
+        open_positions = open_positions or []
+        priority = priority or (lambda c: c.get('sharpe', 0))
+        
+        budget = capital * self.risk.max_riesgo_portafolio
+        slots = self.risk.max_posiciones_simultaneas - len(open_positions)
+        
+        ranked = sorted(
+            (c for c in candidates if c.get('units', 0) > 0 and c.get('direction') in ("LONG", "SHORT")),
+            key=priority,
+            reverse=True
+        )
+        result = AllocationResult(
+            posiciones_abiertas=len(open_positions),
+            presupuesto_riesgo=budget
+        )
+        
+        # Vector de riesgo firmado: abiertas primero, luego candidatos
+        tickers = [p['ticker'] for p in open_positions] + [c['ticker'] for c in ranked]
+        n_open = len(open_positions)
+        sign = lambda d: 1.0 if d == "LONG" else -1.0
+        signs = np.array([sign(p['direction']) for p in open_positions] + [sign(c['direction']) for c in ranked])
+        if covariance is not None:
+            rho = covariance.correlation_for(tickers)
+        else:
+            rho = np.full((len(tickers), len(tickers)), np.nan)
+        # Pares sin correlación conocida: ρ = s_i·s_j, es decir |w_i|·|w_j|
+        # en el heat (el riesgo se suma, nunca se compensa)
+        rho = np.where(np.isnan(rho), np.outer(signs, signs), rho)
+        
+        w = np.zeros(len(tickers))
+        for i, p in enumerate(open_positions):
+            w[i] = signs[i] * p['riesgo_usd']
+        
+        rho_w = rho @ w
+        quad = float(w @ rho_w)
+        result.heat_abierto = float(np.sqrt(max(quad, 0.0)))
+        
+        for k, cand in enumerate(ranked):
+            i = n_open + k
+            
+            if slots <= 0:
+                result.rechazados.append({**cand, 'motivo': 'MAX_POSICIONES'})
+                continue
+            
+            risk_usd = abs(cand['precio'] - cand['stop_loss']) * cand['units']
+            wc = signs[i] * risk_usd
+            b = rho_w[i]
+            
+            # Heat tras añadir s·wc: quad + 2·s·wc·b + s²·wc²  <=  budget²
+            new_quad = quad + 2 * wc * b + wc * wc
+            if new_quad <= budget * budget:
+                scale = 1.0
+            elif wc == 0:
+                scale = 0.0
+            else:
+                disc = (wc * b) ** 2 - wc * wc * (quad - budget * budget)
+                scale = 0.0 if disc < 0 else (-wc * b + np.sqrt(disc)) / (wc * wc)
+                scale = min(max(scale, 0.0), 1.0)
+            
+            if scale < self.min_fraccion:
+                result.rechazados.append({**cand, 'motivo': 'PRESUPUESTO_RIESGO'})
+                continue
+            
+            w[i] = wc * scale
+            rho_w += rho[:, i] * w[i]
+            quad = float(w @ rho_w)
+            slots -= 1
+            
+            units = round(cand['units'] * scale, 4)
+            result.seleccionados.append({
+                **cand,
+                'units': units,
+                'inversion': units * cand['precio'],
+                'riesgo_usd': risk_usd * scale,
+                'fraccion_asignada': scale
+            })
+        
+        result.heat_total = float(np.sqrt(max(quad, 0.0)))
+        return result
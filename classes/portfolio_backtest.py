@@ -0,0 +1,253 @@
+# classes/portfolio_backtest.py - BACKTEST DE CARTERA (UNIVERSO COMPLETO)
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+from numba import jit
+import config as cfg
+
+from classes.panel import AssetPanel
+
+"""
+Simulación de cartera con capital compartido en una sola pasada compilada:
+1. Señales por ticker sobre el calendario alineado del AssetPanel
+2. Máximo de posiciones simultáneas y riesgo total (RiskConfig)
+3. Tamaño por riesgo: (equity * riesgo_por_operacion) / (ATR * atr_multiplier),
+   limitado por la caja disponible (sin apalancamiento)
+4. Devuelve equity, exposición, nº de posiciones y contribución por activo
+"""
+
+# ============================================
+# KERNEL NUMBA
+# ============================================
+
+@jit(nopython=True)
+def _portfolio_kernel(
+    close: np.ndarray,
+    signals: np.ndarray,
+    atr: np.ndarray,
+    mask: np.ndarray,
+    priority: np.ndarray,
+    capital: float,
+    risk_per_trade: float,
+    atr_multiplier: float,
+    max_positions: int,
+    max_portfolio_risk: float,
+    entry_on_change_only: bool
+):
+    n_rows, n_cols = close.shape
+
+    equity = np.empty(n_rows)
+    exposure = np.empty(n_rows)
+    n_open = np.zeros(n_rows, dtype=np.int64)
+    contribution = np.zeros(n_cols)
+    n_trades = np.zeros(n_cols, dtype=np.int64)
+
+    direction = np.zeros(n_cols)      # +1 long, -1 short, 0 sin posición
+    units = np.zeros(n_cols)
+    entry_price = np.zeros(n_cols)
+    last_price = np.full(n_cols, np.nan)
+    open_risk = np.zeros(n_cols)
+    prev_signal = np.zeros(n_cols)
+
+    cash = capital
+    positions = 0
+    candidates = np.empty(n_cols, dtype=np.int64)
+
+    for t in range(n_rows):
+        # 1. Marcar a mercado
+        for j in range(n_cols):
+            if mask[t, j] and not np.isnan(close[t, j]):
+                last_price[j] = close[t, j]
+
+        # 2. Salidas: la señal ya no coincide con la dirección abierta
+        for j in range(n_cols):
+            if direction[j] == 0 or not mask[t, j]:
+                continue
+            sig = signals[t, j]
+            if np.isnan(sig) or sig != direction[j]:
+                price = last_price[j]
+                pnl = units[j] * (price - entry_price[j]) * direction[j]
+                cash += units[j] * entry_price[j] + pnl
+                contribution[j] += pnl
+                direction[j] = 0
+                units[j] = 0.0
+                open_risk[j] = 0.0
+                positions -= 1
+
+        # Equity actual para dimensionar entradas
+        position_value = 0.0
+        total_risk = 0.0
+        for j in range(n_cols):
+            if direction[j] != 0:
+                position_value += units[j] * entry_price[j] + \
+                    units[j] * (last_price[j] - entry_price[j]) * direction[j]
+                total_risk += open_risk[j]
+        current_equity = cash + position_value
+
+        # 3. Entradas por prioridad
+        n_cand = 0
+        if positions < max_positions:
+            for j in range(n_cols):
+                sig = signals[t, j]
+                if direction[j] != 0 or not mask[t, j] or np.isnan(sig) or sig == 0:
+                    continue
+                if entry_on_change_only and sig == prev_signal[j]:
+                    continue
+                if np.isnan(atr[t, j]) or atr[t, j] <= 0 or np.isnan(last_price[j]):
+                    continue
+                candidates[n_cand] = j
+                n_cand += 1
+
+        if n_cand > 0:
+            order = np.argsort(-priority[candidates[:n_cand]])
+            for k in range(n_cand):
+                if positions >= max_positions:
+                    break
+                j = candidates[order[k]]
+                price = last_price[j]
+                stop_distance = atr[t, j] * atr_multiplier
+                risk_amount = current_equity * risk_per_trade
+
+                if total_risk + risk_amount > current_equity * max_portfolio_risk:
+                    continue
+
+                qty = min(risk_amount / stop_distance, cash / price)
+                if qty <= 0:
+                    continue
+
+                cash -= qty * price
+                direction[j] = signals[t, j]
+                units[j] = qty
+                entry_price[j] = price
+                open_risk[j] = qty * stop_distance
+                total_risk += open_risk[j]
+                positions += 1
+                n_trades[j] += 1
+
+        for j in range(n_cols):
+            if mask[t, j] and not np.isnan(signals[t, j]):
+                prev_signal[j] = signals[t, j]
+
+        # 4. Registro del día
+        gross = 0.0
+        position_value = 0.0
+        for j in range(n_cols):
+            if direction[j] != 0:
+                gross += units[j] * last_price[j]
+                position_value += units[j] * entry_price[j] + \
+                    units[j] * (last_price[j] - entry_price[j]) * direction[j]
+        equity[t] = cash + position_value
+        exposure[t] = gross / equity[t] if equity[t] > 0 else 0.0
+        n_open[t] = positions
+
+    # Las posiciones abiertas al final contribuyen con su P&L latente
+    for j in range(n_cols):
+        if direction[j] != 0:
+            contribution[j] += units[j] * (last_price[j] - entry_price[j]) * direction[j]
+
+    return equity, exposure, n_open, contribution, n_trades
+
+
+# ============================================
+# SIMULADOR DE CARTERA
+# ============================================
+
+class PortfolioBacktester:
+    """
+    Backtest de cartera sobre un AssetPanel con la configuración de riesgo
+    de RiskConfig. Las señales se ejecutan al cierre de la barra en que
+    aparecen (mismo convenio que BaseStrategy.backtest: la posición de la
+    barra t gana el retorno de t a t+1).
+    """
+
+    def __init__(self, panel: AssetPanel, risk_config: Optional[cfg.RiskConfig] = None):
+        self.panel = panel
+        self.risk = risk_config or cfg.RISK
+
+    def build_signal_matrix(self, strategy_map: Optional[Dict[str, Dict]] = None) -> np.ndarray:
+        """
+        Genera la matriz de señales (fechas x tickers) con la estrategia
+        asignada a cada ticker. Tickers sin estrategia quedan en 0.
+        """
+        from classes.strategies import get_strategy_by_name
+
+        strategy_map = strategy_map if strategy_map is not None else cfg.STRATEGY_MAP
+        signals = np.zeros(self.panel.shape, order='F')
+
+        for j, ticker in enumerate(self.panel.tickers):
+            config = strategy_map.get(ticker)
+            strat_obj = get_strategy_by_name(config['strategy']) if config else None
+            if strat_obj is None:
+                continue
+            df = self.panel.frame(ticker)
+            try:
+                df = strat_obj.generate_signals(df, config['params'])
+            except Exception:
+                continue
+            # En días sin cotización se mantiene la última señal
+            aligned = pd.Series(df['Signal'].values, index=df.index).reindex(self.panel.dates)
+            signals[:, j] = aligned.ffill().fillna(0).values
+
+        return signals
+
+    def run(
+        self,
+        signals: np.ndarray,
+        priority: Optional[np.ndarray] = None,
+        capital: Optional[float] = None,
+        entry_on_change_only: bool = True
+    ) -> Dict:
+        """
+        Ejecuta la simulación.
+
+        Args:
+            signals: matriz (fechas x tickers) con 1 (long), -1 (short) o 0
+            priority: prioridad por ticker para repartir huecos (p.ej. Sharpe)
+            capital: capital inicial (por defecto RiskConfig.capital_total)
+            entry_on_change_only: entrar solo cuando la señal cambia (como el radar)
+        """
+        signals = np.asarray(signals, dtype=np.float64)
+        if signals.shape != self.panel.shape:
+            raise ValueError(f"signals {signals.shape} no coincide con el panel {self.panel.shape}")
+
+        n_cols = self.panel.shape[1]
+        priority = np.zeros(n_cols) if priority is None else np.asarray(priority, dtype=np.float64)
+        capital = capital if capital is not None else self.risk.capital_total
+
+        atr = self.panel.risk_manager().calculate_atr(14)
+        close = self.panel.field('Close')
+
+        equity, exposure, n_open, contribution, n_trades = _portfolio_kernel(
+            close, signals, atr, self.panel.mask, priority,
+            float(capital), self.risk.riesgo_por_operacion, self.risk.atr_multiplier,
+            self.risk.max_posiciones_simultaneas, self.risk.max_riesgo_portafolio,
+            entry_on_change_only
+        )
+
+        equity_curve = pd.Series(equity, index=self.panel.dates)
+        returns = equity_curve.pct_change().dropna()
+        peak = equity_curve.cummax()
+        std = returns.std()
+
+        return {
+            "return": float(equity[-1] / capital - 1) if len(equity) else 0.0,
+            "sharpe": float(returns.mean() / std * np.sqrt(252)) if std > 0 else 0.0,
+            "drawdown": float(((equity_curve - peak) / peak).min()) if len(equity) else 0.0,
+            "equity_curve": equity_curve,
+            "exposure": pd.Series(exposure, index=self.panel.dates),
+            "positions": pd.Series(n_open, index=self.panel.dates),
+            "contribution": pd.DataFrame({
+                "Ticker": self.panel.tickers,
+                "PnL": contribution,
+                "Trades": n_trades
+            }).sort_values("PnL", ascending=False).reset_index(drop=True)
+        }
+
+    def run_strategy_map(
+        self,
+        strategy_map: Optional[Dict[str, Dict]] = None,
+        priority: Optional[np.ndarray] = None,
+        capital: Optional[float] = None
+    ) -> Dict:
+        """Simula la cartera con las estrategias de StrategyMapping"""
+        return self.run(self.build_signal_matrix(strategy_map), priority=priority, capital=capital)
@@ -0,0 +1,301 @@
+# classes/research.py - INVESTIGACIÓN POR LOTES CON CHECKPOINT Y REANUDACIÓN
+import concurrent.futures
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+import config as cfg
+from classes.data_cache import load_many
+from classes.scout import AssetScout, PARAM_GRID, STOP_GRID
+from utils.telemetry import scan, TELEMETRY
+
+"""
+Optimización de universos grandes que sobrevive a caídas y throttling:
+1. Los históricos se cargan en paralelo con hilos (cache de disco) y las
+   combinaciones se evalúan en un pool de procesos, en bloques de
+   (ticker, estrategia); solo el proceso principal escribe el checkpoint
+2. Cada combinación (ticker, estrategia, params) evaluada se añade como
+   una línea JSON a un checkpoint append-only (flush por línea, al
+   terminar cada bloque); al terminar un ticker se escribe su marca "done"
+3. Cada registro lleva la identidad de su ejecución (hash del grid,
+   periodo y fecha de la última vela): los de otra ejecución se ignoran,
+   así que cuando llegan barras nuevas el ticker se vuelve a optimizar
+4. Al reanudar la misma ejecución se saltan los tickers terminados y, en
+   los parciales, las combinaciones ya evaluadas (mismos datos y misma
+   evaluación, AssetScout._evaluate_candidate, con o sin stops; la cota de
+   poda parte del mejor guardado, así que el ganador es el mismo que con
+   el grid search de una pasada)
+5. Progreso y ETA por combinaciones evaluadas en esta ejecución
+"""
+
+CHECKPOINT_FILE = cfg.PATHS.DATA_DIR / "research_checkpoint.jsonl"
+
+
+def grid_hash() -> str:
+    """
+    Huella de PARAM_GRID (y de STOP_GRID con RISK.optimizar_stops): un
+    checkpoint de otro grid no marca tickers como terminados
+    """
+    grid = {"params": PARAM_GRID, "stops": STOP_GRID if cfg.RISK.optimizar_stops else None}
+    return hashlib.sha1(json.dumps(grid, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _params_key(params: Dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def run_key(df: pd.DataFrame, period: str, grid: Optional[str] = None) -> str:
+    """Identidad de una ejecución para un ticker: grid, periodo y última vela de sus datos"""
+    return f"{grid or grid_hash()}:{period}:{pd.Timestamp(df.index[-1]).isoformat()}"
+
+
+# ============================================
+# CHECKPOINT
+# ============================================
+
+class ResearchCheckpoint:
+    """
+    Registro append-only de combinaciones evaluadas y tickers terminados.
+
+    Todo se indexa por (ticker, run) con run = run_key(...); los registros
+    sin identidad (checkpoints antiguos) se ignoran.
+    """
+
+    def __init__(self, path: Path = CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # (ticker, run) -> {(estrategia, params_key): registro}
+        self.evaluated: Dict[tuple, Dict[tuple, Dict]] = {}
+        self.done: set = set()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue   # Última línea truncada por una caída
+                ticker, run = record.get("ticker"), record.get("run")
+                if not ticker or not run:
+                    continue
+                if record.get("done"):
+                    self.done.add((ticker, run))
+                else:
+                    key = (record["strategy"], _params_key(record["params"]))
+                    self.evaluated.setdefault((ticker, run), {})[key] = record
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, default=float) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+
+    def record(self, ticker: str, run: str, strategy: str, params: Dict, score: Optional[float], result: Optional[Dict]):
+        record = {"ticker": ticker, "run": run, "strategy": strategy, "params": params, "score": score, "result": result}
+        with self._lock:
+            self.evaluated.setdefault((ticker, run), {})[(strategy, _params_key(params))] = record
+        self._append(record)
+
+    def mark_done(self, ticker: str, run: str, n_candidates: int):
+        with self._lock:
+            self.done.add((ticker, run))
+        self._append({"ticker": ticker, "run": run, "done": True, "candidates": n_candidates})
+
+    def is_done(self, ticker: str, run: str) -> bool:
+        return (ticker, run) in self.done
+
+    def seen(self, ticker: str, run: str) -> Dict[tuple, Dict]:
+        """Combinaciones ya evaluadas del ticker en esta ejecución"""
+        return self.evaluated.get((ticker, run), {})
+
+    def best(self, ticker: str, run: str) -> Optional[Dict]:
+        """Registro de mayor score del ticker en la ejecución (None si ninguno es válido)"""
+        records = [r for r in self.seen(ticker, run).values() if r["score"] is not None]
+        return max(records, key=lambda r: r["score"]) if records else None
+
+
+# ============================================
+# PROGRESO
+# ============================================
+
+class Progress:
+    """Combinaciones evaluadas, ritmo y ETA (thread-safe)"""
+
+    def __init__(self, total: int, already_done: int = 0):
+        self.total = total
+        self.done = already_done
+        self._initial = already_done
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def advance(self, n: int = 1):
+        with self._lock:
+            self.done += n
+
+    def drop(self, n: int):
+        """Combinaciones que no se evaluarán en esta ejecución (ticker fallido)"""
+        with self._lock:
+            self.total -= n
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self._started
+        return (self.done - self._initial) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_s(self) -> Optional[float]:
+        rate = self.rate
+        return (self.total - self.done) / rate if rate > 0 else None
+
+    def summary(self) -> str:
+        eta = self.eta_s
+        eta_txt = time.strftime("%H:%M:%S", time.gmtime(eta)) if eta is not None else "--:--:--"
+        pct = self.done / self.total if self.total else 1.0
+        return f"{self.done}/{self.total} combinaciones ({pct:.0%}), {self.rate:.0f}/s, ETA {eta_txt}"
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def _evaluate_block(ticker: str, df: pd.DataFrame, strategy: str, params_list: List[Dict], best_score: float) -> List[tuple]:
+    """
+    Worker de proceso: evalúa un bloque de combinaciones de una estrategia.
+
+    Returns:
+        [(params, score o None, resultado o None)] en el orden de params_list
+    """
+    scout = AssetScout(ticker, data=df)
+    strat = {s.name: s for s in scout.strategies}[strategy]
+    records = []
+    for params in params_list:
+        evaluated = scout._evaluate_candidate(strat, params, best_score)
+        if evaluated is None:
+            records.append((params, None, None))
+        else:
+            score, result = evaluated
+            records.append((params, score, result))
+            best_score = max(best_score, score)
+    return records
+
+
+def _pending_blocks(ticker: str, run: str, checkpoint: ResearchCheckpoint) -> Dict[str, List[Dict]]:
+    """Combinaciones aún no evaluadas del ticker, agrupadas por estrategia"""
+    seen = checkpoint.seen(ticker, run)
+    blocks = {}
+    for strategy, params_list in PARAM_GRID.items():
+        pending = [p for p in params_list if (strategy, _params_key(p)) not in seen]
+        if pending:
+            blocks[strategy] = pending
+    return blocks
+
+
+def run_research(
+    tickers: List[str],
+    checkpoint_path: Path = CHECKPOINT_FILE,
+    resume: bool = True,
+    max_workers: Optional[int] = None,
+    period: str = "2y",
+    on_progress: Optional[Callable[[str, Optional[Dict], Progress], None]] = None
+) -> pd.DataFrame:
+    """
+    Mejor estrategia por ticker con checkpoint por combinación.
+
+    Los datos se cargan primero (cache de disco) para fijar la identidad de
+    la ejecución de cada ticker; solo se reutiliza el trabajo guardado con
+    la misma identidad.
+
+    Args:
+        resume: False descarta el checkpoint existente
+        on_progress: callback(ticker, ganador o None, progreso) al terminar cada ticker
+
+    Returns:
+        DataFrame de ganadores (Ticker, Estrategia, Retorno, Sharpe, Drawdown, Params, Score)
+        con attrs["errors"] = {ticker: mensaje} de los que fallaron
+    """
+    if not resume and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint = ResearchCheckpoint(checkpoint_path)
+    workers = max_workers or cfg.APP.max_workers_paralelo
+
+    frames, errors = load_many(tickers, period, max_workers=workers)
+    grid = grid_hash()
+    runs = {t: run_key(df, period, grid) for t, df in frames.items()}
+
+    n_candidates = sum(len(params) for params in PARAM_GRID.values())
+    already = sum(
+        n_candidates if checkpoint.is_done(t, run) else len(checkpoint.seen(t, run))
+        for t, run in runs.items()
+    )
+    progress = Progress(n_candidates * len(runs), min(already, n_candidates * len(runs)))
+    pending = [t for t in tickers if t in runs and not checkpoint.is_done(t, runs[t])]
+
+    # Evaluación en procesos (los kernels y pandas retienen el GIL); el
+    # checkpoint solo se escribe desde este proceso, bloque a bloque
+    remaining: Dict[str, int] = {}
+    failed: set = set()
+    with scan("research", pending), concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for ticker in pending:
+            run = runs[ticker]
+            blocks = _pending_blocks(ticker, run, checkpoint)
+            best = checkpoint.best(ticker, run)
+            best_score = best["score"] if best else -999
+            remaining[ticker] = len(blocks)
+            for strategy, params_list in blocks.items():
+                future = executor.submit(_evaluate_block, ticker, frames[ticker], strategy, params_list, best_score)
+                futures[future] = (ticker, strategy)
+            if not blocks:
+                # Todo evaluado en una ejecución interrumpida antes de la marca "done"
+                checkpoint.mark_done(ticker, run, n_candidates)
+                if on_progress:
+                    best = checkpoint.best(ticker, run)
+                    on_progress(ticker, best["result"] if best else None, progress)
+
+        for future in concurrent.futures.as_completed(futures):
+            ticker, strategy = futures[future]
+            run = runs[ticker]
+            try:
+                records = future.result()
+            except Exception as e:
+                # El ticker queda sin marca "done": se reintenta al reanudar
+                TELEMETRY.error(ticker, str(e))
+                errors[ticker] = str(e)
+                failed.add(ticker)
+                records = []
+            for params, score, result in records:
+                checkpoint.record(ticker, run, strategy, params, score, result)
+            progress.advance(len(records))
+
+            remaining[ticker] -= 1
+            if remaining[ticker]:
+                continue
+            if ticker in failed:
+                progress.drop(n_candidates - len(checkpoint.seen(ticker, run)))
+                winner = None
+            else:
+                checkpoint.mark_done(ticker, run, n_candidates)
+                best = checkpoint.best(ticker, run)
+                winner = best["result"] if best else None
+            if on_progress:
+                on_progress(ticker, winner, progress)
+
+    rows = []
+    for ticker in tickers:
+        run = runs.get(ticker)
+        best = checkpoint.best(ticker, run) if run else None
+        if best and checkpoint.is_done(ticker, run):
+            rows.append({**best["result"], "Score": best["score"]})
+    df = pd.DataFrame(rows)
+    df.attrs["errors"] = errors
+    return df
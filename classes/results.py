@@ -0,0 +1,227 @@
+# classes/results.py - RESULTADOS DEL OPTIMIZADOR (COLUMNAR + PARETO)
+import bisect
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+"""
+Conjunto de evaluaciones del optimizador en formato columnar:
+1. Una fila por (ticker, estrategia, params) con retorno, Sharpe y drawdown
+2. Ticker y estrategia codificados como enteros (listas de categorías)
+3. Re-puntuación vectorizada con cualquier peso sin repetir backtests
+4. Frente de Pareto (retorno, Sharpe, drawdown) en O(n log n)
+5. Estadísticas por operación opcionales (nº de trades, win rate, duración)
+"""
+
+
+class EvaluationSet:
+    """Evaluaciones (ticker, estrategia, params, métricas) en columnas NumPy"""
+
+    METRICS = ("return", "sharpe", "drawdown")
+
+    def __init__(self):
+        self.tickers: List[str] = []
+        self.strategies: List[str] = []
+        self._ticker_codes: Dict[str, int] = {}
+        self._strategy_codes: Dict[str, int] = {}
+
+        self.params: List[Dict] = []
+        self.trade_stats: List[Optional[Dict]] = []
+        self._rows: List[Tuple[int, int, float, float, float]] = []
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    # ----------------------------------------
+    # Construcción
+    # ----------------------------------------
+
+    @staticmethod
+    def _code(value: str, codes: Dict[str, int], values: List[str]) -> int:
+        if value not in codes:
+            codes[value] = len(values)
+            values.append(value)
+        return codes[value]
+
+    def append(
+        self, ticker: str, strategy: str, params: Dict, ret: float, sharpe: float, drawdown: float,
+        trade_stats: Optional[Dict] = None
+    ):
+        self._rows.append((
+            self._code(ticker, self._ticker_codes, self.tickers),
+            self._code(strategy, self._strategy_codes, self.strategies),
+            float(ret), float(sharpe), float(drawdown)
+        ))
+        self.params.append(params)
+        self.trade_stats.append(trade_stats)
+        self._columns = None
+
+    def extend(self, other: "EvaluationSet"):
+        """Añade todas las filas de otro conjunto"""
+        cols = other.columns
+        for i in range(len(other)):
+            self.append(
+                other.tickers[cols["ticker"][i]], other.strategies[cols["strategy"][i]],
+                other.params[i], cols["return"][i], cols["sharpe"][i], cols["drawdown"][i],
+                other.trade_stats[i]
+            )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columnas NumPy (se materializan una vez tras cada modificación)"""
+        if self._columns is None:
+            rows = np.array(self._rows, dtype=np.float64).reshape(-1, 5)
+            self._columns = {
+                "ticker": rows[:, 0].astype(np.int32),
+                "strategy": rows[:, 1].astype(np.int32),
+                "return": rows[:, 2].copy(),
+                "sharpe": rows[:, 3].copy(),
+                "drawdown": rows[:, 4].copy()
+            }
+        return self._columns
+
+    # ----------------------------------------
+    # Puntuación y ranking
+    # ----------------------------------------
+
+    def score(
+        self,
+        weights: Tuple[float, float, float] = (1.0, 0.1, 0.5),
+        max_drawdown: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Score = w_ret * retorno + w_sharpe * sharpe - w_dd * |drawdown|.
+        Filas inválidas o con drawdown < max_drawdown quedan en -inf.
+        """
+        cols = self.columns
+        w_ret, w_sharpe, w_dd = weights
+        score = cols["return"] * w_ret + cols["sharpe"] * w_sharpe - np.abs(cols["drawdown"]) * w_dd
+        invalid = ~np.isfinite(score)
+        if max_drawdown is not None:
+            invalid |= cols["drawdown"] < max_drawdown
+        return np.where(invalid, -np.inf, score)
+
+    def best_by_ticker(
+        self,
+        weights: Tuple[float, float, float] = (1.0, 0.1, 0.5),
+        max_drawdown: Optional[float] = None
+    ) -> Dict[str, Dict]:
+        """Ganador de cada ticker con los pesos dados (formato AssetScout)"""
+        score = self.score(weights, max_drawdown)
+        ticker_codes = self.columns["ticker"]
+
+        # Orden por (ticker, score desc): la primera fila de cada ticker gana.
+        # Con empates se conserva el orden de evaluación, como el grid search.
+        order = np.lexsort((np.arange(len(score)), -score, ticker_codes))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ticker_codes[order][1:] != ticker_codes[order][:-1]
+
+        winners = {}
+        for i in order[first]:
+            if np.isfinite(score[i]):
+                winners[self.tickers[ticker_codes[i]]] = self.row(i, score[i])
+        return winners
+
+    def row(self, i: int, score: Optional[float] = None) -> Dict:
+        cols = self.columns
+        out = {
+            "Ticker": self.tickers[cols["ticker"][i]],
+            "Estrategia": self.strategies[cols["strategy"][i]],
+            "Retorno": float(cols["return"][i]),
+            "Sharpe": float(cols["sharpe"][i]),
+            "Drawdown": float(cols["drawdown"][i]),
+            "Params": self.params[i],
+            "Source": "OPTIMIZED"
+        }
+        if score is not None:
+            out["Score"] = float(score)
+        stats = self.trade_stats[i]
+        if stats:
+            out["Operaciones"] = stats["trades"]
+            out["Win Rate"] = stats["win_rate"]
+            out["Duración Media"] = stats["avg_bars_held"]
+            if "stops" in stats:
+                out["Stops"] = stats["stops"]
+        return out
+
+    def to_frame(self, weights: Optional[Tuple[float, float, float]] = None) -> pd.DataFrame:
+        cols = self.columns
+        df = pd.DataFrame({
+            "Ticker": pd.Categorical.from_codes(cols["ticker"], self.tickers),
+            "Estrategia": pd.Categorical.from_codes(cols["strategy"], self.strategies),
+            "Params": self.params,
+            "Retorno": cols["return"],
+            "Sharpe": cols["sharpe"],
+            "Drawdown": cols["drawdown"]
+        })
+        if any(self.trade_stats):
+            empty = {"trades": np.nan, "win_rate": np.nan, "avg_bars_held": np.nan}
+            stats = [s or empty for s in self.trade_stats]
+            df["Operaciones"] = [s["trades"] for s in stats]
+            df["Win Rate"] = [s["win_rate"] for s in stats]
+            df["Duración Media"] = [s["avg_bars_held"] for s in stats]
+        if weights is not None:
+            df["Score"] = self.score(weights)
+        return df
+
+    # ----------------------------------------
+    # Frente de Pareto
+    # ----------------------------------------
+
+    def pareto_front(self, ticker: Optional[str] = None) -> np.ndarray:
+        """
+        Índices de las filas no dominadas (maximizando retorno, Sharpe y
+        drawdown, que es negativo). Filas con métricas no finitas se excluyen.
+        """
+        cols = self.columns
+        points = np.column_stack([cols["return"], cols["sharpe"], cols["drawdown"]])
+        candidates = np.where(np.isfinite(points).all(axis=1))[0]
+        if ticker is not None:
+            if ticker not in self._ticker_codes:
+                return np.empty(0, dtype=np.int64)
+            candidates = candidates[cols["ticker"][candidates] == self._ticker_codes[ticker]]
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Duplicados exactos: se decide una vez y se aplica a todas sus copias
+        unique, inverse = np.unique(points[candidates], axis=0, return_inverse=True)
+        on_front = pareto_mask(unique)
+        return candidates[on_front[inverse.ravel()]]
+
+
+def pareto_mask(points: np.ndarray) -> np.ndarray:
+    """
+    Máscara de puntos no dominados (maximización en 3 objetivos, puntos únicos).
+
+    Barrido por el primer objetivo descendente manteniendo la "escalera" de
+    los no dominados en los otros dos: O(n log n) búsquedas.
+    """
+    n = len(points)
+    mask = np.zeros(n, dtype=bool)
+    order = np.lexsort((-points[:, 2], -points[:, 1], -points[:, 0]))
+
+    # Escalera: segundo objetivo ascendente, tercero descendente
+    stair_y: List[float] = []
+    stair_z: List[float] = []
+
+    for i in order:
+        y, z = points[i, 1], points[i, 2]
+        # Punto ya visto (primer objetivo >=) con y' >= y de mayor z
+        k = bisect.bisect_left(stair_y, y)
+        if k < len(stair_y) and stair_z[k] >= z:
+            continue
+        mask[i] = True
+
+        # Insertar y retirar los que ahora quedan cubiertos (y' <= y, z' <= z)
+        if k < len(stair_y) and stair_y[k] == y:
+            k += 1
+        j = k
+        while j > 0 and stair_z[j - 1] <= z:
+            j -= 1
+        del stair_y[j:k]
+        del stair_z[j:k]
+        stair_y.insert(j, y)
+        stair_z.insert(j, z)
+
+    return mask
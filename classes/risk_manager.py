@@ -1,7 +1,9 @@
 # classes/risk_manager.py - VERSIÓN OPTIMIZADA
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
+from numba import jit
+from utils.metrics import cache_hit, cache_miss
 
 class RiskManager:
     """Gestor de riesgo optimizado con cálculos vectorizados"""
@@ -23,7 +25,9 @@ class RiskManager:
         """Calcula ATR vectorizado con cache"""
         cache_key = f"atr_{period}"
         if cache_key in self._atr_cache:
+            cache_hit("atr")
             return self._atr_cache[cache_key]
+        cache_miss("atr")
         
         high = self.df['High'].values
         low = self.df['Low'].values
@@ -89,7 +93,15 @@ class RiskManager:
         trade_setup: Optional[Dict]
     ) -> float:
         """Calcula tamaño de posición óptimo (CFDs fraccionados)"""
-        
+        return self.position_size(account_size, risk_pct_per_trade, trade_setup)
+    
+    @staticmethod
+    def position_size(
+        account_size: float, 
+        risk_pct_per_trade: float, 
+        trade_setup: Optional[Dict]
+    ) -> float:
+        """Tamaño de posición a partir de un setup ya calculado (sin DataFrame)"""
         if not trade_setup:
             return 0.0
         
@@ -109,3 +121,270 @@ class RiskManager:
         final_units = min(units_by_risk, max_units_by_capital)
         
         return round(final_units, 4)
+
+
+# ============================================
+# MOTOR DE RIESGO VECTORIZADO (UNIVERSO COMPLETO)
+# ============================================
+
+@jit(nopython=True)
+def _atr_matrix_numba(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    mask: np.ndarray,
+    period: int
+) -> np.ndarray:
+    """
+    ATR por columna (fechas x tickers) con la misma semántica que
+    RiskManager.calculate_atr sobre el DataFrame propio de cada ticker:
+    TR de la primera fila = NaN y media móvil con min_periods=1.
+    Las filas con mask=False (días sin cotización) se saltan.
+    """
+    n_rows, n_cols = close.shape
+    atr = np.full((n_rows, n_cols), np.nan)
+    window = np.empty(period)
+    
+    for j in range(n_cols):
+        filled = 0
+        pos = 0
+        prev_close = np.nan
+        
+        for i in range(n_rows):
+            if not mask[i, j]:
+                continue
+            
+            tr = max(
+                high[i, j] - low[i, j],
+                abs(high[i, j] - prev_close),
+                abs(low[i, j] - prev_close)
+            )
+            # max() de Python no propaga NaN como np.maximum
+            if np.isnan(prev_close) or np.isnan(high[i, j]) or np.isnan(low[i, j]):
+                tr = np.nan
+            prev_close = close[i, j]
+            
+            window[pos] = tr
+            pos = (pos + 1) % period
+            if filled < period:
+                filled += 1
+            
+            total = 0.0
+            count = 0
+            for k in range(filled):
+                if not np.isnan(window[k]):
+                    total += window[k]
+                    count += 1
+            if count > 0:
+                atr[i, j] = total / count
+    
+    return atr
+
+
+class BatchRiskManager:
+    """
+    Gestor de riesgo vectorizado para todo el universo.
+    
+    Recibe matrices alineadas High/Low/Close (fechas x tickers) y calcula
+    ATR, stop, take profit, riesgo por acción y unidades para cada ticker
+    y dirección en una sola pasada NumPy. Los resultados coinciden con
+    RiskManager.get_trade_setup y RiskManager.calculate_position_size.
+    """
+    
+    DIRECTIONS = ("LONG", "SHORT")
+    
+    def __init__(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        tickers: Optional[List[str]] = None,
+        mask: Optional[np.ndarray] = None
+    ):
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self._validate_shapes()
+        
+        n_cols = self.close.shape[1]
+        self.tickers = list(tickers) if tickers is not None else [str(j) for j in range(n_cols)]
+        if len(self.tickers) != n_cols:
+            raise ValueError(f"tickers ({len(self.tickers)}) no coincide con columnas ({n_cols})")
+        self._ticker_idx = {t: j for j, t in enumerate(self.tickers)}
+        
+        # Filas propias de cada ticker (por defecto: donde hay cierre)
+        if mask is None:
+            mask = ~np.isnan(self.close)
+        self.mask = np.asarray(mask, dtype=np.bool_)
+        if self.mask.shape != self.close.shape:
+            raise ValueError("mask debe tener la misma forma que close")
+        
+        # Misma validación que RiskManager, pero por columna
+        self.valid_rows = self.mask.sum(axis=0)
+        self.valid_tickers = self.valid_rows >= 14
+        
+        # Última fila propia de cada ticker
+        has_rows = self.valid_rows > 0
+        last_idx = self.close.shape[0] - 1 - np.argmax(self.mask[::-1], axis=0)
+        self._last_idx = np.where(has_rows, last_idx, 0)
+        self._cols = np.arange(n_cols)
+        
+        self._atr_cache: Dict[int, np.ndarray] = {}
+    
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "BatchRiskManager":
+        """Construye las matrices alineadas a partir de DataFrames por ticker"""
+        from classes.panel import AssetPanel
+        return AssetPanel.from_frames(frames).risk_manager()
+    
+    def _validate_shapes(self):
+        if self.close.ndim != 2:
+            raise ValueError(f"Se esperaban matrices 2-D, recibido ndim={self.close.ndim}")
+        if self.high.shape != self.close.shape or self.low.shape != self.close.shape:
+            raise ValueError("High, Low y Close deben tener la misma forma")
+    
+    def calculate_atr(self, period: int = 14) -> np.ndarray:
+        """ATR completo (fechas x tickers), con cache por periodo"""
+        if period in self._atr_cache:
+            cache_hit("atr_matrix")
+        else:
+            cache_miss("atr_matrix")
+            self._atr_cache[period] = _atr_matrix_numba(
+                self.high, self.low, self.close, self.mask, period
+            )
+        return self._atr_cache[period]
+    
+    def last_close(self) -> np.ndarray:
+        """Último cierre propio de cada ticker"""
+        return self.close[self._last_idx, self._cols]
+    
+    def get_trade_setups(
+        self,
+        entry_prices: Optional[np.ndarray] = None,
+        atr_multiplier: Union[float, np.ndarray] = 2.0,
+        risk_reward_ratio: Union[float, np.ndarray] = 2.0
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Calcula el setup de todos los tickers para LONG y SHORT.
+        
+        atr_multiplier y risk_reward_ratio pueden ser escalares o arrays por
+        ticker (salidas elegidas por el optimizador para cada uno).
+        
+        Returns:
+            {"LONG": {...}, "SHORT": {...}} con arrays por ticker y la
+            máscara 'valid' (False donde get_trade_setup devolvería None).
+        """
+        if entry_prices is None:
+            entry_prices = self.last_close()
+        entry = np.asarray(entry_prices, dtype=np.float64)
+        atr_multiplier = np.broadcast_to(np.asarray(atr_multiplier, dtype=np.float64), entry.shape)
+        risk_reward_ratio = np.broadcast_to(np.asarray(risk_reward_ratio, dtype=np.float64), entry.shape)
+        
+        current_atr = self.calculate_atr()[self._last_idx, self._cols]
+        
+        with np.errstate(invalid='ignore'):
+            base_valid = (
+                self.valid_tickers &
+                (entry > 0) &
+                ~np.isnan(current_atr) &
+                (current_atr > 0)
+            )
+        
+        stop_distance = current_atr * atr_multiplier
+        setups = {}
+        
+        for direction in self.DIRECTIONS:
+            if direction == "LONG":
+                stop_loss = entry - stop_distance
+                risk_per_share = entry - stop_loss
+                take_profit = entry + (risk_per_share * risk_reward_ratio)
+            else:  # SHORT
+                stop_loss = entry + stop_distance
+                risk_per_share = stop_loss - entry
+                take_profit = entry - (risk_per_share * risk_reward_ratio)
+            
+            with np.errstate(invalid='ignore'):
+                valid = base_valid & (risk_per_share > 0)
+            
+            setups[direction] = {
+                "entry": np.round(entry, 2),
+                "stop_loss": np.round(stop_loss, 2),
+                "take_profit": np.round(take_profit, 2),
+                "atr": np.round(current_atr, 2),
+                "risk_per_share": np.round(risk_per_share, 2),
+                "potential_gain": np.round(risk_per_share * risk_reward_ratio, 2),
+                "rr_ratio": risk_reward_ratio.copy(),
+                "valid": valid
+            }
+        
+        return setups
+    
+    def calculate_position_sizes(
+        self,
+        account_size: float,
+        risk_pct_per_trade: float,
+        setups: Dict[str, Dict[str, np.ndarray]]
+    ) -> Dict[str, np.ndarray]:
+        """Unidades por ticker y dirección (0.0 donde no hay setup válido)"""
+        return {
+            direction: self.position_sizes(
+                account_size, risk_pct_per_trade,
+                setup['risk_per_share'], setup['entry'], setup['valid']
+            )
+            for direction, setup in setups.items()
+        }
+    
+    @staticmethod
+    def position_sizes(
+        account_size: float,
+        risk_pct_per_trade: float,
+        risk_per_share: np.ndarray,
+        entry: np.ndarray,
+        valid: np.ndarray
+    ) -> np.ndarray:
+        """
+        Versión vectorizada de RiskManager.position_size sobre arrays de
+        setups ya calculados (sin matrices de precios).
+        """
+        if account_size <= 0:
+            raise ValueError(f"account_size debe ser > 0")
+        if not (0 < risk_pct_per_trade <= 0.1):
+            raise ValueError(f"risk_pct_per_trade fuera de rango")
+        
+        risk_amount = account_size * risk_pct_per_trade
+        risk_per_share = np.asarray(risk_per_share, dtype=np.float64)
+        entry = np.asarray(entry, dtype=np.float64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            units_by_risk = risk_amount / risk_per_share
+            max_units_by_capital = account_size / entry
+            final_units = np.round(np.minimum(units_by_risk, max_units_by_capital), 4)
+            usable = np.asarray(valid, dtype=np.bool_) & (risk_per_share > 0)
+        
+        return np.where(usable, final_units, 0.0)
+    
+    def get_setup_dict(
+        self,
+        setups: Dict[str, Dict[str, np.ndarray]],
+        ticker: str,
+        direction: str = "LONG"
+    ) -> Optional[Dict[str, float]]:
+        """Extrae el setup de un ticker con el mismo formato que get_trade_setup"""
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Dirección inválida: {direction}")
+        
+        j = self._ticker_idx[ticker]
+        setup = setups[direction]
+        if not setup['valid'][j]:
+            return None
+        
+        return {
+            "entry": float(setup['entry'][j]),
+            "direction": direction,
+            "stop_loss": float(setup['stop_loss'][j]),
+            "take_profit": float(setup['take_profit'][j]),
+            "atr": float(setup['atr'][j]),
+            "risk_per_share": float(setup['risk_per_share'][j]),
+            "potential_gain": float(setup['potential_gain'][j]),
+            "rr_ratio": float(setup['rr_ratio'][j])
+        }
@@ -0,0 +1,466 @@
+# classes/scanner.py - ESCANEO DEL UNIVERSO (SIN STREAMLIT)
+import concurrent.futures
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config as cfg
+from classes.scout import AssetScout
+from classes.strategies import (
+    GoldenCrossStrategy, MeanReversionStrategy, BollingerBreakoutStrategy,
+    MACDStrategy, EMAStrategy, StochRSIStrategy, AwesomeOscillatorStrategy,
+    get_strategy_by_name
+)
+from classes.strategies_pro import SuperTrendStrategy, SqueezeMomentumStrategy, ADXStrategy
+from classes.risk_manager import BatchRiskManager
+from classes.trades import last_bar_events
+from classes.universe import chunked
+from classes.screener import latest_indicators
+from utils.telemetry import span, scan, TELEMETRY
+from utils.profiler import profile
+from utils.metrics import MonitoredThreadPool
+
+"""
+Lógica de escaneo del radar, utilizable sin sesión de Streamlit
+(scheduler en segundo plano, CLI, benchmarks):
+1. analizar_senal / procesar_ticker: señal, dirección y setup de riesgo por ticker
+2. scan_universe: escaneo paralelo con telemetría, perfil y pool monitorizado;
+   los setups y unidades de cada lote salen de un único BatchRiskManager;
+   scan_in_chunks lo aplica por lotes de APP.max_tickers_por_escaneo
+   (solo los datos de un lote en memoria)
+3. Cada resultado lleva 'indicadores' (classes.screener) para filtrar con
+   expresiones sobre el snapshot
+4. dimensionar(_lote) / es_accionable: adaptan resultados compartidos al
+   capital, riesgo y filtros de cada sesión sin repetir el escaneo
+"""
+
+
+# ============================================
+# ANÁLISIS POR TICKER
+# ============================================
+
+def instanciar_estrategia(strat_name: str):
+    """
+    Factory pattern para instanciar estrategias.
+    Más limpio y mantenible que if/elif gigantes.
+    """
+    estrategias_map = {
+        "Golden Cross": GoldenCrossStrategy,
+        "Mean Reversion": MeanReversionStrategy,
+        "Bollinger": BollingerBreakoutStrategy,
+        "MACD": MACDStrategy,
+        "EMA": EMAStrategy,
+        "Stochastic": StochRSIStrategy,
+        "Awesome": AwesomeOscillatorStrategy,
+        "SuperTrend": SuperTrendStrategy,
+        "Squeeze": SqueezeMomentumStrategy,
+        "ADX": ADXStrategy
+    }
+    
+    for keyword, strategy_class in estrategias_map.items():
+        if keyword in strat_name:
+            return strategy_class()
+    
+    return None
+
+
+def analizar_senal(
+    df: pd.DataFrame, 
+    strat_name: str, 
+    params: Dict
+) -> Tuple[str, str, bool]:
+    """
+    Analiza la señal actual y determina tipo, dirección y validez.
+    
+    Returns:
+        (tipo_señal, direccion, es_valida)
+    """
+    if len(df) < 2:
+        return "NEUTRO", "NONE", False
+    
+    today = df.iloc[-1]
+    signal_val = today.get('Signal', 0)
+    
+    # Entrada nueva / salida en la última vela según la lista de operaciones
+    if 'Signal' in df.columns:
+        is_new, just_exited = last_bar_events(df['Signal'].values, df['Close'].values)
+    else:
+        is_new, just_exited = False, False
+    
+    # ========== SEÑALES LONG ==========
+    if signal_val == 1:
+        
+        # Estrategias Clásicas
+        if "Golden Cross" in strat_name:
+            return ("ENTRADA CRUCE", "LONG", True) if is_new else ("MANTENER TENDENCIA", "LONG", False)
+        
+        elif "Mean Reversion" in strat_name:
+            return "ENTRADA REBOTE", "LONG", True
+        
+        elif "MACD" in strat_name:
+            return "ENTRADA MOMENTUM", "LONG", True
+        
+        elif "EMA" in strat_name:
+            return ("ENTRADA EMA", "LONG", True) if is_new else ("MANTENER EMA", "LONG", False)
+        
+        elif "Stochastic" in strat_name:
+            stoch_k = today.get('Stoch_K', 50)
+            return ("ENTRADA STOCH", "LONG", True) if (is_new and stoch_k < 50) else ("MANTENER STOCH", "LONG", False)
+        
+        elif "Awesome" in strat_name:
+            return ("ENTRADA AO", "LONG", True) if is_new else ("MANTENER AO", "LONG", False)
+        
+        # Estrategias PRO
+        elif "SuperTrend" in strat_name:
+            return ("CAMBIO TENDENCIA 🔥", "LONG", True) if is_new else ("MANTENER SUPERTREND", "LONG", False)
+        
+        elif "Squeeze" in strat_name:
+            return ("DISPARO SQUEEZE 🚀", "LONG", True) if is_new else ("MANTENER SQUEEZE", "LONG", False)
+        
+        elif "ADX" in strat_name:
+            return ("INICIO TENDENCIA FUERTE", "LONG", True) if is_new else ("MANTENER TENDENCIA ADX", "LONG", False)
+        
+        elif "Bollinger" in strat_name:
+            return ("RUPTURA ALCISTA", "LONG", True) if is_new else ("MANTENER RUPTURA", "LONG", False)
+    
+    # ========== SEÑALES SHORT ==========
+    elif signal_val == 0:
+        # Mean Reversion Short
+        if "Mean Reversion" in strat_name and today.get('RSI', 0) > params.get('rsi_high', 70):
+            return "ENTRADA SHORT (SOBRECOMPRA)", "SHORT", True
+        
+        # Stoch Short
+        elif "Stochastic" in strat_name:
+            stoch_k = today.get('Stoch_K', 0)
+            stoch_d = today.get('Stoch_D', 0)
+            if stoch_k > 80 and stoch_k < stoch_d:
+                return "ENTRADA SHORT (STOCH)", "SHORT", True
+        
+        # EMA Short
+        elif "EMA" in strat_name and 'EMA_Fast' in df.columns and 'EMA_Slow' in df.columns:
+            if df['EMA_Fast'].iloc[-1] < df['EMA_Slow'].iloc[-1] and df['EMA_Fast'].iloc[-2] >= df['EMA_Slow'].iloc[-2]:
+                return "ENTRADA SHORT (EMA)", "SHORT", True
+        
+        # SuperTrend Short
+        elif "SuperTrend" in strat_name and just_exited:
+            return "CAMBIO TENDENCIA (SHORT)", "SHORT", True
+        
+        # Squeeze Short
+        elif "Squeeze" in strat_name and 'Momentum' in df.columns:
+            if df['Momentum'].iloc[-1] < 0 and df['Momentum'].iloc[-2] >= 0:
+                return "MOMENTUM BAJISTA", "SHORT", True
+    
+    return "NEUTRO", "NONE", False
+
+
+def procesar_ticker(
+    ticker: str,
+    capital_dinamico: float,
+    riesgo_decimal: float,
+    solo_accion: bool,
+    data: Optional[pd.DataFrame] = None
+) -> Optional[Dict]:
+    """
+    Procesa un ticker individual y retorna resultado estructurado.
+    Preparado para paralelización; los errores quedan en la telemetría
+    del escaneo activo.
+    """
+    try:
+        with span("ticker", ticker):
+            return _procesar_ticker(ticker, capital_dinamico, riesgo_decimal, solo_accion, data)
+    except Exception as e:
+        TELEMETRY.error(ticker, str(e))
+        return None
+
+
+def _procesar_ticker(
+    ticker: str,
+    capital_dinamico: float,
+    riesgo_decimal: float,
+    solo_accion: bool,
+    data: Optional[pd.DataFrame] = None
+) -> Optional[Dict]:
+    """Etapas de procesar_ticker, cada una con su span de telemetría"""
+    analizado = _analizar_ticker(ticker, solo_accion, data)
+    if analizado is None:
+        return None
+    return _calcular_riesgo([analizado], capital_dinamico, riesgo_decimal)[0]
+
+
+def _analizar_en_pool(ticker: str, solo_accion: bool, data: Optional[pd.DataFrame]) -> Optional[tuple]:
+    """_analizar_ticker para el pool de scan_universe (errores a la telemetría)"""
+    try:
+        with span("ticker", ticker):
+            return _analizar_ticker(ticker, solo_accion, data)
+    except Exception as e:
+        TELEMETRY.error(ticker, str(e))
+        return None
+
+
+def _analizar_ticker(
+    ticker: str,
+    solo_accion: bool,
+    data: Optional[pd.DataFrame] = None
+) -> Optional[Tuple[Dict, pd.DataFrame, Dict]]:
+    """
+    Optimización, señal y métricas de un ticker (sin setup de riesgo).
+    
+    Returns:
+        (resultado sin dimensionar, histórico con señales, salidas del ganador)
+    """
+    with span("optimize", ticker):
+        scout = AssetScout(ticker, data=data)
+        winner = scout.optimize()
+    
+    if not winner or scout.data is None or scout.data.empty:
+        return None
+    
+    df = scout.data
+    strat_name = winner['Estrategia']
+    params = winner['Params']
+    
+    # Instanciar estrategia
+    strat_obj = instanciar_estrategia(strat_name)
+    if not strat_obj:
+        return None
+    
+    # Generar señales
+    with span("generate_signals", ticker):
+        df = strat_obj.generate_signals(df, params)
+    if 'Signal' not in df.columns:
+        df['Signal'] = 0
+    
+    # Analizar señal
+    with span("analyze", ticker):
+        tipo, direction, es_valida = analizar_senal(df, strat_name, params)
+    
+    # Filtrar según preferencias
+    if solo_accion and not es_valida:
+        return None
+    
+    if tipo == "NEUTRO" and solo_accion:
+        return None
+    
+    # Métricas de la dirección operada: los SHORT se evalúan con su propia
+    # pata del backtest long/short, no con el resultado long-only
+    metricas = {
+        'return': winner.get('Retorno', 0),
+        'sharpe': winner.get('Sharpe', 0),
+        'drawdown': winner.get('Drawdown', 0)
+    }
+    if direction == "SHORT":
+        # Las reglas short viven en las clases de classes.strategies
+        strat_ls = get_strategy_by_name(strat_name) or strat_obj
+        with span("backtest_short", ticker):
+            metricas = strat_ls.backtest_long_short(df, params)['short']
+    
+    # Salidas elegidas por el optimizador (o las de config)
+    stops = winner.get('Stops') or {}
+    stops = {
+        'atr_multiplier': stops.get('atr_multiplier', cfg.ATR_MULTIPLIER),
+        'rr_ratio': stops.get('rr_ratio', cfg.RR_RATIO)
+    }
+    
+    resultado = {
+        'ticker': ticker,
+        'tipo': tipo,
+        'direction': direction,
+        'es_valida': es_valida,
+        'estrategia': strat_name,
+        'precio': df['Close'].iloc[-1],
+        'units': 0.0,
+        'inversion': 0.0,
+        'stop_loss': 0.0,
+        'take_profit': 0.0,
+        'retorno': metricas['return'],
+        'sharpe': metricas['sharpe'],
+        'drawdown': metricas['drawdown'],
+        'setup': None,
+        'retornos': df['Close'].pct_change().tail(cfg.RISK.ventana_correlacion),
+        # Últimos valores para el screener (filtrar sin re-escanear)
+        'indicadores': latest_indicators(df)
+    }
+    return resultado, df, stops
+
+
+def _calcular_riesgo(
+    analizados: List[Tuple[Dict, pd.DataFrame, Dict]],
+    capital: float,
+    riesgo: float
+) -> List[Dict]:
+    """
+    Setup de riesgo y unidades de todos los resultados de un lote con un
+    único BatchRiskManager (mismos valores que RiskManager.get_trade_setup
+    y calculate_position_size por ticker). Un ticker repetido se dimensiona
+    una vez (el primer resultado).
+    """
+    unicos = {}
+    for analizado in analizados:
+        unicos.setdefault(analizado[0]['ticker'], analizado)
+    if not unicos:
+        return []
+    
+    with span("risk"):
+        # Entradas y stops en el orden de las columnas del lote
+        batch = BatchRiskManager.from_frames({t: df for t, (_, df, _) in unicos.items()})
+        columnas = [unicos[t] for t in batch.tickers]
+        setups = batch.get_trade_setups(
+            entry_prices=np.array([r['precio'] for r, _, _ in columnas], dtype=float),
+            atr_multiplier=np.array([stops['atr_multiplier'] for _, _, stops in columnas], dtype=float),
+            risk_reward_ratio=np.array([stops['rr_ratio'] for _, _, stops in columnas], dtype=float)
+        )
+        units = batch.calculate_position_sizes(capital, riesgo, setups)
+    
+    columna = {t: j for j, t in enumerate(batch.tickers)}
+    resultados = []
+    for resultado, _, _ in unicos.values():
+        j = columna[resultado['ticker']]
+        direction = resultado['direction'] if resultado['direction'] != "NONE" else "LONG"
+        setup = batch.get_setup_dict(setups, resultado['ticker'], direction)
+        resultado = {**resultado, 'setup': setup}
+        if setup and resultado['es_valida']:
+            resultado.update(
+                units=float(units[direction][j]),
+                inversion=float(units[direction][j]) * resultado['precio'],
+                stop_loss=setup['stop_loss'],
+                take_profit=setup['take_profit']
+            )
+        resultados.append(resultado)
+    return resultados
+
+
+# ============================================
+# ESCANEO DEL UNIVERSO
+# ============================================
+
+def scan_universe(
+    tickers: List[str],
+    capital: Optional[float] = None,
+    riesgo: Optional[float] = None,
+    solo_accion: bool = False,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    data: Optional[Dict[str, pd.DataFrame]] = None
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Procesa `tickers` en paralelo (un registro de telemetría por escaneo).
+    
+    Args:
+        on_progress: callback(completados, total), llamado desde el hilo que escanea
+        data: OHLCV ya descargado por ticker (sin descargas)
+    
+    Returns:
+        (resultados en el orden de `tickers`, errores "TICKER: mensaje")
+    """
+    capital = cfg.CAPITAL_TOTAL if capital is None else capital
+    riesgo = cfg.RIESGO_POR_OPERACION if riesgo is None else riesgo
+    workers = max_workers or cfg.APP.max_workers_paralelo
+    data = data or {}
+    tickers = list(dict.fromkeys(tickers))
+    
+    by_ticker = {}
+    with scan("radar", tickers) as record, profile("scan", "radar"), \
+            MonitoredThreadPool("radar", max_workers=workers) as executor:
+        # Dentro de scan_in_chunks el registro es el del escaneo exterior
+        n_errors = len(record.errors)
+        futures = {
+            executor.submit(_analizar_en_pool, ticker, solo_accion, data.get(ticker)): ticker
+            for ticker in tickers
+        }
+        for completed, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+            analizado = future.result()
+            if analizado:
+                by_ticker[futures[future]] = analizado
+            if on_progress:
+                on_progress(completed, len(tickers))
+        
+        # Setups y unidades de todo el lote en una sola pasada vectorizada
+        analizados = [by_ticker[t] for t in tickers if t in by_ticker]
+        try:
+            results = _calcular_riesgo(analizados, capital, riesgo)
+        except Exception:
+            # Un ticker que rompe el lote no arrastra al resto: uno a uno
+            results = []
+            for analizado in analizados:
+                try:
+                    results.extend(_calcular_riesgo([analizado], capital, riesgo))
+                except Exception as e:
+                    TELEMETRY.error(analizado[0]['ticker'], str(e))
+        errors = record.errors[n_errors:]
+    
+    return results, errors
+
+
+def scan_in_chunks(
+    tickers: List[str],
+    chunk_size: Optional[int] = None,
+    load_data: Optional[Callable[[List[str]], Tuple[Dict[str, pd.DataFrame], Dict[str, str]]]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    **kwargs
+) -> Tuple[List[Dict], List[str]]:
+    """
+    scan_universe por lotes de `chunk_size` (APP.max_tickers_por_escaneo).
+    
+    Args:
+        load_data: callback(lote) -> (frames, errores) (p.ej. data_cache.load_many);
+            sin él cada ticker se descarga dentro de procesar_ticker
+        on_progress: callback(completados, total) sobre el universo completo
+        **kwargs: capital, riesgo, solo_accion, max_workers de scan_universe
+    """
+    chunk_size = chunk_size or cfg.APP.max_tickers_por_escaneo
+    tickers = list(dict.fromkeys(tickers))
+    results, errors = [], []
+    offset = 0
+    with scan("radar", tickers):
+        for chunk in chunked(tickers, chunk_size):
+            data = None
+            if load_data:
+                data, load_errors = load_data(chunk)
+                errors += [f"{t}: {msg}" for t, msg in load_errors.items()]
+            progress = (lambda done, _, base=offset: on_progress(base + done, len(tickers))) if on_progress else None
+            chunk_results, chunk_errors = scan_universe(
+                [t for t in chunk if data is None or t in data],
+                on_progress=progress, data=data, **kwargs
+            )
+            results += chunk_results
+            errors += chunk_errors
+            offset += len(chunk)
+            if on_progress and data is not None:
+                on_progress(offset, len(tickers))
+            # Los datos del lote se liberan antes de cargar el siguiente
+            del data
+    return results, errors
+
+
+def es_accionable(resultado: Dict) -> bool:
+    """Mismo criterio que procesar_ticker con solo_accion=True"""
+    return resultado['es_valida'] and resultado['tipo'] != "NEUTRO"
+
+
+def dimensionar(resultado: Dict, capital: float, riesgo: float) -> Dict:
+    """
+    Copia del resultado con unidades e inversión para el capital y riesgo
+    de una sesión (el escaneo compartido usa los de config).
+    """
+    return dimensionar_lote([resultado], capital, riesgo)[0]
+
+
+def dimensionar_lote(resultados: List[Dict], capital: float, riesgo: float) -> List[Dict]:
+    """
+    dimensionar() de varios resultados a la vez: las unidades salen de los
+    setups ya calculados en el escaneo con una única operación vectorizada.
+    """
+    if not resultados:
+        return []
+    setups = [r.get('setup') if r['es_valida'] else None for r in resultados]
+    units = BatchRiskManager.position_sizes(
+        capital, riesgo,
+        risk_per_share=np.array([s['risk_per_share'] if s else np.nan for s in setups], dtype=float),
+        entry=np.array([s['entry'] if s else np.nan for s in setups], dtype=float),
+        valid=np.array([s is not None for s in setups])
+    )
+    return [
+        {**r, 'units': float(u), 'inversion': float(u) * r['precio']} if s else dict(r)
+        for r, s, u in zip(resultados, setups, units)
+    ]
@@ -1,17 +1,112 @@
 # classes/scout.py - VERSIÓN CORREGIDA COMPLETA
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import config as cfg
 from typing import Dict, List, Optional
 import concurrent.futures
+import copy
+import threading
+import time
 import streamlit as st
 
 # Importamos las Clásicas
 from classes.strategies import (
     GoldenCrossStrategy, MeanReversionStrategy, BollingerBreakoutStrategy, 
     MACDStrategy, EMAStrategy, StochRSIStrategy, AwesomeOscillatorStrategy,
-    SuperTrendStrategy, SqueezeMomentumStrategy, ADXStrategy
+    SuperTrendStrategy, SqueezeMomentumStrategy, ADXStrategy,
+    metrics_from_returns
 )
+from classes.streaming import StreamingStrategy
+from utils.telemetry import span, scan, TELEMETRY
+from utils.profiler import profile
+from utils.metrics import (
+    track_fetch, cache_hit, cache_miss, MonitoredThreadPool, EVALUATIONS, EVALUATIONS_PER_SECOND
+)
+
+
+# ============================================
+# GRID DE PARÁMETROS Y SCORE
+# ============================================
+
+# Combinaciones evaluadas por estrategia, en orden de evaluación
+PARAM_GRID: Dict[str, List[Dict]] = {
+    # PRO
+    "SuperTrend Pro": [
+        {'period': 10, 'multiplier': 3.0},
+        {'period': 12, 'multiplier': 3.0}
+    ],
+    "Squeeze Momentum": [
+        {'bb_len': 20, 'bb_mult': 2.0, 'kc_len': 20, 'kc_mult': 1.5}
+    ],
+    "ADX & DI Trend": [
+        {'period': 14, 'adx_threshold': 20},
+        {'period': 14, 'adx_threshold': 25}
+    ],
+    # CLÁSICAS
+    "Golden Cross (Trend)": [
+        {'fast': 20, 'slow': 100},
+        {'fast': 50, 'slow': 200}
+    ],
+    "RSI Mean Reversion": [
+        {'rsi_low': 25, 'rsi_high': 70},
+        {'rsi_low': 30, 'rsi_high': 70}
+    ],
+    "Bollinger Breakout": [
+        {'window': 20, 'std_dev': 2}
+    ],
+    "MACD Momentum": [
+        {'fast': 12, 'slow': 26, 'signal': 9}
+    ],
+    "EMA 8/21 Crossover": [
+        {'fast': 8, 'slow': 21},
+        {'fast': 5, 'slow': 13}
+    ],
+    "Stochastic RSI": [
+        {'rsi_period': 14, 'stoch_period': 14, 'k_period': 3, 'd_period': 3}
+    ],
+    "Awesome Oscillator": [
+        {'fast': 5, 'slow': 34}
+    ],
+}
+
+# Salidas (atr_multiplier, rr_ratio) evaluadas junto a cada combinación;
+# la primera es la de RiskConfig (la que aplica el radar)
+STOP_GRID: List[tuple] = [
+    (cfg.RISK.atr_multiplier, cfg.RISK.rr_ratio),
+    (1.0, 2.0),
+    (2.0, 2.0),
+    (1.5, 3.0),
+    (2.5, 1.5),
+    (3.0, 3.0)
+]
+
+MAX_DRAWDOWN_ADMITIDO = -0.60
+
+# Pesos del score: (retorno, sharpe, |drawdown|)
+SCORE_WEIGHTS = (1.0, 0.1, 0.5)
+
+# Sharpe máximo supuesto al podar candidatos que ya no pueden ganar
+SHARPE_MAX_PODA = 6.0
+
+
+def calculate_score(ret, sharpe, dd):
+    """Score combinado del optimizador (acepta escalares o arrays NumPy)"""
+    w_ret, w_sharpe, w_dd = SCORE_WEIGHTS
+    return ret * w_ret + (sharpe * w_sharpe) - (abs(dd) * w_dd)
+
+
+# Backtests reanudables de las configuraciones guardadas:
+# (ticker, estrategia, params) -> {"state": BacktestState, "engine": StreamingStrategy, ...}
+_INCREMENTAL_BACKTESTS: Dict[tuple, Dict] = {}
+# Un lock por clave (el global solo protege el registro de locks)
+_INCREMENTAL_KEY_LOCKS: Dict[tuple, threading.Lock] = {}
+_INCREMENTAL_LOCK = threading.Lock()
+
+
+def _incremental_lock(key: tuple) -> threading.Lock:
+    with _INCREMENTAL_LOCK:
+        return _INCREMENTAL_KEY_LOCKS.setdefault(key, threading.Lock())
 
 
 class AssetScout:
@@ -19,10 +114,20 @@ class AssetScout:
     Scout optimizado con cache y paralelización.
     """
     
-    def __init__(self, ticker: str):
+    def __init__(self, ticker: str, data: Optional[pd.DataFrame] = None, period: str = "2y"):
         self.ticker = ticker.upper().strip()
-        self.data = self._download_data()  # SIN parámetro ticker
+        self.period = period
+        # Si se pasan datos (procesos worker, tests) no se descarga nada
+        self.data = data if data is not None else self._download_data()
         self.strategies = self._initialize_strategies()
+        # Señales que deja la optimización: (estrategia, params) -> Signal
+        self._signals: Dict[tuple, np.ndarray] = {}
+        # (clave del grid, candidatos, matriz de retornos) de candidate_returns
+        self._returns_cache = None
+        # Con RISK.optimizar_stops: (copia de datos, ATR) y retornos por barra
+        # de la salida de STOP_GRID elegida para cada (estrategia, params)
+        self._stop_frame = None
+        self._stop_returns: Dict[tuple, np.ndarray] = {}
         
     def _initialize_strategies(self) -> List:
         """Inicializa todas las estrategias una sola vez"""
@@ -47,7 +152,8 @@ class AssetScout:
         NOTA: Usa self.ticker, no recibe parámetro.
         """
         try:
-            df = yf.Ticker(self.ticker).history(period="2y")
+            with span("download", self.ticker), track_fetch("yfinance"):
+                df = yf.Ticker(self.ticker).history(period=self.period)
             
             if df.empty:
                 st.warning(f"⚠️ {self.ticker}: Sin datos históricos")
@@ -63,22 +169,44 @@ class AssetScout:
             st.error(f"❌ Error descargando {self.ticker}: {e}")
             return pd.DataFrame()
     
-    def optimize(self, force_recalc: bool = False) -> Optional[Dict]:
+    def optimize(self, force_recalc: bool = False, search: str = "grid") -> Optional[Dict]:
         """
         Optimiza estrategia para el ticker.
+        
+        Args:
+            search: "grid" (PARAM_GRID) o "adaptive" (espacios completos de
+                classes.search con presupuesto de AppConfig)
         """
         if self.data.empty:
             return None
         
         # Modo rápido: cargar configuración guardada
         if not force_recalc and self._has_saved_config():
-            result = self._load_saved_config()
+            with span("saved_config", self.ticker):
+                result = self._load_saved_config()
             if result:
+                cache_hit("saved_config")
                 return result
+        cache_miss("saved_config")
         
-        # Modo lento: grid search optimizado
-        return self._run_grid_search()
-    
+        # Modo lento: grid search optimizado o búsqueda adaptativa
+        if search == "adaptive":
+            with span("adaptive_search", self.ticker):
+                return self._run_adaptive_search()
+        with span("grid_search", self.ticker):
+            return self._run_grid_search()
+
+    def walk_forward(self, train_bars: int = 252, test_bars: int = 63, step: Optional[int] = None) -> pd.DataFrame:
+        """
+        Validación walk-forward: optimiza en cada ventana de train y mide en
+        el test siguiente. Devuelve métricas fuera de muestra por estrategia.
+        """
+        from classes.walk_forward import walk_forward_ticker
+
+        if self.data.empty:
+            return pd.DataFrame()
+        return walk_forward_ticker(self.ticker, self.data, train_bars, test_bars, step)
+
     def _has_saved_config(self) -> bool:
         """Verifica si existe configuración guardada"""
         return (
@@ -102,9 +230,9 @@ class AssetScout:
             return None
         
         try:
-            metrics = strat_obj.backtest(self.data, params)
+            metrics = self._incremental_backtest(strat_obj, params)
             
-            return {
+            result = {
                 "Ticker": self.ticker,
                 "Estrategia": strat_name,
                 "Retorno": metrics["return"],
@@ -113,98 +241,471 @@ class AssetScout:
                 "Params": params,
                 "Source": "CACHE"
             }
+            if saved_config.get('stops'):
+                result["Stops"] = dict(saved_config['stops'])
+            return result
         except Exception as e:
             st.warning(f"⚠️ Error en backtest de {self.ticker}: {e}")
             return None
     
-    def _run_grid_search(self) -> Optional[Dict]:
-        """Ejecuta grid search optimizado"""
-        best_score = -999
-        best_result = None
+    def _incremental_backtest(self, strat_obj, params: Dict) -> Dict:
+        """
+        Backtest de una configuración fija reutilizando el estado anterior.
         
-        def evaluate_iteration(strat_obj, params):
-            nonlocal best_score, best_result
+        La primera llamada hace el backtest completo y guarda su estado; las
+        siguientes solo procesan las barras nuevas (señal incremental + Welford).
+        Si la última barra guardada reaparece con otros valores (vela
+        provisional que ya cerró) se deshace y se vuelve a aplicar.
+        Las métricas quedan ancladas al inicio del primer histórico descargado.
+        """
+        key = (self.ticker, strat_obj.name, repr(sorted(params.items())))
+        
+        # El lock de la clave cubre toda la actualización: dos llamadas
+        # concurrentes nunca aplican las mismas barras dos veces
+        with _incremental_lock(key):
+            entry = _INCREMENTAL_BACKTESTS.get(key)
+            if entry is not None:
+                metrics = self._resume_incremental(entry)
+                if metrics is not None:
+                    cache_hit("incremental_backtest")
+                    return metrics
             
-            try:
-                metrics = strat_obj.backtest(self.data, params)
-                
-                ret = metrics["return"]
-                sharpe = metrics["sharpe"]
-                dd = metrics["drawdown"]
-                
-                # Early stopping
-                if dd < -0.60:
-                    return
-                
-                # Score combinado
-                score = ret + (sharpe * 0.1) - (abs(dd) * 0.5)
-                
-                if score > best_score:
-                    best_score = score
-                    best_result = {
-                        "Ticker": self.ticker,
-                        "Estrategia": strat_obj.name,
-                        "Retorno": ret,
-                        "Sharpe": sharpe,
-                        "Drawdown": dd,
-                        "Params": params,
-                        "Source": "OPTIMIZED"
+            cache_miss("incremental_backtest")
+            metrics = strat_obj.backtest(self.data, params)
+            state = metrics.get("state")
+            if state is not None:
+                try:
+                    engine = StreamingStrategy.from_history(
+                        strat_obj.name, params, self.data, last_signal=state.last_signal
+                    )
+                    _INCREMENTAL_BACKTESTS[key] = {
+                        "state": state,
+                        "engine": engine,
+                        "last_bar": self._bar_values(self.data.iloc[-1]),
+                        # (state, engine) antes de la última barra; None hasta la primera actualización
+                        "previous": None
                     }
-                
+                except Exception:
+                    pass
+            return metrics
+    
+    @staticmethod
+    def _bar_values(row: pd.Series) -> np.ndarray:
+        return np.array([row.get(c, np.nan) for c in ('Open', 'High', 'Low', 'Close')], dtype=float)
+    
+    def _resume_incremental(self, entry: Dict) -> Optional[Dict]:
+        """
+        Aplica las barras nuevas a una entrada de _INCREMENTAL_BACKTESTS
+        (con el lock de su clave tomado). None si hay que rehacer el backtest.
+        """
+        last_ts = entry["state"].last_timestamp
+        if last_ts not in self.data.index:
+            return None
+        
+        bars = self.data.loc[self.data.index >= last_ts]
+        if not np.array_equal(self._bar_values(bars.iloc[0]), entry["last_bar"], equal_nan=True):
+            # La última barra aplicada era provisional: se vuelve al estado anterior
+            if entry["previous"] is None:
+                return None
+            entry["state"], entry["engine"] = copy.deepcopy(entry["previous"])
+        else:
+            bars = bars.iloc[1:]
+        
+        state, engine = entry["state"], entry["engine"]
+        cols = [c for c in ['Open', 'High', 'Low', 'Close'] if c in bars.columns]
+        for i, (ts, row) in enumerate(zip(bars.index, bars[cols].itertuples(index=False))):
+            bar = dict(zip(cols, row))
+            if i == len(bars) - 1:
+                entry["previous"] = copy.deepcopy((state, engine))
+                entry["last_bar"] = self._bar_values(bars.iloc[-1])
+            state.update(bar['Close'], engine.update(bar), ts)
+        return state.metrics()
+    
+    def _run_adaptive_search(self) -> Optional[Dict]:
+        """
+        Successive halving + búsqueda guiada sobre PARAM_SPACES; con
+        RISK.optimizar_stops el ganador se evalúa con cada salida de STOP_GRID.
+        """
+        from classes.search import AdaptiveSearch
+        
+        winner = AdaptiveSearch(self.data).run(self.ticker)
+        if winner is None or not cfg.RISK.optimizar_stops:
+            return winner
+        strat_obj = next(s for s in self.strategies if s.name == winner["Estrategia"])
+        with_stops = self.optimize_with_stops(candidates=[(strat_obj, winner["Params"])])
+        return {**with_stops, "Source": winner["Source"]} if with_stops else winner
+    
+    def _evaluate_candidate(self, strat_obj, params: Dict, best_score: float = -np.inf) -> Optional[tuple]:
+        """
+        Evaluación de una combinación, común a grid search, anytime y research.
+        
+        Sin stops, backtest con el kernel compilado, que deja de recorrer
+        barras en cuanto el drawdown supera el admitido o el candidato ya no
+        puede superar best_score. Con RISK.optimizar_stops, la mejor salida
+        admitida de STOP_GRID (resultado con "Stops" y "Operaciones").
+        
+        Returns:
+            (score, resultado) o None si falla o se descarta
+        """
+        if cfg.RISK.optimizar_stops:
+            best = self._best_stop_run(strat_obj, params)
+            if best is None:
+                return None
+            score, (atr_mult, rr), res = best
+            return score, {
+                "Ticker": self.ticker,
+                "Estrategia": strat_obj.name,
+                "Retorno": res["return"],
+                "Sharpe": res["sharpe"],
+                "Drawdown": res["drawdown"],
+                "Params": params,
+                "Stops": {"atr_multiplier": atr_mult, "rr_ratio": rr},
+                "Operaciones": len(res["trades"]),
+                "Source": "OPTIMIZED"
+            }
+        
+        try:
+            metrics = strat_obj.backtest_fast(
+                self.data, params,
+                max_drawdown=MAX_DRAWDOWN_ADMITIDO,
+                best_score=best_score,
+                sharpe_cap=SHARPE_MAX_PODA,
+                score_weights=SCORE_WEIGHTS,
+                with_signal=True
+            )
+        except Exception:
+            EVALUATIONS.inc(result="error")
+            return None
+        
+        # La señal se calcula entera aunque el kernel aborte: sirve al torneo
+        if "signal" in metrics:
+            self._keep_signal(strat_obj.name, params, metrics["signal"])
+        
+        # Early stopping (drawdown o cota de score)
+        if metrics["aborted"]:
+            EVALUATIONS.inc(result="pruned")
+            return None
+        EVALUATIONS.inc(result="ok")
+        
+        ret = metrics["return"]
+        sharpe = metrics["sharpe"]
+        dd = metrics["drawdown"]
+        
+        # Score combinado
+        score = calculate_score(ret, sharpe, dd)
+        return score, {
+            "Ticker": self.ticker,
+            "Estrategia": strat_obj.name,
+            "Retorno": ret,
+            "Sharpe": sharpe,
+            "Drawdown": dd,
+            "Params": params,
+            "Source": "OPTIMIZED"
+        }
+    
+    def _stop_runs(self, strat_obj, params: Dict) -> Optional[List[tuple]]:
+        """
+        Simula una combinación con cada salida de STOP_GRID (classes.trades).
+        
+        Señales y ATR se calculan una vez; solo la simulación compilada se
+        repite por configuración de stops.
+        
+        Returns:
+            [((atr_multiplier, rr_ratio), resultado)] o None si falla
+        """
+        from classes.trades import simulate_stop_grid
+        from classes.risk_manager import RiskManager
+        
+        if self._stop_frame is None:
+            # generate_signals escribe columnas en el DataFrame: copia propia
+            data = self.data.copy()
+            self._stop_frame = (data, RiskManager(data).calculate_atr(14).values)
+        data, atr = self._stop_frame
+        
+        try:
+            df_signals = strat_obj.generate_signals(data, params)
+        except Exception:
+            return None
+        signal = df_signals['Signal'].values.astype(np.float64)
+        self._keep_signal(strat_obj.name, params, signal)
+        return list(zip(STOP_GRID, simulate_stop_grid(df_signals, signal, STOP_GRID, atr=atr)))
+    
+    def _best_stop_run(self, strat_obj, params: Dict) -> Optional[tuple]:
+        """
+        Mejor salida admitida de STOP_GRID para una combinación.
+        
+        Sus retornos por barra quedan para el torneo (si ninguna es admitida,
+        los de la primera, que es la configuración de RiskConfig).
+        
+        Returns:
+            (score, (atr_multiplier, rr_ratio), resultado) o None
+        """
+        runs = self._stop_runs(strat_obj, params)
+        if runs is None:
+            EVALUATIONS.inc(result="error")
+            return None
+        
+        best = None
+        for stops, res in runs:
+            if not np.isfinite(res["return"]) or res["drawdown"] < MAX_DRAWDOWN_ADMITIDO:
+                EVALUATIONS.inc(result="pruned")
+                continue
+            EVALUATIONS.inc(result="ok")
+            score = calculate_score(res["return"], res["sharpe"], res["drawdown"])
+            if best is None or score > best[0]:
+                best = (score, stops, res)
+        
+        chosen = best[2] if best is not None else runs[0][1]
+        self._stop_returns[(strat_obj.name, repr(sorted(params.items())))] = chosen["bar_returns"]
+        return best
+    
+    def grid_candidates(self, interleave: bool = False) -> List[tuple]:
+        """
+        Combinaciones (estrategia, params) de PARAM_GRID.
+        
+        Con interleave=True el orden es round-robin (una combinación de cada
+        estrategia primero), para que un resultado parcial ya haya visto
+        todas las familias.
+        """
+        queues = [[(strat, params) for params in PARAM_GRID.get(strat.name, [])] for strat in self.strategies]
+        if not interleave:
+            return [c for q in queues for c in q]
+        ordered = []
+        for i in range(max((len(q) for q in queues), default=0)):
+            ordered.extend(q[i] for q in queues if i < len(q))
+        return ordered
+    
+    def optimize_anytime(self, deadline: Optional[float] = None, force_recalc: bool = False) -> Dict:
+        """
+        Optimización con latencia acotada.
+        
+        Espera como máximo `deadline` segundos (AppConfig.optimizacion_deadline_ms
+        por defecto) y devuelve el mejor resultado hasta ese momento; el grid
+        completo sigue evaluándose en segundo plano (ver classes.anytime).
+        
+        Returns:
+            Dict con winner, completeness (0-1), evaluated, total, done
+        """
+        if self.data.empty:
+            return {"winner": None, "completeness": 0.0, "evaluated": 0, "total": 0, "done": True}
+        
+        if not force_recalc and self._has_saved_config():
+            with span("saved_config", self.ticker):
+                result = self._load_saved_config()
+            if result:
+                cache_hit("saved_config")
+                return {"winner": result, "completeness": 1.0, "evaluated": 1, "total": 1, "done": True}
+        cache_miss("saved_config")
+        
+        from classes.anytime import optimize_anytime
+        return optimize_anytime(self, deadline, restart=force_recalc)
+    
+    def evaluate_all(self, evaluations=None):
+        """
+        Evalúa todo PARAM_GRID y guarda cada combinación en un EvaluationSet.
+        
+        Sin poda por score (cualquier ponderación posterior debe ver todas
+        las combinaciones); solo se descartan las que superan el drawdown
+        admitido, que ninguna ponderación puede elegir. Con
+        RISK.optimizar_stops cada salida admitida de STOP_GRID es una fila
+        más (su configuración va en trade_stats["stops"]).
+        """
+        from classes.results import EvaluationSet
+        from classes.trades import trade_stats
+        
+        evaluations = evaluations if evaluations is not None else EvaluationSet()
+        if self.data.empty:
+            return evaluations
+        
+        for strat, params in self.grid_candidates():
+            if cfg.RISK.optimizar_stops:
+                for (atr_mult, rr), res in self._stop_runs(strat, params) or []:
+                    if not np.isfinite(res["return"]) or res["drawdown"] < MAX_DRAWDOWN_ADMITIDO:
+                        continue
+                    stats = trade_stats(res["trades"])
+                    evaluations.append(
+                        self.ticker, strat.name, params,
+                        res["return"], res["sharpe"], res["drawdown"],
+                        trade_stats={
+                            **{k: stats[k] for k in ("trades", "win_rate", "avg_bars_held")},
+                            "stops": {"atr_multiplier": atr_mult, "rr_ratio": rr}
+                        }
+                    )
+                continue
+            try:
+                metrics = strat.backtest_fast(
+                    self.data, params, max_drawdown=MAX_DRAWDOWN_ADMITIDO, with_trades=True
+                )
             except Exception:
-                pass
+                continue
+            if metrics["aborted"] or not np.isfinite(metrics["return"]):
+                continue
+            evaluations.append(
+                self.ticker, strat.name, params,
+                metrics["return"], metrics["sharpe"], metrics["drawdown"],
+                trade_stats={k: metrics[k] for k in ("trades", "win_rate", "avg_bars_held")}
+            )
+        return evaluations
+    
+    def _keep_signal(self, strategy: str, params: Dict, signal: np.ndarray):
+        self._signals[(strategy, repr(sorted(params.items())))] = signal
+    
+    def adopt_signals(self, other: "AssetScout"):
+        """Reutiliza las señales ya calculadas por otro scout con el mismo histórico"""
+        if other is not self and other.data.index.equals(self.data.index):
+            self._signals.update(other._signals)
+            self._stop_returns.update(other._stop_returns)
+    
+    def candidate_returns(self, include: Optional[List[tuple]] = None) -> tuple:
+        """
+        Retornos de todas las combinaciones de PARAM_GRID (más `include`,
+        lista de (estrategia, params)).
         
-        # Grid search por estrategia
-        for strat in self.strategies:
-            
-            # ESTRATEGIAS PRO
-            if isinstance(strat, SuperTrendStrategy):
-                for params in [
-                    {'period': 10, 'multiplier': 3.0}, 
-                    {'period': 12, 'multiplier': 3.0}
-                ]:
-                    evaluate_iteration(strat, params)
-            
-            elif isinstance(strat, SqueezeMomentumStrategy):
-                params = {'bb_len': 20, 'bb_mult': 2.0, 'kc_len': 20, 'kc_mult': 1.5}
-                evaluate_iteration(strat, params)
-            
-            elif isinstance(strat, ADXStrategy):
-                for params in [
-                    {'period': 14, 'adx_threshold': 20},
-                    {'period': 14, 'adx_threshold': 25}
-                ]:
-                    evaluate_iteration(strat, params)
-            
-            # ESTRATEGIAS CLÁSICAS
-            elif isinstance(strat, GoldenCrossStrategy):
-                for fast, slow in [(20, 100), (50, 200)]:
-                    evaluate_iteration(strat, {'fast': fast, 'slow': slow})
-            
-            elif isinstance(strat, MeanReversionStrategy):
-                for rsi_low in [25, 30]:
-                    evaluate_iteration(strat, {'rsi_low': rsi_low, 'rsi_high': 70})
-            
-            elif isinstance(strat, BollingerBreakoutStrategy):
-                evaluate_iteration(strat, {'window': 20, 'std_dev': 2})
-            
-            elif isinstance(strat, MACDStrategy):
-                evaluate_iteration(strat, {'fast': 12, 'slow': 26, 'signal': 9})
-            
-            elif isinstance(strat, EMAStrategy):
-                for params in [
-                    {'fast': 8, 'slow': 21}, 
-                    {'fast': 5, 'slow': 13}
-                ]:
-                    evaluate_iteration(strat, params)
-            
-            elif isinstance(strat, StochRSIStrategy):
-                params = {'rsi_period': 14, 'stoch_period': 14, 'k_period': 3, 'd_period': 3}
-                evaluate_iteration(strat, params)
-            
-            elif isinstance(strat, AwesomeOscillatorStrategy):
-                evaluate_iteration(strat, {'fast': 5, 'slow': 34})
+        Parte de las señales que ya dejó la optimización (grid search o
+        anytime); solo se generan las que falten. Con RISK.optimizar_stops
+        cada fila es la de la salida de STOP_GRID que elegiría la optimización.
+        
+        Returns:
+            (candidatos, matriz candidatos x barras); se cachea en el scout
+        """
+        grid = {name: list(param_list) for name, param_list in PARAM_GRID.items()}
+        for name, params in include or []:
+            if params not in grid.setdefault(name, []):
+                grid[name].append(params)
+        
+        key = repr((grid, cfg.RISK.optimizar_stops))
+        if self._returns_cache is not None and self._returns_cache[0] == key:
+            cache_hit("candidate_returns")
+            return self._returns_cache[1], self._returns_cache[2]
+        
+        if cfg.RISK.optimizar_stops:
+            strategies = {s.name: s for s in self.strategies}
+            candidates, rows = [], []
+            missing = 0
+            for name, param_list in grid.items():
+                for params in param_list:
+                    stop_key = (name, repr(sorted(params.items())))
+                    if stop_key not in self._stop_returns and name in strategies:
+                        missing += 1
+                        self._best_stop_run(strategies[name], params)
+                    if stop_key in self._stop_returns:
+                        candidates.append((name, params))
+                        rows.append(self._stop_returns[stop_key])
+            matrix = np.vstack(rows) if rows else np.empty((0, len(self.data)))
+        else:
+            # Mismo cálculo que el walk-forward; las señales que falten quedan en el scout
+            from classes.walk_forward import candidate_returns
+            n_signals = len(self._signals)
+            candidates, matrix = candidate_returns(self.data, grid, signals=self._signals)
+            missing = len(self._signals) - n_signals
+        
+        (cache_miss if missing else cache_hit)("candidate_returns")
+        self._returns_cache = (key, candidates, matrix)
+        return candidates, matrix
+    
+    def tournament(self, include: Optional[List[tuple]] = None, n_points: int = 120) -> pd.DataFrame:
+        """
+        Clasificación de todas las combinaciones en una pasada vectorizada.
+        
+        Returns:
+            DataFrame ordenado (admitidas primero, luego por score) con
+            Puesto, Estrategia, Params, métricas, Score, Admitida y Equity
+            (curva submuestreada a n_points; fechas en attrs['equity_dates'])
+        """
+        if self.data.empty:
+            return pd.DataFrame()
+        
+        candidates, matrix = self.candidate_returns(include)
+        if not candidates:
+            return pd.DataFrame()
+        
+        m = metrics_from_returns(matrix)
+        score = calculate_score(m["return"], m["sharpe"], m["drawdown"])
+        
+        # Curvas submuestreadas (el NaN inicial se muestra como capital sin tocar)
+        equity = pd.DataFrame(m["equity"].T).ffill().fillna(1.0).values.T
+        idx = np.unique(np.linspace(0, matrix.shape[1] - 1, n_points).astype(int))
+        
+        board = pd.DataFrame({
+            "Estrategia": [c[0] for c in candidates],
+            "Params": [c[1] for c in candidates],
+            "Retorno": m["return"],
+            "Sharpe": m["sharpe"],
+            "Drawdown": m["drawdown"],
+            "Score": score,
+            "Admitida": m["drawdown"] >= MAX_DRAWDOWN_ADMITIDO,
+            "Equity": [row.tolist() for row in equity[:, idx]]
+        })
+        board = board.sort_values(["Admitida", "Score"], ascending=[False, False], kind="mergesort")
+        board.insert(0, "Puesto", np.arange(1, len(board) + 1))
+        board = board.reset_index(drop=True)
+        board.attrs["equity_dates"] = self.data.index[idx]
+        return board
+    
+    def equity_curve(self, strategy: str, params: Dict) -> Optional[pd.Series]:
+        """Curva de equity completa de una combinación (desde la cache del torneo)"""
+        candidates, matrix = self.candidate_returns([(strategy, params)])
+        for i, (name, cand_params) in enumerate(candidates):
+            if name == strategy and cand_params == params:
+                return pd.Series(metrics_from_returns(matrix[i])["equity"][0], index=self.data.index)
+        return None
+    
+    def optimize_with_stops(self, candidates: Optional[List[tuple]] = None) -> Optional[Dict]:
+        """
+        Grid search con stop loss / take profit: cada combinación de
+        PARAM_GRID (o `candidates`, lista de (estrategia, params)) se simula
+        con cada salida de STOP_GRID, sea cual sea RISK.optimizar_stops.
+        
+        Returns:
+            Resultado en formato optimize() más "Stops" (atr_multiplier,
+            rr_ratio) y "Operaciones" (número de trades)
+        """
+        if self.data.empty:
+            return None
+        
+        best_score = -999
+        best_result = None
+        for strat, params in (candidates if candidates is not None else self.grid_candidates()):
+            best = self._best_stop_run(strat, params)
+            if best is None or best[0] <= best_score:
+                continue
+            best_score = best[0]
+            (atr_mult, rr), res = best[1], best[2]
+            best_result = {
+                "Ticker": self.ticker,
+                "Estrategia": strat.name,
+                "Retorno": res["return"],
+                "Sharpe": res["sharpe"],
+                "Drawdown": res["drawdown"],
+                "Params": params,
+                "Stops": {"atr_multiplier": atr_mult, "rr_ratio": rr},
+                "Operaciones": len(res["trades"]),
+                "Source": "OPTIMIZED"
+            }
+        
+        return best_result
+    
+    def _run_grid_search(self) -> Optional[Dict]:
+        """
+        Ejecuta grid search optimizado.
+        
+        Cada combinación pasa por _evaluate_candidate: sin stops, el kernel
+        que poda candidatos; con RISK.optimizar_stops, estrategia, parámetros
+        y salida de STOP_GRID se eligen juntos.
+        """
+        candidates = self.grid_candidates()
+        t0 = time.perf_counter()
+        best_score = -999
+        best_result = None
+        for strat, params in candidates:
+            evaluated = self._evaluate_candidate(strat, params, best_score)
+            if evaluated is not None and evaluated[0] > best_score:
+                best_score, best_result = evaluated
+        n_evaluations = len(candidates) * (len(STOP_GRID) if cfg.RISK.optimizar_stops else 1)
         
+        elapsed = time.perf_counter() - t0
+        if elapsed > 0:
+            EVALUATIONS_PER_SECOND.set(n_evaluations / elapsed)
         return best_result
 
 
@@ -226,7 +727,8 @@ def scan_multiple_tickers(
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with scan("scan_multiple_tickers", tickers), profile("optimize", "multi"), \
+            MonitoredThreadPool("scan_multiple_tickers", max_workers=max_workers) as executor:
         # Crear futures para cada ticker
         future_to_ticker = {
             executor.submit(_optimize_single_ticker, ticker, force_recalc): ticker
@@ -243,6 +745,7 @@ def scan_multiple_tickers(
                 if result:
                     results.append(result)
             except Exception as e:
+                TELEMETRY.error(ticker, str(e))
                 st.warning(f"⚠️ Error en {ticker}: {e}")
             
             # Actualizar progress
@@ -269,9 +772,11 @@ def scan_multiple_tickers(
 def _optimize_single_ticker(ticker: str, force_recalc: bool) -> Optional[Dict]:
     """Función auxiliar para paralelización"""
     try:
-        scout = AssetScout(ticker)
-        return scout.optimize(force_recalc=force_recalc)
-    except Exception:
+        with span("ticker", ticker):
+            scout = AssetScout(ticker)
+            return scout.optimize(force_recalc=force_recalc)
+    except Exception as e:
+        TELEMETRY.error(ticker, str(e))
         return None
 
 
@@ -0,0 +1,340 @@
+# classes/screener.py - SCREENER CON EXPRESIONES COMPILADAS SOBRE EL UNIVERSO
+import ast
+import operator
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from classes.strategies import calculate_rsi_numba
+
+"""
+Filtros de texto sobre el último escaneo sin volver a escanear:
+1. latest_indicators(): últimos valores de indicadores por ticker
+   (se guardan en el resultado del escaneo, clave 'indicadores')
+2. build_table(): una fila por ticker con resultado + indicadores
+   (columnas numpy; se construye una vez por snapshot)
+3. compile_expression(): "RSI < 30 and ADX > 25 and sharpe > 1" se
+   valida con ast (solo comparaciones, aritmética, and/or/not, in y
+   funciones de FUNCIONES) y se compila a una función vectorizada sobre
+   la tabla; compilación cacheada por texto
+4. screen(): máscara + ranking, milisegundos sobre miles de símbolos
+Los nombres de columna no distinguen mayúsculas/minúsculas.
+"""
+
+# Columnas de indicadores (siempre presentes en la tabla, NaN si faltan)
+INDICADORES = (
+    "rsi", "adx", "atr_pct", "dist_sma50", "dist_sma200",
+    "ret_5d", "ret_20d", "volatilidad", "volumen_rel"
+)
+
+# Campos escalares del resultado del escaneo que pasan a la tabla
+CAMPOS_RESULTADO = (
+    "ticker", "tipo", "direction", "es_valida", "estrategia",
+    "precio", "retorno", "sharpe", "drawdown"
+)
+
+FUNCIONES: Dict[str, Callable] = {
+    "abs": np.abs,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+_COMPARACIONES = {
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+
+_ARITMETICA = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+
+# '**' solo con exponente literal acotado: la sesión de un usuario no debe
+# poder bloquear el proceso compartido con algo como 9**9**9**9
+MAX_EXPONENTE = 4
+
+
+class ScreenerError(ValueError):
+    """Expresión inválida (sintaxis, nodo no permitido o campo desconocido)"""
+
+
+# ============================================
+# INDICADORES
+# ============================================
+
+def latest_indicators(df: pd.DataFrame, period: int = 14) -> Dict[str, float]:
+    """Último valor de cada indicador de INDICADORES para un histórico OHLCV"""
+    close = df['Close'].astype(float)
+    high = df['High'].astype(float)
+    low = df['Low'].astype(float)
+    last = close.iloc[-1]
+    n = len(close)
+
+    rsi = calculate_rsi_numba(close.values, period)[-1] if n > period + 1 else np.nan
+
+    # ADX de Wilder (mismo cálculo que ADXStrategy)
+    plus_dm = high.diff().clip(lower=0)
+    minus_dm = (-low.diff()).clip(lower=0)
+    tr = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    atr = tr.rolling(period).mean()
+    plus_di = 100 * plus_dm.ewm(alpha=1/period).mean() / atr
+    minus_di = 100 * minus_dm.ewm(alpha=1/period).mean() / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    adx = dx.ewm(alpha=1/period).mean().iloc[-1]
+
+    returns = close.pct_change()
+    indicadores = {
+        "rsi": rsi,
+        "adx": adx,
+        "atr_pct": atr.iloc[-1] / last if last else np.nan,
+        "dist_sma50": last / close.tail(50).mean() - 1 if n >= 50 else np.nan,
+        "dist_sma200": last / close.tail(200).mean() - 1 if n >= 200 else np.nan,
+        "ret_5d": last / close.iloc[-6] - 1 if n > 5 else np.nan,
+        "ret_20d": last / close.iloc[-21] - 1 if n > 20 else np.nan,
+        "volatilidad": returns.tail(20).std() * np.sqrt(252),
+        "volumen_rel": np.nan,
+    }
+    if 'Volume' in df.columns:
+        avg_volume = df['Volume'].tail(20).mean()
+        if avg_volume:
+            indicadores["volumen_rel"] = df['Volume'].iloc[-1] / avg_volume
+    return {k: float(v) for k, v in indicadores.items()}
+
+
+# ============================================
+# TABLA DEL UNIVERSO
+# ============================================
+
+def build_table(results: Sequence[Mapping], sectors: Optional[Callable[[str], str]] = None) -> pd.DataFrame:
+    """
+    Una fila por ticker con los campos escalares del escaneo y sus indicadores.
+
+    Args:
+        results: resultados de scan_universe (o snapshot.results)
+        sectors: callback(ticker) -> sector (p.ej. Universe.sector_of)
+    """
+    rows = []
+    for r in results:
+        row = {k: r.get(k) for k in CAMPOS_RESULTADO}
+        row.update(r.get('indicadores') or {})
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    table = table.reindex(columns=list(dict.fromkeys([*CAMPOS_RESULTADO, *table.columns, *INDICADORES])))
+    for col in ("precio", "retorno", "sharpe", "drawdown", *INDICADORES):
+        table[col] = pd.to_numeric(table[col], errors="coerce").astype(float)
+    table["es_valida"] = table["es_valida"].fillna(False).astype(bool)
+    table["accionable"] = table["es_valida"] & (table["tipo"] != "NEUTRO")
+    if sectors is not None:
+        table["sector"] = table["ticker"].map(sectors)
+    return table.reset_index(drop=True)
+
+
+# ============================================
+# COMPILADOR DE EXPRESIONES
+# ============================================
+
+def _resolver(columns: Sequence[str]) -> Dict[str, str]:
+    return {c.lower(): c for c in columns}
+
+
+def _compile_node(node: ast.AST, names: set) -> Callable[[pd.DataFrame, Dict[str, str]], object]:
+    """Nodo ast -> función(tabla, columnas) que devuelve Series o escalar"""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, names)
+
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float, str, bool)):
+            raise ScreenerError(f"Constante no permitida: {node.value!r}")
+        value = node.value
+        return lambda table, cols: value
+
+    if isinstance(node, ast.Name):
+        name = node.id.lower()
+        if name in ("true", "false"):
+            value = name == "true"
+            return lambda table, cols: value
+        names.add(name)
+
+        def column(table, cols):
+            if name not in cols:
+                raise ScreenerError(f"Campo desconocido '{node.id}' (disponibles: {', '.join(sorted(cols))})")
+            return table[cols[name]]
+        return column
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [_compile_node(elt, names) for elt in node.elts]
+        return lambda table, cols: [item(table, cols) for item in items]
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile_node(v, names) for v in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+
+        def boolop(table, cols):
+            result = _as_mask(values[0](table, cols), table)
+            for value in values[1:]:
+                result = combine(result, _as_mask(value(table, cols), table))
+            return result
+        return boolop
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return lambda table, cols: ~_as_mask(operand(table, cols), table)
+        if isinstance(node.op, ast.USub):
+            return lambda table, cols: -operand(table, cols)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise ScreenerError(f"Operador no permitido: {type(node.op).__name__}")
+
+    if isinstance(node, ast.BinOp):
+        op = _ARITMETICA.get(type(node.op))
+        if op is None:
+            raise ScreenerError(f"Operador no permitido: {type(node.op).__name__}")
+        if isinstance(node.op, ast.Pow):
+            exponent = _literal_number(node.right)
+            if exponent is None or abs(exponent) > MAX_EXPONENTE:
+                raise ScreenerError(f"'**' solo admite exponentes numéricos literales entre -{MAX_EXPONENTE} y {MAX_EXPONENTE}")
+        left, right = _compile_node(node.left, names), _compile_node(node.right, names)
+        return lambda table, cols: op(_numeric(left(table, cols)), _numeric(right(table, cols)))
+
+    if isinstance(node, ast.Compare):
+        # a < b < c  ->  (a < b) & (b < c)
+        operands = [_compile_node(n, names) for n in [node.left, *node.comparators]]
+        steps = []
+        for i, op_node in enumerate(node.ops):
+            if isinstance(op_node, (ast.In, ast.NotIn)):
+                negate = isinstance(op_node, ast.NotIn)
+                steps.append((i, lambda a, b, negate=negate: _isin(a, b, negate)))
+            elif type(op_node) in _COMPARACIONES:
+                steps.append((i, _COMPARACIONES[type(op_node)]))
+            else:
+                raise ScreenerError(f"Comparación no permitida: {type(op_node).__name__}")
+
+        def compare(table, cols):
+            values = [operand(table, cols) for operand in operands]
+            result = None
+            for i, op in steps:
+                step = _as_mask(op(values[i], values[i + 1]), table)
+                result = step if result is None else result & step
+            return result
+        return compare
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id.lower() not in FUNCIONES or node.keywords:
+            raise ScreenerError(f"Función no permitida (disponibles: {', '.join(FUNCIONES)})")
+        func = FUNCIONES[node.func.id.lower()]
+        args = [_compile_node(a, names) for a in node.args]
+        return lambda table, cols: func(*[a(table, cols) for a in args])
+
+    raise ScreenerError(f"Expresión no permitida: {type(node).__name__}")
+
+
+def _literal_number(node: ast.AST) -> Optional[float]:
+    """Valor de un literal numérico (con signo opcional); None si no lo es"""
+    sign = 1.0
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        sign = -1.0 if isinstance(node.op, ast.USub) else 1.0
+        node = node.operand
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return sign * float(node.value)
+    return None
+
+
+def _numeric(value):
+    """
+    Operando aritmético: Series numérica/booleana o escalar como float64
+    (sin enteros de precisión arbitraria ni repetición de texto)
+    """
+    if isinstance(value, pd.Series):
+        if not (pd.api.types.is_numeric_dtype(value) or pd.api.types.is_bool_dtype(value)):
+            raise ScreenerError(f"Operación aritmética sobre un campo no numérico ('{value.name}')")
+        return value
+    if isinstance(value, (int, float, np.number)):
+        return np.float64(value)
+    raise ScreenerError(f"Operación aritmética sobre un valor no numérico: {value!r}")
+
+
+def _isin(value, options, negate: bool):
+    if not isinstance(options, list):
+        raise ScreenerError("'in' requiere una lista, p.ej. direction in ['LONG', 'SHORT']")
+    mask = value.isin(options) if isinstance(value, pd.Series) else value in options
+    return ~mask if negate else mask
+
+
+def _as_mask(value, table: pd.DataFrame) -> pd.Series:
+    """Escalar o Series -> máscara booleana del tamaño de la tabla (NaN = False)"""
+    if isinstance(value, pd.Series):
+        return value.fillna(False).astype(bool)
+    return pd.Series(bool(value), index=table.index)
+
+
+class CompiledExpression:
+    """Expresión validada y compilada, reutilizable sobre cualquier tabla"""
+
+    def __init__(self, source: str):
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ScreenerError(f"Sintaxis inválida en '{source}': {e.msg}")
+        self.names: set = set()
+        self._fn = _compile_node(tree, self.names)
+
+    def evaluate(self, table: pd.DataFrame):
+        try:
+            return self._fn(table, _resolver(table.columns))
+        except TypeError as e:
+            # p.ej. comparar un campo de texto con un número
+            raise ScreenerError(f"Tipos incompatibles en '{self.source}': {e}")
+
+    def mask(self, table: pd.DataFrame) -> pd.Series:
+        return _as_mask(self.evaluate(table), table)
+
+
+@lru_cache(maxsize=256)
+def compile_expression(source: str) -> CompiledExpression:
+    return CompiledExpression(source)
+
+
+# ============================================
+# SCREENING
+# ============================================
+
+def screen(
+    table: pd.DataFrame,
+    where: Optional[str] = None,
+    rank_by: Optional[str] = "sharpe",
+    ascending: bool = False,
+    limit: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Filas que cumplen `where`, ordenadas por la expresión `rank_by`.
+
+    Returns:
+        Subtabla con columna 'rank' (1 = mejor); NaN en rank_by va al final
+    """
+    matches = table
+    if where and where.strip():
+        matches = table[compile_expression(where).mask(table)]
+    if rank_by and rank_by.strip():
+        key = compile_expression(rank_by).evaluate(matches)
+        key = key if isinstance(key, pd.Series) else pd.Series(key, index=matches.index)
+        if not (pd.api.types.is_numeric_dtype(key) or pd.api.types.is_bool_dtype(key)):
+            raise ScreenerError(f"El ranking '{rank_by}' debe ser numérico o booleano")
+        order = np.argsort(key.to_numpy(dtype=float, na_value=np.nan) * (1 if ascending else -1), kind="stable")
+        matches = matches.iloc[order]
+    if limit:
+        matches = matches.head(limit)
+    return matches.assign(rank=np.arange(1, len(matches) + 1))
+
+
+def screen_tickers(results: Sequence[Mapping], where: Optional[str] = None, **kwargs) -> List[str]:
+    """Atajo: tickers que cumplen la expresión, en orden de ranking"""
+    return screen(build_table(results), where, **kwargs)["ticker"].tolist()
@@ -0,0 +1,464 @@
+# classes/search.py - BÚSQUEDA ADAPTATIVA DE PARÁMETROS
+import time
+import math
+import operator
+import itertools
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from classes.strategies import get_strategy_by_name, metrics_from_returns
+from classes.scout import MAX_DRAWDOWN_ADMITIDO, calculate_score
+import config as cfg
+
+"""
+Optimización sobre espacios de parámetros grandes con presupuesto fijo:
+1. Espacio declarativo por estrategia (rangos, pasos y restricciones "fast < slow")
+2. Successive halving: muestra amplia evaluada sobre prefijos cortos del
+   histórico; solo el mejor 1/eta pasa al siguiente prefijo (más largo)
+3. Búsqueda guiada por modelo (estimador de Parzen, estilo TPE): propone las
+   combinaciones con mayor ratio densidad(buenas) / densidad(malas)
+4. Parada por presupuesto de evaluaciones (en backtests completos
+   equivalentes: un prefijo de n/3 barras cuesta 1/3) o de tiempo
+"""
+
+# ============================================
+# ESPACIO DE PARÁMETROS DECLARATIVO
+# ============================================
+
+class IntParam:
+    """Parámetro entero en [low, high] con paso fijo"""
+
+    def __init__(self, name: str, low: int, high: int, step: int = 1):
+        self.name = name
+        self.low, self.high, self.step = low, high, step
+
+    def values(self) -> List:
+        return list(range(self.low, self.high + 1, self.step))
+
+
+class FloatParam:
+    """Parámetro real en [low, high] discretizado con paso fijo"""
+
+    def __init__(self, name: str, low: float, high: float, step: float):
+        self.name = name
+        self.low, self.high, self.step = low, high, step
+
+    def values(self) -> List:
+        n = int(round((self.high - self.low) / self.step))
+        return [round(self.low + i * self.step, 6) for i in range(n + 1)]
+
+
+class ChoiceParam:
+    """Parámetro con valores explícitos (ordenados)"""
+
+    def __init__(self, name: str, choices: Sequence):
+        self.name = name
+        self.choices = list(choices)
+
+    def values(self) -> List:
+        return list(self.choices)
+
+
+_OPERATORS = {
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+    '!=': operator.ne
+}
+
+
+class ParamSpace:
+    """
+    Espacio discreto de parámetros con restricciones.
+
+    Las restricciones son cadenas "a < b" donde cada lado es un parámetro
+    o un número, p.ej. "fast < slow" o "rsi_low <= 40".
+    """
+
+    def __init__(self, params: Sequence, constraints: Sequence[str] = ()):
+        self.params = list(params)
+        self.names = [p.name for p in self.params]
+        self._values = [p.values() for p in self.params]
+        self._index = [{v: i for i, v in enumerate(vals)} for vals in self._values]
+        self.constraints = [self._parse(expr) for expr in constraints]
+        self._grid: Optional[List[Dict]] = None
+
+    def _parse(self, expr: str) -> Tuple:
+        parts = expr.split()
+        if len(parts) != 3 or parts[1] not in _OPERATORS:
+            raise ValueError(f"Restricción inválida: '{expr}'")
+        left, op, right = parts
+        for side in (left, right):
+            if side not in self.names:
+                try:
+                    float(side)
+                except ValueError:
+                    raise ValueError(f"Parámetro desconocido en restricción: '{side}'")
+        return left, _OPERATORS[op], right
+
+    def _operand(self, params: Dict, side: str):
+        return params[side] if side in params else float(side)
+
+    def is_valid(self, params: Dict) -> bool:
+        return all(
+            op(self._operand(params, left), self._operand(params, right))
+            for left, op, right in self.constraints
+        )
+
+    def grid(self) -> List[Dict]:
+        """Todas las combinaciones válidas (se calcula una vez)"""
+        if self._grid is None:
+            combos = (dict(zip(self.names, vals)) for vals in itertools.product(*self._values))
+            self._grid = [p for p in combos if self.is_valid(p)]
+        return self._grid
+
+    def __len__(self) -> int:
+        return len(self.grid())
+
+    def coords(self, params: Dict) -> np.ndarray:
+        """Posición normalizada [0, 1] de cada parámetro dentro de su rango"""
+        out = np.empty(len(self.names))
+        for d, name in enumerate(self.names):
+            n_vals = len(self._values[d])
+            out[d] = self._index[d][params[name]] / (n_vals - 1) if n_vals > 1 else 0.5
+        return out
+
+    def neighbors(self, params: Dict) -> List[Dict]:
+        """Combinaciones válidas a un paso de distancia en un solo parámetro"""
+        out = []
+        for d, name in enumerate(self.names):
+            i = self._index[d][params[name]]
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(self._values[d]):
+                    candidate = dict(params)
+                    candidate[name] = self._values[d][j]
+                    if self.is_valid(candidate):
+                        out.append(candidate)
+        return out
+
+
+# Espacios por estrategia (claves = BaseStrategy.name)
+PARAM_SPACES: Dict[str, ParamSpace] = {
+    # PRO
+    "SuperTrend Pro": ParamSpace([
+        IntParam('period', 7, 21),
+        FloatParam('multiplier', 1.5, 4.0, 0.25)
+    ]),
+    # La señal solo depende de bb_len (bb_mult, kc_len y kc_mult dibujan las
+    # bandas pero no cambian 'Signal'): el resto solo añadiría duplicados
+    "Squeeze Momentum": ParamSpace([
+        IntParam('bb_len', 10, 40, 2)
+    ]),
+    "ADX & DI Trend": ParamSpace([
+        ChoiceParam('period', [7, 10, 14, 20, 28]),
+        IntParam('adx_threshold', 15, 35, 5)
+    ]),
+    # CLÁSICAS
+    "Golden Cross (Trend)": ParamSpace([
+        IntParam('fast', 10, 100, 5),
+        IntParam('slow', 50, 250, 10)
+    ], constraints=["fast < slow"]),
+    "RSI Mean Reversion": ParamSpace([
+        IntParam('rsi_low', 15, 40, 5),
+        IntParam('rsi_high', 60, 85, 5)
+    ]),
+    "Bollinger Breakout": ParamSpace([
+        IntParam('window', 10, 50, 5),
+        FloatParam('std_dev', 1.5, 3.0, 0.25)
+    ]),
+    "MACD Momentum": ParamSpace([
+        IntParam('fast', 5, 20),
+        IntParam('slow', 20, 40, 2),
+        IntParam('signal', 5, 12)
+    ], constraints=["fast < slow"]),
+    "EMA 8/21 Crossover": ParamSpace([
+        IntParam('fast', 3, 20),
+        IntParam('slow', 10, 60, 2)
+    ], constraints=["fast < slow"]),
+    "Stochastic RSI": ParamSpace([
+        ChoiceParam('rsi_period', [7, 14, 21]),
+        ChoiceParam('stoch_period', [7, 14, 21]),
+        IntParam('k_period', 2, 5),
+        IntParam('d_period', 2, 5)
+    ]),
+    "Awesome Oscillator": ParamSpace([
+        IntParam('fast', 3, 10),
+        IntParam('slow', 20, 50, 2)
+    ], constraints=["fast < slow"]),
+}
+
+
+def _key(strat_name: str, params: Dict) -> Tuple:
+    return strat_name, tuple(sorted(params.items()))
+
+
+# ============================================
+# BÚSQUEDA ADAPTATIVA
+# ============================================
+
+class AdaptiveSearch:
+    """
+    Successive halving sobre prefijos del histórico + búsqueda guiada (TPE).
+
+    El presupuesto se mide en backtests completos equivalentes: evaluar
+    un prefijo de k barras de un histórico de n cuesta k / n.
+    """
+
+    # Fracción del presupuesto para successive halving (el resto, modelo)
+    HALVING_FRACTION = 0.6
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        spaces: Optional[Dict[str, ParamSpace]] = None,
+        max_evals: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        eta: int = 3,
+        min_bars: int = 120,
+        gamma: float = 0.25,
+        n_candidates: int = 256,
+        seed: int = 0
+    ):
+        self.df = df
+        self.spaces = spaces if spaces is not None else PARAM_SPACES
+        self.max_evals = max_evals if max_evals is not None else cfg.APP.busqueda_max_evaluaciones
+        self.time_budget = time_budget if time_budget is not None else cfg.APP.busqueda_max_segundos
+        self.eta = eta
+        self.min_bars = min_bars
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.rng = np.random.default_rng(seed)
+
+        self._strategies = {}
+        for name in self.spaces:
+            strat_obj = get_strategy_by_name(name)
+            if strat_obj is not None:
+                self._strategies[name] = strat_obj
+
+        self.n_bars = len(df)
+        self._market_returns = df['Close'].pct_change(fill_method=None).values
+
+        # Registro de todas las evaluaciones (estrategia, params, barras, métricas)
+        self.history: List[Dict] = []
+        self._full: Dict[Tuple, Dict] = {}
+        self.cost = 0.0
+        self._start = None
+
+    # ----------------------------------------
+    # Presupuesto
+    # ----------------------------------------
+
+    @property
+    def space_size(self) -> int:
+        return sum(len(self.spaces[name]) for name in self._strategies)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start if self._start is not None else 0.0
+
+    def _budget_left(self, cost: float = 0.0) -> bool:
+        if self.cost + cost > self.max_evals + 1e-9:
+            return False
+        return not (self.time_budget and self.elapsed() >= self.time_budget)
+
+    # ----------------------------------------
+    # Evaluación
+    # ----------------------------------------
+
+    def _evaluate(self, strat_name: str, params: Dict, bars: int) -> float:
+        bars = min(bars, self.n_bars)
+        data = self.df if bars == self.n_bars else self.df.iloc[:bars]
+
+        try:
+            signals = self._strategies[strat_name].generate_signals(data.copy(), params)['Signal'].values
+            shifted = np.empty(bars)
+            shifted[0] = np.nan
+            shifted[1:] = signals[:-1]
+            m = metrics_from_returns(self._market_returns[:bars] * shifted)
+            ret, sharpe, dd = float(m["return"][0]), float(m["sharpe"][0]), float(m["drawdown"][0])
+            score = calculate_score(ret, sharpe, dd)
+            if dd < MAX_DRAWDOWN_ADMITIDO or not np.isfinite(score):
+                score = -np.inf
+        except Exception:
+            ret, sharpe, dd, score = -np.inf, 0.0, -1.0, -np.inf
+
+        self.cost += bars / self.n_bars
+        record = {
+            "strategy": strat_name, "params": params, "bars": bars,
+            "return": ret, "sharpe": sharpe, "drawdown": dd, "score": score
+        }
+        self.history.append(record)
+        if bars == self.n_bars:
+            self._full[_key(strat_name, params)] = record
+        return score
+
+    # ----------------------------------------
+    # Fase 1: successive halving
+    # ----------------------------------------
+
+    def _rungs(self) -> List[int]:
+        """Longitudes de prefijo crecientes (la última es el histórico completo)"""
+        rungs = [self.n_bars]
+        while True:
+            bars = math.ceil(rungs[0] / self.eta)
+            if bars < self.min_bars:
+                break
+            rungs.insert(0, bars)
+        return rungs
+
+    def _halving_cost(self, n0: int, rungs: List[int]) -> float:
+        cost, n = 0.0, n0
+        for bars in rungs:
+            cost += n * bars / self.n_bars
+            n = max(1, n // self.eta)
+        return cost
+
+    def _initial_sample(self, n0: int) -> List[Tuple[str, Dict]]:
+        """Muestra sin reemplazo repartida por igual entre estrategias"""
+        pools = {}
+        for name in self._strategies:
+            grid = self.spaces[name].grid()
+            pools[name] = [grid[i] for i in self.rng.permutation(len(grid))]
+
+        sample = []
+        while len(sample) < n0 and any(pools.values()):
+            for name, pool in pools.items():
+                if pool and len(sample) < n0:
+                    sample.append((name, pool.pop()))
+        return sample
+
+    def _successive_halving(self):
+        rungs = self._rungs()
+        budget = self.max_evals * self.HALVING_FRACTION
+
+        n0 = max(len(self._strategies), self.eta)
+        while self._halving_cost(n0 + 1, rungs) <= budget and n0 < self.space_size:
+            n0 += 1
+
+        configs = self._initial_sample(n0)
+        for bars in rungs:
+            scored = []
+            for strat_name, params in configs:
+                if not self._budget_left(bars / self.n_bars):
+                    break
+                scored.append((self._evaluate(strat_name, params, bars), strat_name, params))
+            if bars == self.n_bars or len(scored) < len(configs):
+                break
+            scored.sort(key=lambda x: x[0], reverse=True)
+            keep = max(1, len(scored) // self.eta)
+            configs = [(s, p) for _, s, p in scored[:keep]]
+
+    # ----------------------------------------
+    # Fase 2: búsqueda guiada por modelo (TPE)
+    # ----------------------------------------
+
+    def _density(self, points: Dict[str, List[np.ndarray]], strat_name: str, x: np.ndarray, bw: float = 0.15) -> float:
+        """Mezcla de gaussianas sobre coordenadas normalizadas + prior uniforme"""
+        pts = points.get(strat_name, [])
+        if not pts:
+            return 1.0
+        diffs = np.vstack(pts) - x
+        kernel = np.exp(-0.5 * (diffs / bw) ** 2).prod(axis=1) / (bw * np.sqrt(2 * np.pi)) ** len(x)
+        return (kernel.sum() + 1.0) / (len(pts) + 1)
+
+    def _propose(self) -> Optional[Tuple[str, Dict]]:
+        observed = sorted(self._full.values(), key=lambda r: r["score"], reverse=True)
+        if len(observed) < 2:
+            return None
+
+        n_good = max(1, int(math.ceil(self.gamma * len(observed))))
+        good, bad = observed[:n_good], observed[n_good:]
+
+        def group(records):
+            pts = {}
+            for r in records:
+                pts.setdefault(r["strategy"], []).append(self.spaces[r["strategy"]].coords(r["params"]))
+            return pts
+
+        good_pts, bad_pts = group(good), group(bad)
+        n_strats = len(self._strategies)
+
+        # Candidatos: vecinos de las buenas + muestra aleatoria del espacio
+        candidates = {}
+        for r in good:
+            for params in self.spaces[r["strategy"]].neighbors(r["params"]):
+                candidates[_key(r["strategy"], params)] = (r["strategy"], params)
+        names = list(self._strategies)
+        for _ in range(self.n_candidates):
+            name = names[self.rng.integers(len(names))]
+            grid = self.spaces[name].grid()
+            params = grid[self.rng.integers(len(grid))]
+            candidates[_key(name, params)] = (name, params)
+
+        best, best_ratio = None, -np.inf
+        for key, (name, params) in candidates.items():
+            if key in self._full:
+                continue
+            x = self.spaces[name].coords(params)
+            p_good = (len(good_pts.get(name, [])) + 1) / (len(good) + n_strats)
+            p_bad = (len(bad_pts.get(name, [])) + 1) / (len(bad) + n_strats)
+            ratio = np.log(p_good * self._density(good_pts, name, x)) - \
+                np.log(p_bad * self._density(bad_pts, name, x))
+            if ratio > best_ratio:
+                best, best_ratio = (name, params), ratio
+        return best
+
+    def _model_guided(self):
+        while self._budget_left(1.0) and len(self._full) < self.space_size:
+            proposal = self._propose()
+            if proposal is None:
+                # Sin observaciones suficientes: muestra aleatoria no evaluada
+                fresh = [c for c in self._initial_sample(len(self._strategies)) if _key(*c) not in self._full]
+                if not fresh:
+                    break
+                proposal = fresh[0]
+            self._evaluate(proposal[0], proposal[1], self.n_bars)
+
+    # ----------------------------------------
+    # API
+    # ----------------------------------------
+
+    def run(self, ticker: str = "") -> Optional[Dict]:
+        """
+        Ejecuta la búsqueda completa.
+
+        Returns:
+            Mejor configuración sobre el histórico completo, con el mismo
+            formato que AssetScout._run_grid_search (Source='ADAPTIVE').
+        """
+        if self.n_bars < 20 or not self._strategies:
+            return None
+
+        self._start = time.perf_counter()
+        self._successive_halving()
+        self._model_guided()
+
+        if not self._full and self.history:
+            # Sin presupuesto para el histórico completo: validar el mejor prefijo
+            longest = max(r["bars"] for r in self.history)
+            top = max((r for r in self.history if r["bars"] == longest), key=lambda r: r["score"])
+            self._evaluate(top["strategy"], top["params"], self.n_bars)
+
+        finite = [r for r in self._full.values() if np.isfinite(r["score"])]
+        if not finite:
+            return None
+
+        best = max(finite, key=lambda r: r["score"])
+        return {
+            "Ticker": ticker,
+            "Estrategia": best["strategy"],
+            "Retorno": best["return"],
+            "Sharpe": best["sharpe"],
+            "Drawdown": best["drawdown"],
+            "Params": best["params"],
+            "Source": "ADAPTIVE"
+        }
+
+    def stats(self) -> Dict:
+        """Resumen del coste de la búsqueda"""
+        return {
+            "espacio": self.space_size,
+            "evaluaciones": len(self.history),
+            "evaluaciones_completas": len(self._full),
+            "coste_equivalente": round(self.cost, 2),
+            "segundos": round(self.elapsed(), 2)
+        }
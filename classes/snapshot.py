@@ -0,0 +1,241 @@
+# classes/snapshot.py - SNAPSHOT COMPARTIDO DEL ESCANEO + SCHEDULER
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config as cfg
+from classes.scanner import scan_in_chunks
+from classes.universe import load_universe
+from utils.telemetry import get_logger
+
+"""
+Escaneo en segundo plano publicado como snapshot inmutable y versionado:
+1. ScanSnapshot: resultados congelados (tupla de mappings de solo lectura,
+   también los anidados; 'retornos' con datos no escribibles) con versión
+   creciente, fecha, duración y errores
+2. SnapshotStore: snapshot vigente en memoria (lectura sin bloqueo, las
+   sesiones solo leen la referencia) y copia JSON atómica en CACHE_DIR
+   para servir el último escaneo tras un reinicio
+3. ScanScheduler: hilo que re-escanea el universo (classes.universe) cada
+   APP.data_refresh_interval segundos; run_now() fuerza un escaneo y si ya
+   hay uno en curso espera a ese en lugar de lanzar otro
+"""
+
+SNAPSHOT_FILE = cfg.PATHS.CACHE_DIR / "scan_snapshot.json"
+
+logger = get_logger("snapshot")
+
+
+# ============================================
+# SNAPSHOT
+# ============================================
+
+@dataclass(frozen=True)
+class ScanSnapshot:
+    """Resultado de un escaneo completo (no se modifica tras publicarse)"""
+    version: int
+    created: datetime
+    duration_s: float
+    tickers: Tuple[str, ...]
+    results: Tuple[Mapping, ...]
+    errors: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def age_s(self) -> float:
+        return (datetime.now() - self.created).total_seconds()
+
+
+def _freeze_value(value):
+    """Copia de solo lectura: dicts anidados, Series con datos no escribibles y tuplas"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({k: _freeze_value(v) for k, v in value.items()})
+    if isinstance(value, pd.Series):
+        data = value.to_numpy(copy=True)
+        data.setflags(write=False)
+        return pd.Series(data, index=value.index, name=value.name, copy=False)
+    if isinstance(value, np.ndarray):
+        frozen = value.copy()
+        frozen.setflags(write=False)
+        return frozen
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    return value
+
+
+def _freeze(results: List[Dict]) -> Tuple[Mapping, ...]:
+    return tuple(_freeze_value(r) for r in results)
+
+
+def _json_value(value):
+    if isinstance(value, pd.Series):
+        return {"__series__": True, "index": [str(i) for i in value.index], "values": [float(v) for v in value.values]}
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: _json_value(v) for k, v in value.items()}
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    return value
+
+
+def _from_json_value(value):
+    if isinstance(value, dict):
+        if value.get("__series__"):
+            return pd.Series(value["values"], index=pd.to_datetime(value["index"], utc=True).tz_convert(None), dtype=float)
+        return {k: _from_json_value(v) for k, v in value.items()}
+    return value
+
+
+def snapshot_to_dict(snapshot: ScanSnapshot) -> Dict:
+    return {
+        "version": snapshot.version,
+        "created": snapshot.created.isoformat(),
+        "duration_s": snapshot.duration_s,
+        "tickers": list(snapshot.tickers),
+        "results": [_json_value(r) for r in snapshot.results],
+        "errors": list(snapshot.errors)
+    }
+
+
+def snapshot_from_dict(data: Dict) -> ScanSnapshot:
+    return ScanSnapshot(
+        version=int(data["version"]),
+        created=datetime.fromisoformat(data["created"]),
+        duration_s=float(data["duration_s"]),
+        tickers=tuple(data["tickers"]),
+        results=_freeze([_from_json_value(r) for r in data["results"]]),
+        errors=tuple(data.get("errors", []))
+    )
+
+
+# ============================================
+# ALMACÉN COMPARTIDO
+# ============================================
+
+class SnapshotStore:
+    """Snapshot vigente del proceso con copia en disco"""
+
+    def __init__(self, path: Optional[Path] = SNAPSHOT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._current: Optional[ScanSnapshot] = self._load()
+
+    def current(self) -> Optional[ScanSnapshot]:
+        # Asignación atómica de referencia: no hace falta el lock para leer
+        return self._current
+
+    def publish(self, results: List[Dict], tickers: List[str], duration_s: float,
+                errors: Optional[List[str]] = None) -> ScanSnapshot:
+        with self._lock:
+            version = self._current.version + 1 if self._current else 1
+            snapshot = ScanSnapshot(
+                version=version,
+                created=datetime.now(),
+                duration_s=duration_s,
+                tickers=tuple(tickers),
+                results=_freeze(results),
+                errors=tuple(errors or [])
+            )
+            self._current = snapshot
+        self._save(snapshot)
+        logger.info("Snapshot v%d publicado: %d resultados, %.1fs", version, len(results), duration_s)
+        return snapshot
+
+    def _save(self, snapshot: ScanSnapshot):
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(".json.tmp")
+        try:
+            tmp.write_text(json.dumps(snapshot_to_dict(snapshot)), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("No se pudo guardar el snapshot en %s: %s", self.path, e)
+
+    def _load(self) -> Optional[ScanSnapshot]:
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            return snapshot_from_dict(json.loads(self.path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Snapshot en disco ilegible (%s): %s", self.path, e)
+            return None
+
+
+# ============================================
+# SCHEDULER
+# ============================================
+
+class ScanScheduler:
+    """Re-escanea el universo periódicamente y publica en el SnapshotStore"""
+
+    def __init__(self, store: SnapshotStore, tickers: Optional[List[str]] = None,
+                 interval: Optional[float] = None):
+        self.store = store
+        self.tickers = list(tickers or load_universe().symbols)
+        self.interval = cfg.APP.data_refresh_interval if interval is None else interval
+        self.last_error: Optional[str] = None
+        self.next_run: Optional[datetime] = None
+
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="scan-scheduler", daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    def start(self) -> "ScanScheduler":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        """Adelanta el siguiente escaneo en segundo plano"""
+        self._wake.set()
+
+    def run_now(self, on_progress: Optional[Callable[[int, int], None]] = None) -> Optional[ScanSnapshot]:
+        """
+        Escanea y publica. Si ya hay un escaneo en curso, espera a que
+        termine y devuelve su snapshot (no se duplica el trabajo).
+        """
+        if not self._run_lock.acquire(blocking=False):
+            with self._run_lock:
+                return self.store.current()
+        try:
+            t0 = time.perf_counter()
+            # Lotes de APP.max_tickers_por_escaneo: memoria acotada en universos grandes
+            results, errors = scan_in_chunks(self.tickers, on_progress=on_progress)
+            self.last_error = None
+            return self.store.publish(results, self.tickers, time.perf_counter() - t0, errors)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("Escaneo programado fallido: %s", e)
+            return self.store.current()
+        finally:
+            self._run_lock.release()
+
+    def _loop(self):
+        # Un snapshot reciente en disco (reinicio) no se repite hasta que caduque
+        current = self.store.current()
+        wait = max(self.interval - current.age_s, 0.0) if current else 0.0
+        while not self._stop.is_set():
+            self.next_run = datetime.fromtimestamp(time.time() + wait)
+            self._wake.wait(wait)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.run_now()
+            wait = self.interval
@@ -2,7 +2,8 @@
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 import numba
 from numba import jit
 
@@ -88,6 +89,253 @@ def generate_position_signals(condition: np.ndarray) -> np.ndarray:
     return signals
 
 
+@jit(nopython=True)
+def generate_short_positions(entry: np.ndarray, hold: np.ndarray) -> np.ndarray:
+    """
+    Posiciones cortas (-1 o 0) con estado: se abre en una barra con
+    entry y se mantiene mientras hold sea cierto.
+    """
+    n = len(entry)
+    positions = np.zeros(n)
+    position = 0
+    
+    for i in range(n):
+        if position == 0 and entry[i] and hold[i]:
+            position = -1
+        elif position == -1 and not hold[i]:
+            position = 0
+        positions[i] = position
+    
+    return positions
+
+
+# Motivos de parada de backtest_kernel
+ABORT_NONE = 0
+ABORT_DRAWDOWN = 1
+ABORT_SCORE_BOUND = 2
+
+
+@jit(nopython=True)
+def backtest_kernel(
+    close: np.ndarray,
+    signal: np.ndarray,
+    max_drawdown: float,
+    best_score: float,
+    sharpe_cap: float,
+    w_ret: float,
+    w_sharpe: float,
+    w_dd: float
+):
+    """
+    Backtest compilado con poda (mismas métricas que BaseStrategy.backtest).
+    
+    Se detiene en cuanto el candidato no puede ganar:
+    - ABORT_DRAWDOWN: el drawdown acumulado cae por debajo de max_drawdown
+      (el máximo drawdown solo empeora, la decisión es exacta)
+    - ABORT_SCORE_BOUND: ni con retorno perfecto en las barras restantes
+      (1 + |r * señal| por barra) y Sharpe = sharpe_cap alcanzaría best_score
+    
+    Returns:
+        (retorno, sharpe, drawdown, barras procesadas, motivo de parada)
+    """
+    n = len(close)
+    
+    # Cota de crecimiento de la equity desde cada barra hasta el final
+    growth = np.ones(n + 1)
+    for i in range(n - 1, 0, -1):
+        sr = (close[i] / close[i-1] - 1) * signal[i-1]
+        growth[i] = growth[i+1] * (1 + abs(sr)) if not np.isnan(sr) else growth[i+1]
+    
+    equity = 1.0
+    peak = 0.0
+    max_dd = 0.0
+    total = 0.0
+    count = 0
+    last_nan = True
+    
+    for i in range(1, n):
+        sr = (close[i] / close[i-1] - 1) * signal[i-1]
+        if np.isnan(sr):
+            last_nan = True
+            continue
+        last_nan = False
+        
+        equity *= 1 + sr
+        if count == 0 or equity > peak:
+            peak = equity
+        dd = (equity - peak) / peak
+        if dd < max_dd:
+            max_dd = dd
+        total += sr
+        count += 1
+        
+        if max_dd < max_drawdown:
+            return equity - 1, 0.0, max_dd, i + 1, ABORT_DRAWDOWN
+        
+        bound = w_ret * (equity * growth[i+1] - 1) + w_sharpe * sharpe_cap - w_dd * abs(max_dd)
+        if bound < best_score:
+            return equity - 1, 0.0, max_dd, i + 1, ABORT_SCORE_BOUND
+    
+    # Sharpe anualizado (media y desviación muestral, ddof=1)
+    sharpe = 0.0
+    if count > 1:
+        mean = total / count
+        ss = 0.0
+        for i in range(1, n):
+            sr = (close[i] / close[i-1] - 1) * signal[i-1]
+            if not np.isnan(sr):
+                ss += (sr - mean) ** 2
+        std = np.sqrt(ss / (count - 1))
+        if std > 0 and np.isfinite(std):
+            sharpe = mean / std * np.sqrt(252)
+    
+    total_return = np.nan if last_nan else equity - 1
+    drawdown = max_dd if count > 0 else np.nan
+    return total_return, sharpe, drawdown, n, ABORT_NONE
+
+
+# ============================================
+# MÉTRICAS VECTORIZADAS
+# ============================================
+
+def metrics_from_returns(strategy_returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Retorno, Sharpe y drawdown de varias series de retornos a la vez.
+    
+    Cada fila es una serie (candidato); los NaN se ignoran igual que en
+    BaseStrategy.backtest (cumprod/mean/std con skipna). También devuelve
+    la matriz de equity (NaN donde el retorno es NaN).
+    """
+    r = np.atleast_2d(np.asarray(strategy_returns, dtype=np.float64))
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=1)
+    filled = np.where(valid, r, 0.0)
+    
+    equity = np.where(valid, np.cumprod(1 + filled, axis=1), np.nan)
+    peak = np.fmax.accumulate(equity, axis=1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.nanmin(np.where(valid, (equity - peak) / peak, np.inf), axis=1)
+        drawdown = np.where(n > 0, drawdown, np.nan)
+        
+        mean = filled.sum(axis=1) / n
+        var = (np.where(valid, r - mean[:, None], 0.0) ** 2).sum(axis=1) / (n - 1)
+        std = np.sqrt(var)
+        sharpe = np.where((std > 0) & np.isfinite(std), mean / std * np.sqrt(252), 0.0)
+    
+    return {
+        "return": equity[:, -1] - 1 if r.shape[1] else np.full(len(r), np.nan),
+        "sharpe": sharpe,
+        "drawdown": drawdown,
+        "equity": equity
+    }
+
+
+# ============================================
+# ESTADO REANUDABLE DEL BACKTEST
+# ============================================
+
+@dataclass
+class BacktestState:
+    """
+    Estado acumulado de un backtest para actualizarlo barra a barra.
+    
+    Guarda equity corriente, pico y drawdown máximo, y media/varianza de
+    los retornos de la estrategia con Welford, de modo que añadir barras
+    nuevas cuesta O(barras nuevas) en lugar de recalcular toda la serie.
+    """
+    
+    n_bars: int = 0
+    n_returns: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    equity: float = 1.0
+    last_equity: float = np.nan
+    peak: float = np.nan
+    max_drawdown: float = np.nan
+    last_close: float = np.nan
+    last_signal: float = np.nan
+    last_timestamp: Optional[pd.Timestamp] = None
+    
+    @classmethod
+    def from_series(
+        cls,
+        close: pd.Series,
+        signal: pd.Series,
+        strategy_returns: pd.Series,
+        equity_curve: pd.Series
+    ) -> "BacktestState":
+        """Construye el estado a partir de un backtest completo (vectorizado)"""
+        valid = strategy_returns.dropna()
+        n = len(valid)
+        valid_equity = equity_curve.dropna()
+        
+        peak = equity_curve.expanding().max()
+        drawdown = ((equity_curve - peak) / peak).min()
+        
+        return cls(
+            n_bars=len(close),
+            n_returns=n,
+            mean=float(valid.mean()) if n else 0.0,
+            m2=float(valid.var(ddof=0) * n) if n else 0.0,
+            equity=float(valid_equity.iloc[-1]) if len(valid_equity) else 1.0,
+            last_equity=float(equity_curve.iloc[-1]) if len(equity_curve) else np.nan,
+            peak=float(peak.max()) if len(valid_equity) else np.nan,
+            max_drawdown=float(drawdown),
+            last_close=float(close.iloc[-1]) if len(close) else np.nan,
+            last_signal=float(signal.iloc[-1]) if len(signal) else np.nan,
+            last_timestamp=close.index[-1] if len(close) else None
+        )
+    
+    def update(self, close: float, signal: float, timestamp: Optional[pd.Timestamp] = None):
+        """Añade una barra: la señal de la barra anterior se aplica al retorno actual"""
+        strategy_return = np.nan
+        if self.n_bars > 0:
+            strategy_return = (close / self.last_close - 1) * self.last_signal
+        
+        if np.isnan(strategy_return):
+            self.last_equity = np.nan
+        else:
+            # Welford
+            self.n_returns += 1
+            delta = strategy_return - self.mean
+            self.mean += delta / self.n_returns
+            self.m2 += delta * (strategy_return - self.mean)
+            
+            self.equity *= (1 + strategy_return)
+            self.last_equity = self.equity
+            self.peak = self.equity if np.isnan(self.peak) else max(self.peak, self.equity)
+            dd = (self.equity - self.peak) / self.peak
+            self.max_drawdown = dd if np.isnan(self.max_drawdown) else min(self.max_drawdown, dd)
+        
+        self.n_bars += 1
+        self.last_close = close
+        self.last_signal = signal
+        self.last_timestamp = timestamp
+    
+    def extend(self, close: pd.Series, signal: pd.Series):
+        """Añade varias barras nuevas (Close y Signal alineados)"""
+        for ts, c, sig in zip(close.index, close.values, signal.values):
+            self.update(float(c), float(sig), ts)
+    
+    def metrics(self) -> Dict[str, float]:
+        """Métricas con las mismas reglas que BaseStrategy.backtest"""
+        if self.n_bars < 20:
+            return {"return": -np.inf, "sharpe": 0, "drawdown": -1}
+        
+        std = np.sqrt(self.m2 / (self.n_returns - 1)) if self.n_returns > 1 else np.nan
+        if std == 0 or np.isnan(std):
+            sharpe = 0
+        else:
+            sharpe = (self.mean / std) * np.sqrt(252)
+        
+        return {
+            "return": float(self.last_equity - 1),
+            "sharpe": float(sharpe),
+            "drawdown": float(self.max_drawdown)
+        }
+
+
 # ============================================
 # CLASE PADRE OPTIMIZADA
 # ============================================
@@ -119,7 +367,8 @@ class BaseStrategy(ABC):
         Backtest optimizado con cálculos vectorizados.
         
         Returns:
-            Dict con métricas: return, sharpe, drawdown, equity_curve
+            Dict con métricas: return, sharpe, drawdown, equity_curve,
+            estadísticas por operación (trades, win_rate, avg_bars_held...)
         """
         # Validación temprana
         if df.empty or len(df) < 20:
@@ -142,7 +391,7 @@ class BaseStrategy(ABC):
             }
         
         # Cálculos vectorizados de retornos
-        market_returns = df_signals['Close'].pct_change()
+        market_returns = df_signals['Close'].pct_change(fill_method=None)
         strategy_returns = market_returns * df_signals['Signal'].shift(1)
         
         # Curva de equity (cumulativa)
@@ -174,12 +423,157 @@ class BaseStrategy(ABC):
             # Anualizado (252 días de trading)
             sharpe = (mean_ret / std_ret) * np.sqrt(252)
         
+        # 4. ESTADÍSTICAS POR OPERACIÓN
+        from classes.trades import extract_trades, trade_stats
+        stats = trade_stats(extract_trades(df_signals['Signal'].values, df_signals['Close'].values))
+        
         return {
             "return": float(total_return),
             "sharpe": float(sharpe),
             "drawdown": float(max_drawdown),
-            "equity_curve": equity_curve
+            "equity_curve": equity_curve,
+            **stats,
+            "state": BacktestState.from_series(
+                df_signals['Close'], df_signals['Signal'], strategy_returns, equity_curve
+            )
+        }
+    
+    def backtest_fast(
+        self,
+        df: pd.DataFrame,
+        params: Dict,
+        max_drawdown: float = -np.inf,
+        best_score: float = -np.inf,
+        sharpe_cap: float = np.inf,
+        score_weights: Tuple[float, float, float] = (1.0, 0.1, 0.5),
+        with_trades: bool = False,
+        with_signal: bool = False
+    ) -> Dict[str, float]:
+        """
+        Backtest para barridos de parámetros: kernel Numba sin curva de equity
+        y con parada temprana (ver backtest_kernel).
+        
+        Args:
+            max_drawdown: abortar si el drawdown cae por debajo (p.ej. -0.60)
+            best_score: mejor score conocido; abortar si ya no se puede superar
+            sharpe_cap: Sharpe máximo supuesto en la cota (inf = sin poda por score)
+            score_weights: pesos (retorno, sharpe, |drawdown|) del score
+            with_trades: añadir estadísticas por operación (solo si no aborta)
+            with_signal: añadir 'signal' (serie completa, también si aborta)
+        
+        Returns:
+            Dict con return, sharpe, drawdown, bars (procesadas) y aborted
+        """
+        if df.empty or len(df) < 20:
+            return {"return": -np.inf, "sharpe": 0, "drawdown": -1, "bars": 0, "aborted": ABORT_NONE}
+        
+        try:
+            df_signals = self.generate_signals(df, params)
+        except Exception:
+            return {"return": -np.inf, "sharpe": 0, "drawdown": -1, "bars": 0, "aborted": ABORT_NONE}
+        
+        ret, sharpe, dd, bars, aborted = backtest_kernel(
+            df_signals['Close'].values.astype(np.float64),
+            df_signals['Signal'].values.astype(np.float64),
+            max_drawdown, best_score, sharpe_cap, *score_weights
+        )
+        result = {
+            "return": float(ret),
+            "sharpe": float(sharpe),
+            "drawdown": float(dd),
+            "bars": int(bars),
+            "aborted": int(aborted)
+        }
+        if with_trades and not aborted:
+            from classes.trades import extract_trades, trade_stats
+            result.update(trade_stats(extract_trades(df_signals['Signal'].values, df_signals['Close'].values)))
+        if with_signal:
+            result["signal"] = df_signals['Signal'].values.astype(np.float64)
+        return result
+    
+    def short_signals(self, df: pd.DataFrame, params: Dict) -> Optional[np.ndarray]:
+        """
+        Posiciones cortas (-1/0) a partir de un df con señales e indicadores,
+        con las mismas reglas SHORT del radar. None = estrategia solo long.
+        """
+        return None
+    
+    def generate_positions(self, df: pd.DataFrame, params: Dict) -> pd.DataFrame:
+        """Añade 'Position' (+1 long, -1 short, 0 fuera) además de 'Signal'"""
+        df = self.generate_signals(df, params)
+        position = df['Signal'].values.astype(np.float64)
+        short = self.short_signals(df, params)
+        if short is not None:
+            position = np.where(position > 0, position, short)
+        df['Position'] = position
+        return df
+    
+    def backtest_long_short(self, df: pd.DataFrame, params: Dict) -> Dict:
+        """
+        Backtest con posiciones con signo. Las métricas del total y de cada
+        pata (solo barras long / solo barras short) salen de una única
+        llamada vectorizada sobre las tres series de retornos.
+        
+        Returns:
+            Dict con return, sharpe, drawdown, equity_curve y 'long'/'short'
+            (return, sharpe, drawdown, exposure = fracción de barras en la pata)
+        """
+        empty_leg = {"return": 0.0, "sharpe": 0.0, "drawdown": 0.0, "exposure": 0.0}
+        failed = {
+            "return": -np.inf, "sharpe": 0, "drawdown": -1,
+            "equity_curve": pd.Series([1.0]), "long": empty_leg, "short": empty_leg
         }
+        if df.empty or len(df) < 20:
+            return failed
+        
+        try:
+            df_signals = self.generate_positions(df, params)
+        except Exception:
+            return failed
+        
+        market_returns = df_signals['Close'].pct_change(fill_method=None).values
+        held = np.empty(len(df_signals))
+        held[0] = np.nan
+        held[1:] = df_signals['Position'].values[:-1]
+        
+        total = market_returns * held
+        legs = np.vstack([
+            total,
+            np.where(held > 0, total, np.where(np.isnan(total), np.nan, 0.0)),
+            np.where(held < 0, total, np.where(np.isnan(total), np.nan, 0.0))
+        ])
+        m = metrics_from_returns(legs)
+        
+        valid = ~np.isnan(held)
+        n_valid = max(int(valid.sum()), 1)
+        
+        def leg(i, mask):
+            return {
+                "return": float(m["return"][i]),
+                "sharpe": float(m["sharpe"][i]),
+                "drawdown": float(m["drawdown"][i]),
+                "exposure": float(mask.sum() / n_valid)
+            }
+        
+        return {
+            "return": float(m["return"][0]),
+            "sharpe": float(m["sharpe"][0]),
+            "drawdown": float(m["drawdown"][0]),
+            "equity_curve": pd.Series(m["equity"][0], index=df_signals.index),
+            "long": leg(1, held > 0),
+            "short": leg(2, held < 0)
+        }
+    
+    def resume_backtest(self, state: BacktestState, df_new: pd.DataFrame) -> Dict[str, float]:
+        """
+        Actualiza un backtest previo con barras nuevas sin recalcular la serie.
+        
+        Args:
+            state: estado devuelto por backtest() (se modifica in-place)
+            df_new: barras posteriores a state.last_timestamp con 'Close' y 'Signal'
+        """
+        state.extend(df_new['Close'], df_new['Signal'])
+        return {**state.metrics(), "state": state}
 
 
 # ============================================
@@ -239,6 +633,12 @@ class MeanReversionStrategy(BaseStrategy):
         
         df['Signal'] = signals
         return df
+    
+    def short_signals(self, df: pd.DataFrame, params: Dict) -> Optional[np.ndarray]:
+        # Espejo: short en sobrecompra estando fuera, cubrir al volver a long
+        flat = df['Signal'].values == 0
+        entry = flat & (df['RSI'].values > params.get('rsi_high', 70))
+        return generate_short_positions(entry, flat)
 
 
 class BollingerBreakoutStrategy(BaseStrategy):
@@ -319,6 +719,11 @@ class EMAStrategy(BaseStrategy):
         df['Signal'] = np.where(df['EMA_Fast'] > df['EMA_Slow'], 1, 0)
         
         return df
+    
+    def short_signals(self, df: pd.DataFrame, params: Dict) -> Optional[np.ndarray]:
+        # Short mientras la EMA rápida esté por debajo de la lenta
+        below = (df['EMA_Fast'] < df['EMA_Slow']).values
+        return generate_short_positions(below, below)
 
 
 class StochRSIStrategy(BaseStrategy):
@@ -356,6 +761,13 @@ class StochRSIStrategy(BaseStrategy):
         df['Signal'] = np.where(df['Stoch_K'] > df['Stoch_D'], 1, 0)
         
         return df
+    
+    def short_signals(self, df: pd.DataFrame, params: Dict) -> Optional[np.ndarray]:
+        # Entrada en sobrecompra con K cruzando bajo D; se cubre cuando K > D
+        k = df['Stoch_K'].values
+        d = df['Stoch_D'].values
+        entry = (k > 80) & (k < d)
+        return generate_short_positions(entry, df['Signal'].values == 0)
 
 
 class AwesomeOscillatorStrategy(BaseStrategy):
@@ -448,6 +860,14 @@ class SuperTrendStrategy(BaseStrategy):
         df['Signal'] = np.where(trend == 1, 1, 0)
         
         return df
+    
+    def short_signals(self, df: pd.DataFrame, params: Dict) -> Optional[np.ndarray]:
+        # Cambio de tendencia: short al pasar de 1 a 0, hasta volver a 1
+        signal = df['Signal'].values
+        flat = signal == 0
+        entry = np.zeros(len(signal), dtype=np.bool_)
+        entry[1:] = flat[1:] & (signal[:-1] == 1)
+        return generate_short_positions(entry, flat)
 
 
 class SqueezeMomentumStrategy(BaseStrategy):
@@ -474,7 +894,7 @@ class SqueezeMomentumStrategy(BaseStrategy):
         close = df['Close'].values
         
         tr = calculate_tr_numba(high, low, close)
-        atr = pd.Series(tr).rolling(kc_len).mean()
+        atr = pd.Series(tr, index=df.index).rolling(kc_len).mean()
         
         kc_upper = mean + (atr * kc_mult)
         kc_lower = mean - (atr * kc_mult)
@@ -486,6 +906,14 @@ class SqueezeMomentumStrategy(BaseStrategy):
         df['Signal'] = np.where(df['Momentum'] > 0, 1, 0)
         
         return df
+    
+    def short_signals(self, df: pd.DataFrame, params: Dict) -> Optional[np.ndarray]:
+        # Momentum cruzando bajo cero; se mantiene mientras siga negativo
+        momentum = df['Momentum'].values
+        negative = momentum < 0
+        entry = np.zeros(len(momentum), dtype=np.bool_)
+        entry[1:] = negative[1:] & (momentum[:-1] >= 0)
+        return generate_short_positions(entry, negative)
 
 
 class ADXStrategy(BaseStrategy):
@@ -511,7 +939,7 @@ class ADXStrategy(BaseStrategy):
         
         # True Range con Numba
         tr = calculate_tr_numba(high.values, low.values, close.values)
-        atr = pd.Series(tr).rolling(period).mean()
+        atr = pd.Series(tr, index=df.index).rolling(period).mean()
         
         # Directional Indicators
         alpha = 1 / period
@@ -531,6 +959,30 @@ class ADXStrategy(BaseStrategy):
         return df
 
 
+# ============================================
+# REGISTRO DE ESTRATEGIAS
+# ============================================
+
+STRATEGY_REGISTRY = {
+    "Golden Cross (Trend)": GoldenCrossStrategy,
+    "RSI Mean Reversion": MeanReversionStrategy,
+    "Bollinger Breakout": BollingerBreakoutStrategy,
+    "MACD Momentum": MACDStrategy,
+    "EMA 8/21 Crossover": EMAStrategy,
+    "Stochastic RSI": StochRSIStrategy,
+    "Awesome Oscillator": AwesomeOscillatorStrategy,
+    "SuperTrend Pro": SuperTrendStrategy,
+    "Squeeze Momentum": SqueezeMomentumStrategy,
+    "ADX & DI Trend": ADXStrategy,
+}
+
+
+def get_strategy_by_name(name: str) -> Optional[BaseStrategy]:
+    """Instancia una estrategia por su nombre exacto (None si no existe)"""
+    strategy_class = STRATEGY_REGISTRY.get(name)
+    return strategy_class() if strategy_class else None
+
+
 # ============================================
 # EJEMPLO DE USO Y TESTING
 # ============================================
@@ -0,0 +1,735 @@
+# classes/streaming.py - INDICADORES INCREMENTALES (STREAMING)
+import pandas as pd
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Optional
+
+from classes.strategies import (
+    GoldenCrossStrategy, MeanReversionStrategy, BollingerBreakoutStrategy,
+    MACDStrategy, EMAStrategy, StochRSIStrategy, AwesomeOscillatorStrategy,
+    SuperTrendStrategy, SqueezeMomentumStrategy, ADXStrategy
+)
+
+"""
+Versiones con estado de todos los indicadores de classes/strategies.py y de
+RiskManager.calculate_atr. Cada update() cuesta O(1) (amortizado para
+mín/máx móviles) y el valor devuelto coincide con el último valor de la
+versión batch calculada sobre el histórico hasta esa barra.
+
+Uso típico:
+    engine = StreamingStrategy.from_history("EMA 8/21 Crossover", params, df)
+    signal = engine.update({"Open": o, "High": h, "Low": l, "Close": c})
+"""
+
+# ============================================
+# PRIMITIVAS INCREMENTALES
+# ============================================
+
+class RollingMean:
+    """
+    Equivalente a Series.rolling(window, min_periods).mean().
+    Reproduce el algoritmo de pandas (suma de Kahan con compensaciones
+    separadas para altas y bajas), por lo que el resultado es idéntico bit a bit.
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values = deque()
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._nobs = 0
+        self._neg_ct = 0
+        self._same = 0
+        self._prev = None
+        self.value = np.nan
+
+    def _add(self, x: float):
+        if np.isnan(x):
+            return
+        self._nobs += 1
+        y = x - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if np.signbit(x):
+            self._neg_ct += 1
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+
+    def _remove(self, x: float):
+        if np.isnan(x):
+            return
+        self._nobs -= 1
+        y = -x - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if np.signbit(x):
+            self._neg_ct -= 1
+
+    def update(self, x: float) -> float:
+        if self._prev is None:
+            self._prev = x
+
+        self._values.append(x)
+        if len(self._values) > self.window:
+            self._remove(self._values.popleft())
+        self._add(x)
+
+        nobs = self._nobs
+        if nobs >= self.min_periods and nobs > 0:
+            result = self._sum / nobs
+            if self._same >= nobs:
+                result = self._prev
+            elif self._neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self._neg_ct == nobs and result > 0:
+                result = 0.0
+            self.value = result
+        else:
+            self.value = np.nan
+        return self.value
+
+
+class RollingStd:
+    """
+    Equivalente a Series.rolling(window).std() (ddof=1).
+    Welford con altas y bajas, siguiendo el mismo algoritmo que pandas.
+    """
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        self._values = deque()
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._nobs = 0
+        self._same = 0
+        self._prev = None
+        self.value = np.nan
+
+    def _add(self, x: float):
+        if np.isnan(x):
+            return
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+        self._nobs += 1
+        prev_mean = self._mean - self._comp_add
+        y = x - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        self._mean += t / self._nobs
+        self._ssqdm += (x - prev_mean) * (x - self._mean)
+
+    def _remove(self, x: float):
+        if np.isnan(x):
+            return
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean - self._comp_remove
+            y = x - self._comp_remove
+            t = y - self._mean
+            self._comp_remove = t + self._mean - y
+            self._mean -= t / self._nobs
+            self._ssqdm -= (x - prev_mean) * (x - self._mean)
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+
+    def update(self, x: float) -> float:
+        if self._prev is None:
+            self._prev = x
+
+        self._values.append(x)
+        if len(self._values) > self.window:
+            self._remove(self._values.popleft())
+        self._add(x)
+
+        nobs = self._nobs
+        if nobs >= self.window and nobs > self.ddof:
+            if nobs == 1 or self._same >= nobs:
+                var = 0.0
+            else:
+                var = self._ssqdm / (nobs - self.ddof)
+            self.value = float(np.sqrt(var)) if var >= 0 else 0.0
+        else:
+            self.value = np.nan
+        return self.value
+
+
+class RollingExtreme:
+    """Mín/máx móvil con deque monótona (O(1) amortizado)"""
+
+    def __init__(self, window: int, mode: str = "min"):
+        if mode not in ("min", "max"):
+            raise ValueError(f"Modo inválido: {mode}")
+        self.window = window
+        self._better = (lambda a, b: a <= b) if mode == "min" else (lambda a, b: a >= b)
+        self._deque = deque()  # (índice, valor)
+        self._nan_idx = deque()
+        self._i = -1
+        self.value = np.nan
+
+    def update(self, x: float) -> float:
+        self._i += 1
+        start = self._i - self.window + 1
+
+        if np.isnan(x):
+            self._nan_idx.append(self._i)
+        else:
+            while self._deque and self._better(x, self._deque[-1][1]):
+                self._deque.pop()
+            self._deque.append((self._i, x))
+
+        while self._deque and self._deque[0][0] < start:
+            self._deque.popleft()
+        while self._nan_idx and self._nan_idx[0] < start:
+            self._nan_idx.popleft()
+
+        # min_periods = window: cualquier NaN en la ventana anula el valor
+        if self._i + 1 >= self.window and not self._nan_idx and self._deque:
+            self.value = self._deque[0][1]
+        else:
+            self.value = np.nan
+        return self.value
+
+
+class EWM:
+    """
+    Equivalente exacto a Series.ewm(...).mean() (ignore_na=False),
+    tanto con adjust=True como adjust=False.
+    """
+
+    def __init__(
+        self,
+        span: Optional[float] = None,
+        alpha: Optional[float] = None,
+        adjust: bool = True
+    ):
+        if alpha is None:
+            if span is None:
+                raise ValueError("Se requiere span o alpha")
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self.adjust = adjust
+        self._old_wt_factor = 1.0 - alpha
+        self._new_wt = 1.0 if adjust else alpha
+        self._old_wt = 1.0
+        self._weighted = np.nan
+        self._started = False
+        self.value = np.nan
+
+    def update(self, x: float) -> float:
+        is_obs = not np.isnan(x)
+
+        if not self._started:
+            self._weighted = x
+            self._started = True
+        elif not np.isnan(self._weighted):
+            self._old_wt *= self._old_wt_factor
+            if is_obs:
+                if self._weighted != x:
+                    self._weighted = (
+                        (self._old_wt * self._weighted + self._new_wt * x) /
+                        (self._old_wt + self._new_wt)
+                    )
+                if self.adjust:
+                    self._old_wt += self._new_wt
+                else:
+                    self._old_wt = 1.0
+        elif is_obs:
+            self._weighted = x
+
+        self.value = self._weighted
+        return self.value
+
+
+class TrueRange:
+    """
+    True Range incremental.
+    first_bar='hl' replica calculate_tr_numba (primera barra = High - Low);
+    first_bar='nan' replica RiskManager.calculate_atr (primera barra = NaN).
+    """
+
+    def __init__(self, first_bar: str = "hl"):
+        self.first_bar = first_bar
+        self._prev_close = None
+        self.value = np.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self._prev_close is None:
+            self.value = (high - low) if self.first_bar == "hl" else np.nan
+        else:
+            hl = high - low
+            hc = abs(high - self._prev_close)
+            lc = abs(low - self._prev_close)
+            if self.first_bar == "nan" and (np.isnan(hl) or np.isnan(hc) or np.isnan(lc)):
+                self.value = np.nan
+            else:
+                self.value = max(hl, hc, lc)
+        self._prev_close = close
+        return self.value
+
+
+class WilderRSI:
+    """
+    RSI incremental con la misma recursión que calculate_rsi_numba.
+
+    El valor tras cada barra coincide con el último elemento de
+    calculate_rsi_numba(precios_hasta_esa_barra), incluida la semilla de
+    period+1 deltas y el valor 0 en la posición `period`.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._last_price = None
+        self._n_deltas = 0
+        self._seed_up = 0.0
+        self._seed_down = 0.0
+        self._up = 0.0
+        self._down = 0.0
+        self.value = np.nan
+
+    @staticmethod
+    def _rsi(up: float, down: float) -> float:
+        rs = up / down if down != 0 else 0
+        return 100 - (100 / (1 + rs))
+
+    def _wilder_step(self, delta: float):
+        if delta > 0:
+            upval, downval = delta, 0.0
+        else:
+            upval, downval = 0.0, -delta
+        self._up = (self._up * (self.period - 1) + upval) / self.period
+        self._down = (self._down * (self.period - 1) + downval) / self.period
+
+    def update(self, price: float) -> float:
+        if self._last_price is None:
+            self._last_price = price
+            self.value = self._rsi(0.0, 0.0)
+            return self.value
+
+        delta = price - self._last_price
+        self._last_price = price
+        self._n_deltas += 1
+        k = self._n_deltas
+
+        if k <= self.period + 1:
+            # Semilla: deltas[:period+1]
+            if delta >= 0:
+                self._seed_up += delta
+            elif delta < 0:
+                self._seed_down += delta
+            self._up = self._seed_up / self.period
+            self._down = -self._seed_down / self.period
+
+            if k < self.period:
+                self.value = self._rsi(self._up, self._down)
+            elif k == self.period:
+                self.value = 0.0  # rsi[period] nunca se asigna en la versión batch
+            else:
+                self._wilder_step(delta)
+                self.value = self._rsi(self._up, self._down)
+        else:
+            self._wilder_step(delta)
+            self.value = self._rsi(self._up, self._down)
+
+        return self.value
+
+
+class StreamingATR:
+    """Equivalente incremental de RiskManager.calculate_atr(period)"""
+
+    def __init__(self, period: int = 14):
+        self._tr = TrueRange(first_bar="nan")
+        self._mean = RollingMean(period, min_periods=1)
+        self.value = np.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.value = self._mean.update(self._tr.update(high, low, close))
+        return self.value
+
+
+# ============================================
+# ESTRATEGIAS INCREMENTALES
+# ============================================
+
+class StreamingStrategy(ABC):
+    """
+    Clase base: mantiene el estado de los indicadores de una estrategia y
+    devuelve la señal (0/1) de cada barra nueva en O(1).
+
+    `values` expone los últimos valores con los mismos nombres de columna
+    que la versión batch (RSI, EMA_Fast, Stoch_K, ...).
+    """
+
+    name = ""
+
+    def __init__(self, params: Dict):
+        self.params = params
+        self.values: Dict[str, float] = {}
+        self.signal = 0
+        self.bars = 0
+
+    def update(self, bar: Dict[str, float]) -> int:
+        self.bars += 1
+        self.signal = int(self._step(bar))
+        self.values['Signal'] = self.signal
+        return self.signal
+
+    @abstractmethod
+    def _step(self, bar: Dict[str, float]) -> int:
+        """Actualiza los indicadores con la barra y devuelve la señal (0/1)"""
+        pass
+
+    def _sync_signal(self, signal: float):
+        """Alinea el estado de posición con la señal batch del histórico"""
+        self.signal = int(signal)
+        self.values['Signal'] = self.signal
+
+    @classmethod
+    def from_history(
+        cls,
+        strategy_name: str,
+        params: Dict,
+        df: pd.DataFrame,
+        last_signal: Optional[float] = None
+    ) -> "StreamingStrategy":
+        """
+        Crea el motor y lo calienta con el histórico (coste O(n) una vez).
+
+        El estado de posición se sincroniza con la señal batch final: las
+        primeras barras de RSI dependen de datos futuros en la versión batch
+        y podrían dejar una máquina de estados distinta durante el warm-up.
+        Si ya se conoce esa señal (p.ej. de un backtest) se pasa en
+        `last_signal` y se evita recalcularla.
+        """
+        engine = create_streaming_strategy(strategy_name, params)
+        cols = [c for c in ['Open', 'High', 'Low', 'Close'] if c in df.columns]
+        for row in df[cols].itertuples(index=False):
+            engine.update(dict(zip(cols, row)))
+
+        if last_signal is None and len(df):
+            batch = STREAMING_STRATEGIES[strategy_name][1]()
+            last_signal = batch.generate_signals(df.copy(), params)['Signal'].iloc[-1]
+        if last_signal is not None:
+            engine._sync_signal(last_signal)
+        return engine
+
+
+class StreamingGoldenCross(StreamingStrategy):
+    name = "Golden Cross (Trend)"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        self._fast = RollingMean(params.get('fast', 50))
+        self._slow = RollingMean(params.get('slow', 200))
+
+    def _step(self, bar):
+        fast = self._fast.update(bar['Close'])
+        slow = self._slow.update(bar['Close'])
+        self.values.update(SMA_Fast=fast, SMA_Slow=slow)
+        return fast > slow
+
+
+class StreamingMeanReversion(StreamingStrategy):
+    name = "RSI Mean Reversion"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        self._rsi = WilderRSI(14)
+        self._low = params.get('rsi_low', 30)
+        self._high = params.get('rsi_high', 70)
+
+    def _step(self, bar):
+        rsi = self._rsi.update(bar['Close'])
+        self.values['RSI'] = rsi
+        position = self.signal
+        if position == 0 and rsi < self._low:
+            position = 1
+        elif position == 1 and rsi > self._high:
+            position = 0
+        return position
+
+
+class StreamingBollinger(StreamingStrategy):
+    name = "Bollinger Breakout"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        window = params.get('window', 20)
+        self._std_dev = params.get('std_dev', 2)
+        self._mean = RollingMean(window)
+        self._std = RollingStd(window)
+        self._position = 0
+
+    def _step(self, bar):
+        close = bar['Close']
+        mid = self._mean.update(close)
+        std = self._std.update(close)
+        upper = mid + std * self._std_dev
+        self.values.update(BB_Mid=mid, BB_Upper=upper, BB_Lower=mid - std * self._std_dev)
+
+        if np.isnan(upper):
+            return 0
+        if self._position == 0 and close > upper:
+            self._position = 1
+        elif self._position == 1 and close < mid:
+            self._position = 0
+        return self._position
+
+    def _sync_signal(self, signal):
+        super()._sync_signal(signal)
+        self._position = int(signal)
+
+
+class StreamingMACD(StreamingStrategy):
+    name = "MACD Momentum"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        self._fast = EWM(span=params.get('fast', 12), adjust=False)
+        self._slow = EWM(span=params.get('slow', 26), adjust=False)
+        self._signal = EWM(span=params.get('signal', 9), adjust=False)
+
+    def _step(self, bar):
+        macd = self._fast.update(bar['Close']) - self._slow.update(bar['Close'])
+        line = self._signal.update(macd)
+        self.values.update(MACD=macd, Signal_Line=line)
+        return macd > line
+
+
+class StreamingEMA(StreamingStrategy):
+    name = "EMA 8/21 Crossover"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        self._fast = EWM(span=params.get('fast', 8), adjust=False)
+        self._slow = EWM(span=params.get('slow', 21), adjust=False)
+
+    def _step(self, bar):
+        fast = self._fast.update(bar['Close'])
+        slow = self._slow.update(bar['Close'])
+        self.values.update(EMA_Fast=fast, EMA_Slow=slow)
+        return fast > slow
+
+
+class StreamingStochRSI(StreamingStrategy):
+    name = "Stochastic RSI"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        stoch_period = params.get('stoch_period', 14)
+        self._rsi = WilderRSI(params.get('rsi_period', 14))
+        self._min = RollingExtreme(stoch_period, "min")
+        self._max = RollingExtreme(stoch_period, "max")
+        self._k = RollingMean(params.get('k_period', 3))
+        self._d = RollingMean(params.get('d_period', 3))
+
+    def _step(self, bar):
+        rsi = self._rsi.update(bar['Close'])
+        min_rsi = self._min.update(rsi)
+        max_rsi = self._max.update(rsi)
+
+        denominator = max_rsi - min_rsi
+        stoch = (rsi - min_rsi) / denominator if denominator != 0 else 0.0
+
+        k = self._k.update(stoch) * 100
+        d = self._d.update(k)
+        self.values.update(RSI_Base=rsi, StochRSI=stoch, Stoch_K=k, Stoch_D=d)
+        return k > d
+
+
+class StreamingAwesome(StreamingStrategy):
+    name = "Awesome Oscillator"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        self._fast = RollingMean(params.get('fast', 5))
+        self._slow = RollingMean(params.get('slow', 34))
+
+    def _step(self, bar):
+        median = (bar['High'] + bar['Low']) / 2
+        ao = self._fast.update(median) - self._slow.update(median)
+        self.values['AO'] = ao
+        return ao > 0
+
+
+class StreamingSuperTrend(StreamingStrategy):
+    name = "SuperTrend Pro"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        self._multiplier = params.get('multiplier', 3.0)
+        self._tr = TrueRange(first_bar="hl")
+        self._atr = RollingMean(params.get('period', 10))
+        self._final_upper = 0.0
+        self._final_lower = 0.0
+        self._trend = 0.0
+        self._prev_close = None
+
+    def _step(self, bar):
+        high, low, close = bar['High'], bar['Low'], bar['Close']
+        atr = self._atr.update(self._tr.update(high, low, close))
+
+        if self._prev_close is None:
+            # Barra 0: la versión batch deja bandas, tendencia y SuperTrend a 0
+            self._prev_close = close
+            self.values.update(SuperTrend=0.0, Trend_Dir=0.0)
+            return 0
+
+        hl2 = (high + low) / 2
+        basic_upper = hl2 + (self._multiplier * atr)
+        basic_lower = hl2 - (self._multiplier * atr)
+        prev_upper, prev_lower = self._final_upper, self._final_lower
+
+        if basic_upper < prev_upper or self._prev_close > prev_upper:
+            final_upper = basic_upper
+        else:
+            final_upper = prev_upper
+
+        if basic_lower > prev_lower or self._prev_close < prev_lower:
+            final_lower = basic_lower
+        else:
+            final_lower = prev_lower
+
+        if self._trend == 1:
+            if close < final_lower:
+                trend, supertrend = -1.0, final_upper
+            else:
+                trend, supertrend = 1.0, final_lower
+        else:
+            if close > final_upper:
+                trend, supertrend = 1.0, final_lower
+            else:
+                trend, supertrend = -1.0, final_upper
+
+        self._final_upper, self._final_lower = final_upper, final_lower
+        self._trend = trend
+        self._prev_close = close
+        self.values.update(SuperTrend=supertrend, Trend_Dir=trend)
+        return trend == 1
+
+
+class StreamingSqueeze(StreamingStrategy):
+    name = "Squeeze Momentum"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        bb_len = params.get('bb_len', 20)
+        self._hl2_mean = RollingMean(bb_len)
+        self._momentum = EWM(span=bb_len, adjust=False)
+
+    def _step(self, bar):
+        hl2 = (bar['High'] + bar['Low']) / 2
+        val = bar['Close'] - self._hl2_mean.update(hl2)
+        momentum = self._momentum.update(val)
+        self.values['Momentum'] = momentum
+        return momentum > 0
+
+
+class StreamingADX(StreamingStrategy):
+    name = "ADX & DI Trend"
+
+    def __init__(self, params: Dict):
+        super().__init__(params)
+        period = params.get('period', 14)
+        alpha = 1 / period
+        self._threshold = params.get('adx_threshold', 25)
+        self._tr = TrueRange(first_bar="hl")
+        self._atr = RollingMean(period)
+        self._plus = EWM(alpha=alpha, adjust=True)
+        self._minus = EWM(alpha=alpha, adjust=True)
+        self._adx = EWM(alpha=alpha, adjust=True)
+        self._prev_high = None
+        self._prev_low = None
+
+    def _step(self, bar):
+        high, low = bar['High'], bar['Low']
+
+        if self._prev_high is None:
+            plus_dm = minus_dm = np.nan
+        else:
+            plus_dm = max(high - self._prev_high, 0.0)
+            minus_dm = max(self._prev_low - low, 0.0)
+        self._prev_high, self._prev_low = high, low
+
+        atr = np.float64(self._atr.update(self._tr.update(high, low, bar['Close'])))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * (np.float64(self._plus.update(plus_dm)) / atr)
+            minus_di = 100 * (np.float64(self._minus.update(minus_dm)) / atr)
+            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = self._adx.update(float(dx))
+
+        self.values['ADX'] = adx
+        return adx > self._threshold and plus_di > minus_di
+
+
+# ============================================
+# FACTORY Y MOTOR DE UNIVERSO
+# ============================================
+
+STREAMING_STRATEGIES = {
+    "Golden Cross (Trend)": (StreamingGoldenCross, GoldenCrossStrategy),
+    "RSI Mean Reversion": (StreamingMeanReversion, MeanReversionStrategy),
+    "Bollinger Breakout": (StreamingBollinger, BollingerBreakoutStrategy),
+    "MACD Momentum": (StreamingMACD, MACDStrategy),
+    "EMA 8/21 Crossover": (StreamingEMA, EMAStrategy),
+    "Stochastic RSI": (StreamingStochRSI, StochRSIStrategy),
+    "Awesome Oscillator": (StreamingAwesome, AwesomeOscillatorStrategy),
+    "SuperTrend Pro": (StreamingSuperTrend, SuperTrendStrategy),
+    "Squeeze Momentum": (StreamingSqueeze, SqueezeMomentumStrategy),
+    "ADX & DI Trend": (StreamingADX, ADXStrategy),
+}
+
+
+def create_streaming_strategy(strategy_name: str, params: Dict) -> StreamingStrategy:
+    """Instancia el motor incremental de una estrategia por nombre"""
+    if strategy_name not in STREAMING_STRATEGIES:
+        raise ValueError(f"Estrategia sin versión incremental: {strategy_name}")
+    return STREAMING_STRATEGIES[strategy_name][0](params)
+
+
+class StreamingUniverse:
+    """
+    Motores incrementales para todo el universo.
+    Cada barra nueva actualiza señal y ATR de un ticker en O(1).
+    """
+
+    def __init__(self, atr_period: int = 14):
+        self.atr_period = atr_period
+        self.engines: Dict[str, StreamingStrategy] = {}
+        self.atr: Dict[str, StreamingATR] = {}
+
+    def add(self, ticker: str, strategy_name: str, params: Dict, df: pd.DataFrame):
+        """Registra un ticker y calienta su estado con el histórico"""
+        self.engines[ticker] = StreamingStrategy.from_history(strategy_name, params, df)
+        atr = StreamingATR(self.atr_period)
+        for h, l, c in zip(df['High'].values, df['Low'].values, df['Close'].values):
+            atr.update(h, l, c)
+        self.atr[ticker] = atr
+
+    def update(self, bars: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        """
+        Aplica una barra nueva por ticker.
+
+        Returns:
+            {ticker: {'Signal': ..., 'ATR': ..., <indicadores>}}
+        """
+        snapshot = {}
+        for ticker, bar in bars.items():
+            engine = self.engines.get(ticker)
+            if engine is None:
+                continue
+            engine.update(bar)
+            atr = self.atr[ticker].update(bar['High'], bar['Low'], bar['Close'])
+            snapshot[ticker] = {**engine.values, 'ATR': atr}
+        return snapshot
+
+    def tickers(self) -> List[str]:
+        return list(self.engines.keys())
@@ -0,0 +1,368 @@
+# classes/trades.py - SIMULACIÓN DE OPERACIONES (STOP LOSS / TAKE PROFIT)
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from numba import jit
+import config as cfg
+
+from classes.strategies import metrics_from_returns
+from classes.risk_manager import RiskManager
+
+"""
+Simulación barra a barra con las salidas del RiskManager:
+1. Entrada al cierre de la barra en que cambia la posición (como el radar)
+2. Stop = entrada -/+ ATR * atr_multiplier; objetivo = riesgo * rr_ratio
+3. Salidas intrabarra con High/Low; si ambas se tocan en la misma vela
+   se asume el stop (criterio conservador); gaps ejecutan en la apertura
+4. Devuelve la lista de operaciones (array estructurado) y los retornos
+   diarios marcados a mercado para calcular métricas
+5. Extracción de operaciones de una serie de posiciones sin stops
+   (marcadores del gráfico, señal nueva del radar, estadísticas)
+"""
+
+# Motivos de salida
+EXIT_SIGNAL = 0
+EXIT_STOP = 1
+EXIT_TARGET = 2
+EXIT_END = 3
+
+EXIT_REASONS = {
+    EXIT_SIGNAL: "SEÑAL",
+    EXIT_STOP: "STOP",
+    EXIT_TARGET: "OBJETIVO",
+    EXIT_END: "FIN DATOS"
+}
+
+TRADE_DTYPE = np.dtype([
+    ('entry_idx', np.int64),
+    ('exit_idx', np.int64),
+    ('direction', np.int8),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('stop_loss', np.float64),
+    ('take_profit', np.float64),
+    ('ret', np.float64),
+    ('bars_held', np.int64),
+    ('exit_reason', np.int8)
+])
+
+
+# ============================================
+# KERNEL NUMBA
+# ============================================
+
+@jit(nopython=True)
+def _simulate_kernel(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    position: np.ndarray,
+    atr_multiplier: float,
+    rr_ratio: float
+):
+    n = len(close)
+    bar_returns = np.zeros(n)
+    bar_returns[0] = np.nan
+
+    # Columnas de las operaciones (como mucho una por barra)
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    direction = np.empty(n, dtype=np.int8)
+    entry_price = np.empty(n)
+    exit_price = np.empty(n)
+    stop_loss = np.empty(n)
+    take_profit = np.empty(n)
+    exit_reason = np.empty(n, dtype=np.int8)
+    n_trades = 0
+
+    side = 0
+    stop = 0.0
+    target = 0.0
+    mark = 0.0          # último precio marcado de la operación abierta
+    armed = False       # señal nueva aún sin operación (p.ej. esperando ATR)
+
+    for i in range(n):
+        # Barras sin precio (o tras una) no tienen retorno, como en pct_change
+        if i > 0 and (np.isnan(close[i]) or np.isnan(close[i-1])):
+            bar_returns[i] = np.nan
+
+        # 1. Gestión de la operación abierta (desde la barra siguiente a la entrada)
+        if side != 0 and i > entry_idx[n_trades - 1]:
+            price = np.nan
+            reason = -1
+
+            if side == 1:
+                if open_[i] <= stop:
+                    price, reason = open_[i], EXIT_STOP
+                elif open_[i] >= target:
+                    price, reason = open_[i], EXIT_TARGET
+                elif low[i] <= stop:
+                    price, reason = stop, EXIT_STOP
+                elif high[i] >= target:
+                    price, reason = target, EXIT_TARGET
+            else:
+                if open_[i] >= stop:
+                    price, reason = open_[i], EXIT_STOP
+                elif open_[i] <= target:
+                    price, reason = open_[i], EXIT_TARGET
+                elif high[i] >= stop:
+                    price, reason = stop, EXIT_STOP
+                elif low[i] <= target:
+                    price, reason = target, EXIT_TARGET
+
+            if reason == -1 and position[i] != side:
+                price, reason = close[i], EXIT_SIGNAL
+
+            if reason == -1:
+                bar_returns[i] = side * (close[i] / mark - 1)
+                mark = close[i]
+            else:
+                bar_returns[i] = side * (price / mark - 1)
+                k = n_trades - 1
+                exit_idx[k] = i
+                exit_price[k] = price
+                exit_reason[k] = reason
+                side = 0
+
+        # 2. Entrada: señal nueva (tras un stop no se re-entra hasta que cambie)
+        if i == 0 or position[i] != position[i-1]:
+            armed = position[i] != 0
+        if side == 0 and armed and not np.isnan(close[i]) and not np.isnan(atr[i]) and atr[i] > 0:
+            armed = False
+            risk = atr[i] * atr_multiplier
+            side = 1 if position[i] > 0 else -1
+            stop = close[i] - side * risk
+            target = close[i] + side * risk * rr_ratio
+            mark = close[i]
+
+            entry_idx[n_trades] = i
+            direction[n_trades] = side
+            entry_price[n_trades] = close[i]
+            stop_loss[n_trades] = stop
+            take_profit[n_trades] = target
+            n_trades += 1
+
+    # Operación abierta al final: se cierra al último cierre
+    if side != 0:
+        k = n_trades - 1
+        exit_idx[k] = n - 1
+        exit_price[k] = close[n - 1]
+        exit_reason[k] = EXIT_END
+
+    return (
+        bar_returns, entry_idx[:n_trades], exit_idx[:n_trades], direction[:n_trades],
+        entry_price[:n_trades], exit_price[:n_trades], stop_loss[:n_trades],
+        take_profit[:n_trades], exit_reason[:n_trades]
+    )
+
+
+@jit(nopython=True)
+def _extract_kernel(position: np.ndarray, close: np.ndarray):
+    """Operaciones = tramos de posición constante distinta de 0 (NaN = fuera)"""
+    n = len(close)
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    direction = np.empty(n, dtype=np.int8)
+    entry_price = np.empty(n)
+    exit_price = np.empty(n)
+    exit_reason = np.empty(n, dtype=np.int8)
+    n_trades = 0
+    side = 0
+
+    for i in range(n):
+        p = position[i]
+        current = 0 if np.isnan(p) or p == 0 else (1 if p > 0 else -1)
+
+        if side != 0 and current != side:
+            k = n_trades - 1
+            exit_idx[k] = i
+            exit_price[k] = close[i]
+            exit_reason[k] = EXIT_SIGNAL
+
+        if current != 0 and current != side:
+            entry_idx[n_trades] = i
+            direction[n_trades] = current
+            entry_price[n_trades] = close[i]
+            n_trades += 1
+
+        side = current
+
+    # Operación abierta: marcada al último cierre
+    if side != 0:
+        k = n_trades - 1
+        exit_idx[k] = n - 1
+        exit_price[k] = close[n - 1]
+        exit_reason[k] = EXIT_END
+
+    nan_levels = np.full(n_trades, np.nan)
+    return (
+        entry_idx[:n_trades], exit_idx[:n_trades], direction[:n_trades],
+        entry_price[:n_trades], exit_price[:n_trades], nan_levels, nan_levels.copy(),
+        exit_reason[:n_trades]
+    )
+
+
+def _pack_trades(entry_idx, exit_idx, direction, entry_price, exit_price, stop_loss, take_profit, exit_reason) -> np.ndarray:
+    trades = np.empty(len(entry_idx), dtype=TRADE_DTYPE)
+    trades['entry_idx'] = entry_idx
+    trades['exit_idx'] = exit_idx
+    trades['direction'] = direction
+    trades['entry_price'] = entry_price
+    trades['exit_price'] = exit_price
+    trades['stop_loss'] = stop_loss
+    trades['take_profit'] = take_profit
+    trades['ret'] = direction * (exit_price / entry_price - 1)
+    trades['bars_held'] = exit_idx - entry_idx
+    trades['exit_reason'] = exit_reason
+    return trades
+
+
+# ============================================
+# API
+# ============================================
+
+def _ohlc(df: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+    open_ = df['Open'] if 'Open' in df.columns else df['Close']
+    return tuple(np.asarray(c.values, dtype=np.float64) for c in (open_, df['High'], df['Low'], df['Close']))
+
+
+def simulate_trades(
+    df: pd.DataFrame,
+    position: np.ndarray,
+    atr_multiplier: Optional[float] = None,
+    rr_ratio: Optional[float] = None,
+    atr: Optional[np.ndarray] = None
+) -> Dict:
+    """
+    Simula las operaciones de una serie de posiciones (+1/-1/0) con stops.
+
+    Args:
+        df: OHLC del activo
+        position: posición deseada por barra ('Signal' o 'Position')
+        atr_multiplier, rr_ratio: por defecto los de RiskConfig
+        atr: ATR precalculado (por defecto RiskManager.calculate_atr(14))
+
+    Returns:
+        Dict con return, sharpe, drawdown, trades (TRADE_DTYPE) y bar_returns
+    """
+    atr_multiplier = atr_multiplier if atr_multiplier is not None else cfg.RISK.atr_multiplier
+    rr_ratio = rr_ratio if rr_ratio is not None else cfg.RISK.rr_ratio
+    return simulate_stop_grid(df, position, [(atr_multiplier, rr_ratio)], atr)[0]
+
+
+def simulate_stop_grid(
+    df: pd.DataFrame,
+    position: np.ndarray,
+    stop_grid: List[Tuple[float, float]],
+    atr: Optional[np.ndarray] = None
+) -> List[Dict]:
+    """
+    Evalúa varias configuraciones (atr_multiplier, rr_ratio) sobre la
+    misma serie de posiciones: OHLC y ATR se preparan una sola vez y las
+    métricas salen de una única llamada vectorizada.
+    """
+    if atr is None:
+        atr = RiskManager(df).calculate_atr(14).values
+    ohlc = _ohlc(df)
+    atr = np.asarray(atr, dtype=np.float64)
+    position = np.asarray(position, dtype=np.float64)
+
+    runs = [
+        _simulate_kernel(*ohlc, atr, position, float(mult), float(rr))
+        for mult, rr in stop_grid
+    ]
+    m = metrics_from_returns(np.vstack([run[0] for run in runs]))
+
+    return [
+        {
+            "return": float(m["return"][i]),
+            "sharpe": float(m["sharpe"][i]),
+            "drawdown": float(m["drawdown"][i]),
+            "trades": _pack_trades(*run[1:]),
+            "bar_returns": run[0]
+        }
+        for i, run in enumerate(runs)
+    ]
+
+
+def extract_trades(position: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    Lista de operaciones (TRADE_DTYPE) de una serie de posiciones.
+
+    Entrada y salida al cierre de la barra en que cambia la posición, como
+    en BaseStrategy.backtest; la última operación puede seguir abierta
+    (exit_reason == EXIT_END). Sin stops: stop_loss/take_profit son NaN.
+    """
+    return _pack_trades(*_extract_kernel(
+        np.asarray(position, dtype=np.float64), np.asarray(close, dtype=np.float64)
+    ))
+
+
+def trade_stats(trades: np.ndarray) -> Dict[str, float]:
+    """
+    Estadísticas por operación (vectorizadas sobre el array de trades).
+
+    Returns:
+        Dict con trades, win_rate, avg_return, avg_win, avg_loss,
+        profit_factor, avg_bars_held y max_bars_held
+    """
+    n = len(trades)
+    if n == 0:
+        return {
+            "trades": 0, "win_rate": 0.0, "avg_return": 0.0, "avg_win": 0.0,
+            "avg_loss": 0.0, "profit_factor": 0.0, "avg_bars_held": 0.0, "max_bars_held": 0
+        }
+
+    ret = trades['ret']
+    wins = ret > 0
+    gains = ret[wins].sum()
+    losses = -ret[~wins].sum()
+
+    return {
+        "trades": int(n),
+        "win_rate": float(wins.mean()),
+        "avg_return": float(ret.mean()),
+        "avg_win": float(ret[wins].mean()) if wins.any() else 0.0,
+        "avg_loss": float(ret[~wins].mean()) if (~wins).any() else 0.0,
+        "profit_factor": float(gains / losses) if losses > 0 else float(np.inf if gains > 0 else 0.0),
+        "avg_bars_held": float(trades['bars_held'].mean()),
+        "max_bars_held": int(trades['bars_held'].max())
+    }
+
+
+def signal_markers(df: pd.DataFrame, column: str = 'Signal') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Barras de entrada y de salida de las operaciones long (marcadores del
+    gráfico). Las operaciones abiertas no tienen marcador de salida.
+    """
+    trades = extract_trades(df[column].values, df['Close'].values)
+    longs = trades[trades['direction'] > 0]
+    closed = longs[longs['exit_reason'] != EXIT_END]
+    return df.iloc[longs['entry_idx']], df.iloc[closed['exit_idx']]
+
+
+def last_bar_events(position: np.ndarray, close: np.ndarray) -> Tuple[bool, bool]:
+    """
+    (entrada nueva, salida) en la última barra: la última operación empieza
+    en ella, o una operación termina en ella por cambio de señal.
+    """
+    trades = extract_trades(position, close)
+    last = len(close) - 1
+    if len(trades) == 0:
+        return False, False
+    is_new = bool(trades['entry_idx'][-1] == last and trades['exit_reason'][-1] == EXIT_END)
+    signal_exits = trades['exit_idx'][trades['exit_reason'] == EXIT_SIGNAL]
+    return is_new, bool(len(signal_exits) and signal_exits[-1] == last)
+
+
+def trades_frame(trades: np.ndarray, index: Optional[pd.Index] = None) -> pd.DataFrame:
+    """Lista de operaciones legible (fechas, dirección y motivo de salida)"""
+    df = pd.DataFrame(trades)
+    df['direction'] = np.where(df['direction'] > 0, "LONG", "SHORT")
+    df['exit_reason'] = df['exit_reason'].map(EXIT_REASONS)
+    if index is not None and len(df):
+        df.insert(0, 'entry_date', index[df['entry_idx'].values])
+        df.insert(1, 'exit_date', index[df['exit_idx'].values])
+    return df
@@ -0,0 +1,164 @@
+# classes/universe.py - UNIVERSO DESDE FICHERO + ÍNDICE DE METADATOS
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+import config as cfg
+
+"""
+Universos de cientos o miles de símbolos sin tocar código:
+1. Fichero CSV o JSON con symbol, sector, asset_class y calendar (solo
+   symbol es obligatorio; texto plano = un símbolo por línea)
+2. Índice hash símbolo -> SymbolInfo y sector/clase -> símbolos: todas las
+   consultas son O(1)
+3. chunks(): lotes de APP.max_tickers_por_escaneo para escanear con
+   memoria acotada
+4. load_universe(): APP.universo_fichero (o TRADEXPERT_UNIVERSE) y, si no
+   hay fichero, el AssetUniverse de config
+"""
+
+CALENDARIO_CRYPTO = "24/7"
+CALENDARIO_BOLSA = "XNYS"
+
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """Metadatos de un símbolo del universo"""
+    symbol: str
+    sector: str = "UNKNOWN"
+    asset_class: str = "equity"
+    calendar: str = CALENDARIO_BOLSA
+
+
+def _infer_asset_class(symbol: str, sector: str) -> str:
+    if sector == "CRYPTO" or symbol.endswith("-USD"):
+        return "crypto"
+    if sector == "INDICES":
+        return "etf"
+    return "equity"
+
+
+def make_info(symbol: str, sector: Optional[str] = None, asset_class: Optional[str] = None,
+              calendar: Optional[str] = None) -> SymbolInfo:
+    """SymbolInfo normalizado; clase y calendario se deducen si faltan"""
+    symbol = symbol.strip().upper()
+    sector = (sector or "UNKNOWN").strip().upper() or "UNKNOWN"
+    asset_class = (asset_class or _infer_asset_class(symbol, sector)).strip().lower()
+    calendar = calendar or (CALENDARIO_CRYPTO if asset_class == "crypto" else CALENDARIO_BOLSA)
+    return SymbolInfo(symbol, sector, asset_class, calendar)
+
+
+def chunked(items: Sequence, size: int) -> Iterator[List]:
+    """Lotes consecutivos de como máximo `size` elementos"""
+    size = max(int(size), 1)
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
+
+
+class Universe:
+    """Símbolos en orden de carga con índices hash de metadatos"""
+
+    def __init__(self, infos: Sequence[SymbolInfo], name: str = "universo"):
+        self.name = name
+        self._index: Dict[str, SymbolInfo] = {}
+        for info in infos:
+            # Duplicados: gana la primera aparición
+            self._index.setdefault(info.symbol, info)
+        self.symbols: List[str] = list(self._index)
+        self._by_sector: Dict[str, List[str]] = {}
+        self._by_class: Dict[str, List[str]] = {}
+        for info in self._index.values():
+            self._by_sector.setdefault(info.sector, []).append(info.symbol)
+            self._by_class.setdefault(info.asset_class, []).append(info.symbol)
+
+    # ----------------------------------------
+    # Construcción
+    # ----------------------------------------
+
+    @classmethod
+    def from_assets(cls, assets=None) -> "Universe":
+        """Universo por defecto (dataclass AssetUniverse de config)"""
+        assets = assets or cfg.ASSETS
+        infos = [make_info(t, sector) for sector in assets.SECTORS for t in getattr(assets, sector)]
+        return cls(infos, name="config")
+
+    @classmethod
+    def from_file(cls, path) -> "Universe":
+        """CSV / JSON con columna symbol (o ticker); .txt con un símbolo por línea"""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"No existe el universo '{path}'")
+        suffix = path.suffix.lower()
+
+        if suffix == ".json":
+            data = json.loads(path.read_text(encoding="utf-8"))
+            rows = data if isinstance(data, list) else data.get("symbols", [])
+            rows = [{"symbol": r} if isinstance(r, str) else r for r in rows]
+        elif suffix == ".csv":
+            df = pd.read_csv(path, dtype=str, keep_default_na=False)
+            df.columns = [c.strip().lower() for c in df.columns]
+            if "symbol" not in df.columns:
+                df = df.rename(columns={"ticker": "symbol"} if "ticker" in df.columns else {df.columns[0]: "symbol"})
+            rows = df.to_dict("records")
+        else:
+            lines = path.read_text(encoding="utf-8").splitlines()
+            rows = [{"symbol": line.split("#")[0]} for line in lines]
+
+        infos = [
+            make_info(r.get("symbol") or r.get("ticker"), r.get("sector") or None,
+                      r.get("asset_class") or None, r.get("calendar") or None)
+            for r in rows
+            if (r.get("symbol") or r.get("ticker") or "").strip()
+        ]
+        if not infos:
+            raise ValueError(f"Universo vacío: '{path}'")
+        return cls(infos, name=path.stem)
+
+    # ----------------------------------------
+    # Consultas O(1)
+    # ----------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        return self._index.get(symbol)
+
+    def sector_of(self, symbol: str) -> str:
+        info = self._index.get(symbol)
+        return info.sector if info else "UNKNOWN"
+
+    def by_sector(self, sector: str) -> List[str]:
+        return list(self._by_sector.get(sector.upper(), []))
+
+    def by_asset_class(self, asset_class: str) -> List[str]:
+        return list(self._by_class.get(asset_class.lower(), []))
+
+    @property
+    def sectors(self) -> List[str]:
+        return list(self._by_sector)
+
+    def subset(self, symbols: Sequence[str]) -> "Universe":
+        """Sub-universo (p.ej. --tickers) conservando metadatos conocidos"""
+        return Universe([self._index.get(s) or make_info(s) for s in symbols], name=self.name)
+
+    def chunks(self, size: Optional[int] = None) -> Iterator[List[str]]:
+        return chunked(self.symbols, size or cfg.APP.max_tickers_por_escaneo)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([vars(self._index[s]) for s in self.symbols])
+
+
+def load_universe(path=None) -> Universe:
+    """Universo de la app: fichero explícito, APP.universo_fichero o config"""
+    path = path or cfg.APP.universo_fichero
+    return Universe.from_file(path) if path else Universe.from_assets()
@@ -0,0 +1,188 @@
+# classes/walk_forward.py - OPTIMIZACIÓN WALK-FORWARD
+import pandas as pd
+import numpy as np
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple
+
+from classes.strategies import get_strategy_by_name, metrics_from_returns
+from classes.scout import AssetScout, PARAM_GRID, MAX_DRAWDOWN_ADMITIDO, calculate_score
+import config as cfg
+
+"""
+Walk-forward: ventanas móviles de entrenamiento y test.
+1. Los indicadores y señales de cada (estrategia, params) se calculan UNA vez
+   sobre todo el histórico; cada ventana solo recorta la serie de retornos
+   (las ventanas solapadas no recalculan nada)
+2. Todas las ventanas de un ticker se evalúan vectorizadas (candidatos x barras)
+3. Los tickers se reparten entre procesos (ProcessPoolExecutor)
+"""
+
+
+def candidate_returns(
+    df: pd.DataFrame,
+    grid: Optional[Dict[str, List[Dict]]] = None,
+    signals: Optional[Dict[tuple, np.ndarray]] = None
+) -> Tuple[List[Tuple[str, Dict]], np.ndarray]:
+    """
+    Retornos de la estrategia para cada candidato del grid.
+
+    Args:
+        signals: señales ya calculadas sobre `df`, con la clave de
+            AssetScout._keep_signal; las que falten se generan y se añaden
+
+    Returns:
+        (candidatos, matriz candidatos x barras) con la misma convención que
+        BaseStrategy.backtest: retorno de mercado * señal de la barra anterior.
+    """
+    grid = grid if grid is not None else PARAM_GRID
+    signals = signals if signals is not None else {}
+    market_returns = df['Close'].pct_change(fill_method=None).values
+
+    candidates = []
+    rows = []
+    for strat_name, param_list in grid.items():
+        strat_obj = None
+        for params in param_list:
+            key = (strat_name, repr(sorted(params.items())))
+            if key not in signals:
+                strat_obj = strat_obj or get_strategy_by_name(strat_name)
+                if strat_obj is None:
+                    break
+                try:
+                    signals[key] = strat_obj.generate_signals(df.copy(), params)['Signal'].values
+                except Exception:
+                    continue
+            signal = signals[key]
+            shifted = np.empty(len(signal))
+            shifted[0] = np.nan
+            shifted[1:] = signal[:-1]
+            candidates.append((strat_name, params))
+            rows.append(market_returns * shifted)
+
+    matrix = np.vstack(rows) if rows else np.empty((0, len(df)))
+    return candidates, matrix
+
+
+def make_folds(n_bars: int, train_bars: int, test_bars: int, step: Optional[int] = None) -> List[Tuple[slice, slice]]:
+    """Ventanas (train, test) consecutivas; por defecto step = test_bars"""
+    step = step or test_bars
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_bars:
+        train = slice(start, start + train_bars)
+        test = slice(start + train_bars, start + train_bars + test_bars)
+        folds.append((train, test))
+        start += step
+    return folds
+
+
+def _scores(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    score = calculate_score(metrics["return"], metrics["sharpe"], metrics["drawdown"])
+    score = np.where(metrics["drawdown"] < MAX_DRAWDOWN_ADMITIDO, -np.inf, score)
+    return np.where(np.isnan(score), -np.inf, score)
+
+
+def walk_forward_ticker(
+    ticker: str,
+    df: pd.DataFrame,
+    train_bars: int = 252,
+    test_bars: int = 63,
+    step: Optional[int] = None,
+    grid: Optional[Dict[str, List[Dict]]] = None
+) -> pd.DataFrame:
+    """
+    Walk-forward de un ticker.
+
+    Para cada ventana se elige el mejor candidato en train (global y por
+    estrategia) y se mide en el test siguiente. Las series de test se
+    concatenan para obtener las métricas fuera de muestra (OOS).
+
+    Returns:
+        Una fila por estrategia más la fila 'WALK-FORWARD' (selección global).
+    """
+    candidates, matrix = candidate_returns(df, grid)
+    folds = make_folds(matrix.shape[1], train_bars, test_bars, step)
+    if not candidates or not folds:
+        return pd.DataFrame()
+
+    strat_names = np.array([c[0] for c in candidates])
+    unique_strats = list(dict.fromkeys(strat_names))
+
+    oos = {name: [] for name in unique_strats + ["WALK-FORWARD"]}
+    chosen = {name: [] for name in unique_strats + ["WALK-FORWARD"]}
+    is_scores = {name: [] for name in unique_strats + ["WALK-FORWARD"]}
+
+    for train, test in folds:
+        scores = _scores(metrics_from_returns(matrix[:, train]))
+
+        for name in unique_strats + ["WALK-FORWARD"]:
+            idx = np.arange(len(candidates)) if name == "WALK-FORWARD" else np.where(strat_names == name)[0]
+            best = idx[np.argmax(scores[idx])]
+            oos[name].append(matrix[best, test])
+            chosen[name].append(candidates[best])
+            is_scores[name].append(scores[best])
+
+    rows = []
+    for name, pieces in oos.items():
+        stitched = np.concatenate(pieces)
+        m = metrics_from_returns(stitched)
+        ret, sharpe, dd = float(m["return"][0]), float(m["sharpe"][0]), float(m["drawdown"][0])
+        finite_is = [s for s in is_scores[name] if np.isfinite(s)]
+        rows.append({
+            "Ticker": ticker,
+            "Estrategia": name,
+            "Folds": len(folds),
+            "Retorno_OOS": ret,
+            "Sharpe_OOS": sharpe,
+            "Drawdown_OOS": dd,
+            "Score_OOS": float(calculate_score(ret, sharpe, dd)),
+            "Score_IS_Medio": float(np.mean(finite_is)) if finite_is else -np.inf,
+            "Params_Ultimo_Fold": chosen[name][-1][1],
+            "Estrategia_Ultimo_Fold": chosen[name][-1][0]
+        })
+
+    return pd.DataFrame(rows)
+
+
+def _walk_forward_worker(args) -> pd.DataFrame:
+    """Worker de proceso: descarga el histórico y ejecuta todas las ventanas"""
+    ticker, period, train_bars, test_bars, step = args
+    scout = AssetScout(ticker, period=period)
+    if scout.data is None or scout.data.empty:
+        return pd.DataFrame()
+    return walk_forward_ticker(ticker, scout.data, train_bars, test_bars, step)
+
+
+def run_walk_forward(
+    tickers: List[str],
+    period: str = "5y",
+    train_bars: int = 252,
+    test_bars: int = 63,
+    step: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Walk-forward de varios tickers en paralelo (un proceso por ticker).
+
+    Returns:
+        DataFrame con métricas OOS por ticker y estrategia.
+    """
+    jobs = [(t, period, train_bars, test_bars, step) for t in tickers]
+    workers = max_workers or cfg.APP.max_workers_paralelo
+    results = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_walk_forward_worker, job): job[0] for job in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                df = future.result()
+            except Exception:
+                continue
+            if not df.empty:
+                results.append(df)
+
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True).sort_values(
+        ["Ticker", "Score_OOS"], ascending=[True, False]
+    ).reset_index(drop=True)
@@ -0,0 +1,278 @@
+# cli.py - ESCANEO, OPTIMIZACIÓN Y BACKTEST SIN NAVEGADOR
+import argparse
+import concurrent.futures
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent))
+import config as cfg
+from classes.data_cache import load_many
+from classes.scanner import scan_in_chunks, instanciar_estrategia
+from classes.scout import AssetScout
+from classes.screener import build_table, screen
+from classes.universe import Universe, load_universe, chunked
+from utils.metrics import MonitoredThreadPool
+from utils.telemetry import scan, TELEMETRY
+
+"""
+Entradas de línea de comandos (cron, servidores sin Streamlit):
+1. scan: mismo análisis que el radar sobre un universo; --where filtra y
+   --rank-by ordena con expresiones del screener (classes.screener)
+2. optimize: mejor estrategia/parámetros por ticker (grid o adaptativa)
+3. backtest: métricas de una estrategia (o la guardada en STRATEGY_MAP)
+
+Universo: --tickers A,B,C o --universe fichero (uno por línea, o CSV/JSON
+con columna symbol/ticker y metadatos opcionales). Sin ninguno se usa
+APP.universo_fichero o el universo de config (classes.universe).
+Datos: cache de OHLCV en disco (classes.data_cache) y pool de hilos, por
+lotes de --chunk-size tickers (solo un lote de históricos en memoria).
+Salida: CSV, Parquet o JSON según --format o la extensión de --output
+(sin --output, tabla por stdout).
+
+Códigos de salida:
+    0 todo correcto, 1 algún ticker falló, 2 argumentos/entrada inválidos,
+    3 sin resultados o error al escribir la salida
+
+Uso:
+    python cli.py scan --universe universo.csv --output radar.parquet
+    python cli.py scan --where "RSI < 30 and ADX > 25 and sharpe > 1" --rank-by=-RSI
+    python cli.py optimize --tickers AAPL,MSFT --force --output ganadores.csv
+    python cli.py backtest --tickers SPY --strategy "MACD Momentum" --params '{"fast": 12, "slow": 26, "signal": 9}'
+"""
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+FORMATS = ("csv", "parquet", "json")
+
+
+class UsageError(Exception):
+    """Entrada inválida (código de salida 2)"""
+
+
+# ============================================
+# ENTRADA / SALIDA
+# ============================================
+
+def resolve_universe(args) -> Universe:
+    try:
+        universe = load_universe(args.universe)
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        raise UsageError(str(e))
+    if args.tickers:
+        return universe.subset([t.strip().upper() for t in args.tickers.split(",") if t.strip()])
+    return universe
+
+
+def _serializable(value):
+    """Dicts/listas a JSON para que CSV y Parquet tengan columnas planas"""
+    return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+
+def write_output(rows: List[Dict], output: Optional[Path], fmt: Optional[str]):
+    df = pd.DataFrame(rows)
+    fmt = fmt or (output.suffix.lstrip(".").lower() if output else None)
+    if output is None:
+        print(df.to_string(index=False) if not df.empty else "(sin resultados)")
+        return
+    if fmt not in FORMATS:
+        raise UsageError(f"Formato no soportado '{fmt}' (usa {', '.join(FORMATS)})")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "json":
+        df.to_json(output, orient="records", indent=2, date_format="iso")
+        return
+    df = df.apply(lambda col: col.map(_serializable)) if not df.empty else df
+    if fmt == "csv":
+        df.to_csv(output, index=False)
+    else:
+        df.to_parquet(output, index=False)   # Requiere pyarrow o fastparquet
+
+
+def _log(args, message: str):
+    if not args.quiet:
+        print(message, file=sys.stderr)
+
+
+# ============================================
+# COMANDOS
+# ============================================
+
+def cmd_scan(args, tickers: List[str]) -> Tuple[List[Dict], Dict[str, str]]:
+    results, scan_errors = scan_in_chunks(
+        tickers,
+        chunk_size=args.chunk_size,
+        load_data=lambda chunk: load_many(chunk, args.period, args.workers, args.refresh),
+        capital=args.capital,
+        riesgo=args.riesgo,
+        solo_accion=args.solo_accion,
+        max_workers=args.workers,
+        on_progress=lambda done, total: _log(args, f"   {done}/{total}") if done == total or done % 10 == 0 else None
+    )
+    errors = {}
+    for error in scan_errors:
+        ticker, _, message = error.partition(": ")
+        errors[ticker] = message
+
+    if args.where or args.rank_by:
+        matches = screen(build_table(results), args.where, args.rank_by)
+        order = {t: i for i, t in enumerate(matches["ticker"])}
+        _log(args, f"🔎 Screener: {len(order)}/{len(results)} coinciden")
+        results = sorted((r for r in results if r["ticker"] in order), key=lambda r: order[r["ticker"]])
+
+    rows = [
+        {**{k: v for k, v in r.items() if k not in ("retornos", "setup", "indicadores")}, **r.get("indicadores", {})}
+        for r in results
+    ]
+    return rows, errors
+
+
+def _optimize_one(ticker: str, df: pd.DataFrame, force: bool, search: str) -> Optional[Dict]:
+    winner = AssetScout(ticker, data=df).optimize(force_recalc=force, search=search)
+    if not winner:
+        return None
+    return {k: winner.get(k) for k in ("Ticker", "Estrategia", "Retorno", "Sharpe", "Drawdown", "Params", "Stops", "Source")}
+
+
+def cmd_optimize(args, tickers: List[str]) -> Tuple[List[Dict], Dict[str, str]]:
+    rows, errors = [], {}
+    done = 0
+    with MonitoredThreadPool("cli_optimize", max_workers=args.workers or cfg.APP.max_workers_paralelo) as executor:
+        for chunk in chunked(tickers, args.chunk_size or cfg.APP.max_tickers_por_escaneo):
+            frames, load_errors = load_many(chunk, args.period, args.workers, args.refresh)
+            errors.update(load_errors)
+            done += len(load_errors)
+            _log(args, f"📥 Datos: {len(frames)}/{len(chunk)} tickers del lote")
+
+            futures = {executor.submit(_optimize_one, t, df, args.force, args.search): t for t, df in frames.items()}
+            del frames   # Cada futuro conserva solo su histórico
+            for future in concurrent.futures.as_completed(futures):
+                ticker = futures[future]
+                done += 1
+                try:
+                    row = future.result()
+                except Exception as e:
+                    TELEMETRY.error(ticker, str(e))
+                    errors[ticker] = str(e)
+                    continue
+                if row is None:
+                    errors[ticker] = "Sin estrategia ganadora"
+                    continue
+                rows.append(row)
+                _log(args, f"🏆 [{done}/{len(tickers)}] {ticker}: {row['Estrategia']} (retorno {row['Retorno']:.2%})")
+    return rows, errors
+
+
+def _backtest_one(ticker: str, df: pd.DataFrame, strategy: Optional[str], params: Optional[Dict]) -> Dict:
+    if strategy is None:
+        saved = cfg.STRATEGY_MAP.get(ticker)
+        if not saved:
+            raise ValueError("Sin --strategy ni configuración guardada en STRATEGY_MAP")
+        strategy, params = saved["strategy"], saved["params"]
+
+    strat_obj = instanciar_estrategia(strategy)
+    if strat_obj is None:
+        raise ValueError(f"Estrategia desconocida '{strategy}'")
+    metrics = strat_obj.backtest(df, params or {})
+    scalars = {k: v for k, v in metrics.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    return {"Ticker": ticker, "Estrategia": strat_obj.name, "Params": params or {}, **scalars}
+
+
+def cmd_backtest(args, tickers: List[str]) -> Tuple[List[Dict], Dict[str, str]]:
+    try:
+        params = json.loads(args.params) if args.params else None
+    except json.JSONDecodeError as e:
+        raise UsageError(f"--params no es JSON válido: {e}")
+
+    frames, errors = load_many(tickers, args.period, args.workers, args.refresh)
+    rows = []
+    for ticker, df in frames.items():
+        try:
+            rows.append(_backtest_one(ticker, df, args.strategy, params))
+        except Exception as e:
+            TELEMETRY.error(ticker, str(e))
+            errors[ticker] = str(e)
+    return rows, errors
+
+
+COMMANDS = {"scan": cmd_scan, "optimize": cmd_optimize, "backtest": cmd_backtest}
+
+
+# ============================================
+# MAIN
+# ============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    universe = common.add_mutually_exclusive_group()
+    universe.add_argument("--tickers", help="Tickers separados por comas")
+    universe.add_argument("--universe", type=Path, help="Fichero de universo (txt, CSV o JSON)")
+    common.add_argument("--period", default="2y", help="Histórico a descargar (yfinance)")
+    common.add_argument("--workers", type=int, default=None, help="Hilos (por defecto APP.max_workers_paralelo)")
+    common.add_argument("--refresh", action="store_true", help="Ignorar la cache de OHLCV en disco")
+    common.add_argument("--chunk-size", type=int, default=None,
+                        help="Tickers por lote (por defecto APP.max_tickers_por_escaneo)")
+    common.add_argument("--output", type=Path, help="Fichero de salida (sin él, tabla por stdout)")
+    common.add_argument("--format", choices=FORMATS, help="Formato (por defecto, extensión de --output)")
+    common.add_argument("--quiet", action="store_true", help="Sin progreso por stderr")
+
+    parser = argparse.ArgumentParser(description=f"{cfg.APP.app_name} - línea de comandos")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_scan = sub.add_parser("scan", parents=[common], help="Escaneo de señales (como el radar)")
+    p_scan.add_argument("--capital", type=float, default=None, help="Capital (por defecto RISK.capital_total)")
+    p_scan.add_argument("--riesgo", type=float, default=None, help="Riesgo por operación en tanto por uno")
+    p_scan.add_argument("--solo-accion", action="store_true", help="Solo oportunidades válidas")
+    p_scan.add_argument("--where", help='Filtro del screener, p.ej. "RSI < 30 and sharpe > 1"')
+    p_scan.add_argument("--rank-by", help='Expresión de ranking descendente, p.ej. sharpe o --rank-by=-RSI')
+
+    p_opt = sub.add_parser("optimize", parents=[common], help="Optimización de estrategia por ticker")
+    p_opt.add_argument("--search", choices=("grid", "adaptive"), default="grid", help="Tipo de búsqueda")
+    p_opt.add_argument("--force", action="store_true", help="Ignorar STRATEGY_MAP y optimizar siempre")
+
+    p_bt = sub.add_parser("backtest", parents=[common], help="Backtest de una estrategia")
+    p_bt.add_argument("--strategy", help="Nombre de la estrategia (por defecto la de STRATEGY_MAP)")
+    p_bt.add_argument("--params", help="Parámetros en JSON")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    t0 = time.perf_counter()
+    try:
+        tickers = resolve_universe(args).symbols
+        _log(args, f"🚀 {args.command}: {len(tickers)} tickers")
+        with scan(f"cli_{args.command}", tickers):
+            rows, errors = COMMANDS[args.command](args, tickers)
+    except (UsageError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        write_output(rows, args.output, args.format)
+    except UsageError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except (OSError, ImportError, ValueError) as e:
+        print(f"❌ Error escribiendo la salida: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    for ticker, message in sorted(errors.items()):
+        print(f"⚠️ {ticker}: {message}", file=sys.stderr)
+    _log(args, f"✅ {len(rows)} resultados, {len(errors)} errores en {time.perf_counter() - t0:.1f}s"
+               + (f" -> '{args.output}'" if args.output else ""))
+
+    if not rows:
+        return EXIT_FAILED
+    return EXIT_PARTIAL if errors else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
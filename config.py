@@ -52,30 +52,28 @@ class AssetUniverse:
     INDUSTRIAL: List[str] = field(default_factory=lambda: ["CAT", "UNP", "GE"])
     MATERIALS: List[str] = field(default_factory=lambda: ["LIN", "NEE", "SHW"])
     
+    # Índice ticker -> sector (búsqueda O(1))
+    _sector_index: Dict[str, str] = field(init=False, repr=False)
+    
+    SECTORS = (
+        'INDICES', 'CRYPTO', 'TECH', 'COMMUNICATIONS', 'CYCLICAL', 'FINANCIALS',
+        'HEALTHCARE', 'DEFENSIVE', 'ENERGY', 'INDUSTRIAL', 'MATERIALS'
+    )
+    
+    def __post_init__(self):
+        self._sector_index = {
+            ticker: sector for sector in self.SECTORS for ticker in getattr(self, sector)
+        }
+    
     def get_all_tickers(self) -> List[str]:
-        return (
-            self.INDICES + self.CRYPTO + self.TECH + self.COMMUNICATIONS + 
-            self.CYCLICAL + self.FINANCIALS + self.HEALTHCARE + 
-            self.DEFENSIVE + self.ENERGY + self.INDUSTRIAL + self.MATERIALS
-        )
+        return [ticker for sector in self.SECTORS for ticker in getattr(self, sector)]
     
     def get_by_sector(self, sector: str) -> List[str]:
-        sector_map = {
-            'INDICES': self.INDICES, 'CRYPTO': self.CRYPTO, 'TECH': self.TECH,
-            'COMMUNICATIONS': self.COMMUNICATIONS, 'CYCLICAL': self.CYCLICAL,
-            'FINANCIALS': self.FINANCIALS, 'HEALTHCARE': self.HEALTHCARE,
-            'DEFENSIVE': self.DEFENSIVE, 'ENERGY': self.ENERGY,
-            'INDUSTRIAL': self.INDUSTRIAL, 'MATERIALS': self.MATERIALS
-        }
-        return sector_map.get(sector.upper(), [])
+        sector = sector.upper()
+        return getattr(self, sector) if sector in self.SECTORS else []
     
     def get_sector_for_ticker(self, ticker: str) -> str:
-        for sector_name in ['INDICES', 'CRYPTO', 'TECH', 'COMMUNICATIONS', 
-                           'CYCLICAL', 'FINANCIALS', 'HEALTHCARE', 'DEFENSIVE',
-                           'ENERGY', 'INDUSTRIAL', 'MATERIALS']:
-            if ticker in getattr(self, sector_name):
-                return sector_name
-        return 'UNKNOWN'
+        return self._sector_index.get(ticker, 'UNKNOWN')
 
 
 # ============================================
@@ -90,8 +88,10 @@ class RiskConfig:
     riesgo_por_operacion: float = 0.01
     atr_multiplier: float = 1.5
     rr_ratio: float = 2.0
+    optimizar_stops: bool = False  # Opcional: la optimización elige también (atr_multiplier, rr_ratio) de STOP_GRID
     max_posiciones_simultaneas: int = 5
     max_riesgo_portafolio: float = 0.10
+    ventana_correlacion: int = 60
     
     def __post_init__(self):
         if self.capital_total <= 0:
@@ -165,12 +165,20 @@ class AppConfig:
     layout: str = "wide"
     cache_ttl_seconds: int = 3600
     data_refresh_interval: int = 300
+    escaneo_en_segundo_plano: bool = True  # Scheduler del radar cada data_refresh_interval
     max_workers_paralelo: int = 5
     timeout_download: int = 30
-    max_tickers_por_escaneo: int = 50
+    max_tickers_por_escaneo: int = 50  # Tamaño de lote del escaneo (memoria acotada)
+    # Universo desde fichero CSV/JSON (symbol, sector, asset_class, calendar); vacío = ASSETS
+    universo_fichero: str = field(default_factory=lambda: os.getenv('TRADEXPERT_UNIVERSE', ''))
     min_datos_historicos: int = 50
     log_level: str = "INFO"
     log_to_file: bool = True
+    busqueda_max_evaluaciones: float = 40.0
+    busqueda_max_segundos: float = 60.0
+    optimizacion_deadline_ms: int = 300
+    metrics_port: int = 9464  # Endpoint Prometheus local (0 = desactivado)
+    metrics_file_interval_s: int = 15  # Volcado a logs/metrics.prom (0 = desactivado)
 
 
 # ============================================
@@ -0,0 +1,134 @@
+# pages/diagnostico.py
+import streamlit as st
+import pandas as pd
+import json
+import sys
+sys.path.append('.')
+from utils.telemetry import TELEMETRY, TELEMETRY_FILE, MAX_SCANS, load_scans
+from utils import profiler
+from utils.metrics import REGISTRY, METRICS_FILE, exporter_url, start_exporter
+
+st.set_page_config(page_title="Diagnóstico", layout="wide", page_icon="🩺")
+st.title("🩺 Diagnóstico: ¿Dónde se va el tiempo?")
+st.caption("Duración por etapa (descarga, grid search, señales, riesgo, render) de los últimos escaneos")
+
+start_exporter()
+
+n_scans = st.sidebar.slider("Escaneos a mostrar", 1, MAX_SCANS, 5)
+fuente = st.sidebar.radio("Fuente", ["Proceso actual", "Fichero JSONL"])
+
+st.sidebar.markdown("---")
+if st.sidebar.button("🗑️ Reiniciar métricas"):
+    TELEMETRY.reset()
+    st.rerun()
+
+# --- CAPTURA DE PERFIL ---
+st.sidebar.markdown("---")
+st.sidebar.markdown("### 🔬 Captura de Perfil")
+st.sidebar.caption(f"Perfila la siguiente ejecución (o todas con {profiler.PROFILE_ENV}=cpu|mem)")
+objetivos = {"scan": "Escaneo (Radar)", "optimize": "Optimización", "render": "Render del Radar"}
+objetivo = st.sidebar.selectbox("Objetivo", profiler.TARGETS, format_func=objetivos.get)
+modo = st.sidebar.radio("Modo", profiler.MODES, format_func={"cpu": "CPU (muestreo)", "mem": "Memoria (tracemalloc)"}.get)
+if st.sidebar.button("🎯 Perfilar siguiente ejecución"):
+    profiler.arm(modo, objetivo)
+pendientes = profiler.armed()
+if pendientes:
+    st.sidebar.info("Armado: " + ", ".join(f"{objetivos[t]} ({m})" for t, m in pendientes.items()))
+    if st.sidebar.button("✖️ Cancelar capturas"):
+        profiler.disarm()
+        st.rerun()
+
+scans = TELEMETRY.recent_scans() if fuente == "Proceso actual" else load_scans(MAX_SCANS)
+scans = scans[:n_scans]
+
+# --- HISTOGRAMAS POR ETAPA (todo el proceso) ---
+st.subheader("⏱️ Etapas (acumulado del proceso)")
+summary = TELEMETRY.stage_summary()
+if summary:
+    df_stages = pd.DataFrame.from_dict(summary, orient='index').sort_values('total_s', ascending=False)
+    df_stages.index.name = 'Etapa'
+    st.dataframe(
+        df_stages.style.format({
+            'count': '{:,.0f}', 'total_s': '{:.2f}', 'mean_s': '{:.4f}',
+            'p50_s': '{:.4f}', 'p95_s': '{:.4f}', 'min_s': '{:.4f}', 'max_s': '{:.4f}'
+        }),
+        use_container_width=True
+    )
+    st.bar_chart(df_stages.drop(index=[s for s in df_stages.index if s.startswith('scan:')])['total_s'])
+else:
+    st.info("Sin datos todavía: lanza un escaneo desde el Radar")
+
+st.markdown("---")
+
+# --- ESCANEOS RECIENTES ---
+st.subheader(f"📡 Últimos {len(scans)} escaneos")
+if not scans:
+    st.info(f"No hay escaneos registrados ({'proceso actual' if fuente == 'Proceso actual' else TELEMETRY_FILE})")
+else:
+    df_scans = pd.DataFrame([{
+        'ID': s['id'],
+        'Escaneo': s['name'],
+        'Inicio': s['started'],
+        'Duración (s)': s['duration_s'],
+        'Tickers': s['tickers'],
+        'Errores': len(s['errors'])
+    } for s in scans])
+    st.dataframe(df_scans.style.format({'Duración (s)': '{:.2f}'}), use_container_width=True, hide_index=True)
+
+    selected = st.selectbox(
+        "Detalle del escaneo:", range(len(scans)),
+        format_func=lambda i: f"{scans[i]['name']} · {scans[i]['started']} · {scans[i]['duration_s']:.1f}s"
+    )
+    scan_data = scans[selected]
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Por etapa**")
+        df_scan_stages = pd.DataFrame.from_dict(scan_data['stages'], orient='index')
+        if not df_scan_stages.empty:
+            df_scan_stages = df_scan_stages.sort_values('total_s', ascending=False)
+            st.dataframe(df_scan_stages[['count', 'total_s', 'mean_s', 'p95_s', 'max_s']].style.format('{:.3f}'),
+                         use_container_width=True)
+    with c2:
+        st.markdown("**Tickers más lentos**")
+        df_tickers = pd.DataFrame.from_dict(scan_data['per_ticker'], orient='index').fillna(0.0)
+        if not df_tickers.empty:
+            # 'ticker' es el span que envuelve todo el procesado del ticker en el radar
+            total = df_tickers['ticker'] if 'ticker' in df_tickers else df_tickers.sum(axis=1)
+            df_tickers = df_tickers.loc[total.sort_values(ascending=False).index]
+            st.dataframe(df_tickers.head(20).style.format('{:.3f}'), use_container_width=True)
+
+    if scan_data['errors']:
+        with st.expander(f"⚠️ {len(scan_data['errors'])} errores"):
+            for err in scan_data['errors']:
+                st.text(err)
+
+    jsonl = "\n".join(json.dumps(s) for s in scans) + "\n"
+    st.download_button("💾 Descargar escaneos (JSONL)", jsonl, "telemetria.jsonl", mime="application/json")
+
+st.markdown("---")
+
+# --- PERFILES GUARDADOS ---
+st.subheader("🔬 Perfiles capturados")
+perfiles = profiler.list_profiles()
+if not perfiles:
+    st.info(f"Sin perfiles en '{profiler.PROFILES_DIR}'")
+else:
+    elegido = st.selectbox("Perfil:", range(len(perfiles)), format_func=lambda i: perfiles[i]['name'])
+    perfil = perfiles[elegido]
+    if perfil['top'] is not None:
+        st.dataframe(pd.read_csv(perfil['top']), use_container_width=True, hide_index=True)
+    st.download_button(
+        "💾 Descargar pilas colapsadas (flamegraph.pl / speedscope)",
+        perfil['collapsed'].read_text(encoding='utf-8'),
+        perfil['collapsed'].name
+    )
+
+st.markdown("---")
+
+# --- MÉTRICAS PROMETHEUS ---
+st.subheader("📈 Métricas operativas")
+url = exporter_url()
+st.caption(f"Endpoint: {url}" if url else f"Endpoint HTTP desactivado; fichero: {METRICS_FILE}")
+with st.expander("Ver exposición actual (formato Prometheus)"):
+    st.code(REGISTRY.render(), language="text")
@@ -1,25 +1,57 @@
 # pages/optimizador.py
 import streamlit as st
 import pandas as pd
-import time
 import sys
 sys.path.append('.') 
-from classes.scout import AssetScout
+from classes.scout import AssetScout, SCORE_WEIGHTS, MAX_DRAWDOWN_ADMITIDO
+from classes.results import EvaluationSet
+from utils.profiler import profile
 import config as cfg
 
 st.set_page_config(page_title="IA Scout Pro", layout="wide", page_icon="🧠")
 st.title("🧠 IA Scout: Auditoría de Riesgo y Retorno")
 
+# Estado: evaluaciones del último barrido y pesos del score
+if 'opt_evaluations' not in st.session_state:
+    st.session_state.opt_evaluations = None
+for key, default in zip(('w_retorno', 'w_sharpe', 'w_drawdown'), SCORE_WEIGHTS):
+    if key not in st.session_state:
+        st.session_state[key] = float(default)
+
 selected_tickers = st.sidebar.multiselect("Activos a Auditar:", cfg.TICKERS, default=cfg.TICKERS[:2])
 start = st.sidebar.button("🚀 INICIAR AUDITORÍA")
 
+st.sidebar.markdown("---")
+st.sidebar.markdown("### ⚖️ Ponderación del Score")
+st.sidebar.caption("Re-ordena al instante sin repetir backtests")
+st.sidebar.slider("Peso Retorno", 0.0, 2.0, step=0.05, key='w_retorno')
+st.sidebar.slider("Peso Sharpe", 0.0, 1.0, step=0.05, key='w_sharpe')
+st.sidebar.slider("Penalización Drawdown", 0.0, 2.0, step=0.05, key='w_drawdown')
+
 if start:
-    st.markdown("### 📡 Resultados del Análisis (5 Años - Velas 1D)")
-    st.info("El sistema selecciona la estrategia con mayor retorno, siempre que el riesgo (Drawdown) sea aceptable.")
+    evaluations = EvaluationSet()
+    progress_bar = st.progress(0)
+    with profile("optimize", "auditoria"):
+        for i, ticker in enumerate(selected_tickers):
+            AssetScout(ticker).evaluate_all(evaluations)
+            progress_bar.progress((i + 1) / len(selected_tickers))
+    progress_bar.empty()
+    st.session_state.opt_evaluations = evaluations
+
+evaluations = st.session_state.opt_evaluations
+
+if evaluations is not None and len(evaluations) > 0:
+    weights = (st.session_state.w_retorno, st.session_state.w_sharpe, st.session_state.w_drawdown)
+    winners = evaluations.best_by_ticker(weights, max_drawdown=MAX_DRAWDOWN_ADMITIDO)
+
+    st.markdown("### 📡 Resultados del Análisis (Velas 1D)")
+    st.info(
+        f"{len(evaluations)} combinaciones evaluadas. Score = {weights[0]:.2f}·Retorno + "
+        f"{weights[1]:.2f}·Sharpe − {weights[2]:.2f}·|Drawdown| (Drawdown admitido > {MAX_DRAWDOWN_ADMITIDO*100:.0f}%)"
+    )
     
-    for ticker in selected_tickers:
-        scout = AssetScout(ticker)
-        winner = scout.optimize()
+    for ticker in evaluations.tickers:
+        winner = winners.get(ticker)
         
         if winner:
             sharpe = winner['Sharpe']
@@ -53,6 +85,27 @@ if start:
                 c3.metric("Sharpe Ratio", f"{sharpe:.2f}", delta=calidad)
                 
                 c4.code(f"{winner['Params']}")
+                
+                if "Operaciones" in winner:
+                    t1, t2, t3 = st.columns(3)
+                    t1.metric("Operaciones", f"{winner['Operaciones']}")
+                    t2.metric("Win Rate", f"{winner['Win Rate']*100:.1f}%")
+                    t3.metric("Duración Media", f"{winner['Duración Media']:.1f} velas")
+                
+                # Frente de Pareto: alternativas no dominadas en retorno/Sharpe/drawdown
+                front = evaluations.pareto_front(ticker)
+                with st.expander(f"🧭 Frente de Pareto ({len(front)} configuraciones no dominadas)"):
+                    df_front = evaluations.to_frame(weights).iloc[front]
+                    df_front = df_front.sort_values("Score", ascending=False)
+                    df_front["Params"] = df_front["Params"].astype(str)
+                    st.dataframe(
+                        df_front[[c for c in ["Estrategia", "Params", "Retorno", "Sharpe", "Drawdown",
+                                              "Operaciones", "Win Rate", "Score"] if c in df_front.columns]].style.format({
+                            "Retorno": "{:.2%}", "Sharpe": "{:.2f}", "Drawdown": "{:.2%}", "Score": "{:.3f}",
+                            "Operaciones": "{:.0f}", "Win Rate": "{:.1%}"
+                        }),
+                        use_container_width=True, hide_index=True
+                    )
                 st.markdown("---")
-            
-            time.sleep(0.1)
+        else:
+            st.warning(f"⚠️ {ticker}: ninguna configuración cumple el drawdown admitido")
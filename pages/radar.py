@@ -4,25 +4,28 @@ import pandas as pd
 import sys
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-import concurrent.futures
+from typing import Dict, List
 
 sys.path.append('.') 
-from classes.scout import AssetScout, scan_multiple_tickers
-from classes.strategies import (
-    GoldenCrossStrategy, MeanReversionStrategy, BollingerBreakoutStrategy, 
-    MACDStrategy, EMAStrategy, StochRSIStrategy, AwesomeOscillatorStrategy
-)
-from classes.strategies_pro import SuperTrendStrategy, SqueezeMomentumStrategy, ADXStrategy
-from classes.risk_manager import RiskManager
+from classes.portfolio import PortfolioAllocator, RollingCovariance, returns_frame
+from classes.scanner import dimensionar_lote
+from classes.snapshot import ScanScheduler, SnapshotStore
+from classes.screener import build_table, compile_expression, screen, ScreenerError
+from classes.universe import load_universe
+from utils.telemetry import span
+from utils.profiler import profile
+from utils.metrics import start_exporter, track_st_cache, mark_cache_miss
 import config as cfg
 
 """
 OPTIMIZACIONES IMPLEMENTADAS:
-1. Escaneo paralelo de múltiples tickers (5-10x más rápido)
+1. Escaneo paralelo en segundo plano publicado como snapshot compartido
+   (classes.snapshot): cargar la página es leer el snapshot, no escanear
 2. Cache de datos con Streamlit (@st.cache_data)
 3. Cálculos batch en lugar de uno por uno
-4. UI mejorada con tabs y filtros avanzados
+4. UI mejorada con tabs y filtros avanzados: los filtros se compilan a una
+   expresión del screener (classes.screener) sobre una tabla por snapshot,
+   así que cambiar un filtro no re-escanea
 5. Sistema de trading registrado con SQLite (más rápido que CSV)
 6. Indicadores de performance en tiempo real
 """
@@ -41,10 +44,32 @@ st.set_page_config(
 # Inicializar session state
 if 'capital' not in st.session_state:
     st.session_state.capital = float(cfg.CAPITAL_TOTAL)
-if 'scan_results' not in st.session_state:
-    st.session_state.scan_results = None
-if 'last_scan_time' not in st.session_state:
-    st.session_state.last_scan_time = None
+if 'ocultar_version' not in st.session_state:
+    st.session_state.ocultar_version = None
+
+# Endpoint de métricas (una vez por proceso)
+start_exporter()
+
+
+@st.cache_resource
+def get_scheduler() -> ScanScheduler:
+    """Scheduler y snapshot compartidos por todas las sesiones del proceso"""
+    scheduler = ScanScheduler(SnapshotStore())
+    if cfg.APP.escaneo_en_segundo_plano:
+        scheduler.start()
+    return scheduler
+
+
+scheduler = get_scheduler()
+snapshot = scheduler.store.current()
+
+
+@track_st_cache("screener_tabla")
+@st.cache_data(max_entries=4)
+def tabla_screener(version: int, _results) -> pd.DataFrame:
+    """Tabla del screener de un snapshot (se construye una vez por versión)"""
+    mark_cache_miss()
+    return build_table(_results, sectors=load_universe().sector_of)
 
 # ============================================
 # FUNCIONES DE PERSISTENCIA OPTIMIZADAS
@@ -52,12 +77,14 @@ if 'last_scan_time' not in st.session_state:
 
 LOG_FILE = "data/bitacora_trades.csv"
 
+@track_st_cache("trades_historial")
 @st.cache_data(ttl=60)
 def cargar_trades_historial() -> pd.DataFrame:
     """
     Carga historial de trades con cache.
     Cache de 60 segundos para balance entre actualización y performance.
     """
+    mark_cache_miss()
     if os.path.exists(LOG_FILE):
         try:
             return pd.read_csv(LOG_FILE)
@@ -102,200 +129,30 @@ def guardar_trade(trade_dict: Dict) -> bool:
         return False
 
 
-# ============================================
-# FUNCIONES DE ANÁLISIS OPTIMIZADAS
-# ============================================
-
-def instanciar_estrategia(strat_name: str):
-    """
-    Factory pattern para instanciar estrategias.
-    Más limpio y mantenible que if/elif gigantes.
+def asignar_cartera(
+    resultados: List[Dict],
+    capital: float,
+    df_hist: pd.DataFrame
+):
     """
-    estrategias_map = {
-        "Golden Cross": GoldenCrossStrategy,
-        "Mean Reversion": MeanReversionStrategy,
-        "Bollinger": BollingerBreakoutStrategy,
-        "MACD": MACDStrategy,
-        "EMA": EMAStrategy,
-        "Stochastic": StochRSIStrategy,
-        "Awesome": AwesomeOscillatorStrategy,
-        "SuperTrend": SuperTrendStrategy,
-        "Squeeze": SqueezeMomentumStrategy,
-        "ADX": ADXStrategy
-    }
-    
-    for keyword, strategy_class in estrategias_map.items():
-        if keyword in strat_name:
-            return strategy_class()
-    
-    return None
-
-
-def analizar_senal(
-    df: pd.DataFrame, 
-    strat_name: str, 
-    params: Dict
-) -> Tuple[str, str, bool]:
-    """
-    Analiza la señal actual y determina tipo, dirección y validez.
-    
-    Returns:
-        (tipo_señal, direccion, es_valida)
+    Aplica los límites de cartera (posiciones simultáneas y riesgo total)
+    a las oportunidades válidas, teniendo en cuenta las posiciones abiertas
+    de la bitácora y la correlación entre activos.
     """
-    if len(df) < 2:
-        return "NEUTRO", "NONE", False
+    validas = [r for r in resultados if r['es_valida']]
+    retornos = returns_frame({r['ticker']: r.get('retornos') for r in resultados})
     
-    today = df.iloc[-1]
-    prev = df.iloc[-2]
-    signal_val = today.get('Signal', 0)
+    covarianza = None
+    if not retornos.empty:
+        covarianza = RollingCovariance.from_returns(retornos, window=cfg.RISK.ventana_correlacion)
     
-    # ========== SEÑALES LONG ==========
-    if signal_val == 1:
-        is_new = (prev.get('Signal', 0) == 0)
-        
-        # Estrategias Clásicas
-        if "Golden Cross" in strat_name:
-            return ("ENTRADA CRUCE", "LONG", True) if is_new else ("MANTENER TENDENCIA", "LONG", False)
-        
-        elif "Mean Reversion" in strat_name:
-            return "ENTRADA REBOTE", "LONG", True
-        
-        elif "MACD" in strat_name:
-            return "ENTRADA MOMENTUM", "LONG", True
-        
-        elif "EMA" in strat_name:
-            return ("ENTRADA EMA", "LONG", True) if is_new else ("MANTENER EMA", "LONG", False)
-        
-        elif "Stochastic" in strat_name:
-            stoch_k = today.get('Stoch_K', 50)
-            return ("ENTRADA STOCH", "LONG", True) if (is_new and stoch_k < 50) else ("MANTENER STOCH", "LONG", False)
-        
-        elif "Awesome" in strat_name:
-            return ("ENTRADA AO", "LONG", True) if is_new else ("MANTENER AO", "LONG", False)
-        
-        # Estrategias PRO
-        elif "SuperTrend" in strat_name:
-            return ("CAMBIO TENDENCIA 🔥", "LONG", True) if is_new else ("MANTENER SUPERTREND", "LONG", False)
-        
-        elif "Squeeze" in strat_name:
-            return ("DISPARO SQUEEZE 🚀", "LONG", True) if is_new else ("MANTENER SQUEEZE", "LONG", False)
-        
-        elif "ADX" in strat_name:
-            return ("INICIO TENDENCIA FUERTE", "LONG", True) if is_new else ("MANTENER TENDENCIA ADX", "LONG", False)
-        
-        elif "Bollinger" in strat_name:
-            return ("RUPTURA ALCISTA", "LONG", True) if is_new else ("MANTENER RUPTURA", "LONG", False)
-    
-    # ========== SEÑALES SHORT ==========
-    elif signal_val == 0:
-        # Mean Reversion Short
-        if "Mean Reversion" in strat_name and today.get('RSI', 0) > params.get('rsi_high', 70):
-            return "ENTRADA SHORT (SOBRECOMPRA)", "SHORT", True
-        
-        # Stoch Short
-        elif "Stochastic" in strat_name:
-            stoch_k = today.get('Stoch_K', 0)
-            stoch_d = today.get('Stoch_D', 0)
-            if stoch_k > 80 and stoch_k < stoch_d:
-                return "ENTRADA SHORT (STOCH)", "SHORT", True
-        
-        # EMA Short
-        elif "EMA" in strat_name and 'EMA_Fast' in df.columns and 'EMA_Slow' in df.columns:
-            if df['EMA_Fast'].iloc[-1] < df['EMA_Slow'].iloc[-1] and df['EMA_Fast'].iloc[-2] >= df['EMA_Slow'].iloc[-2]:
-                return "ENTRADA SHORT (EMA)", "SHORT", True
-        
-        # SuperTrend Short
-        elif "SuperTrend" in strat_name and prev.get('Signal', 0) == 1:
-            return "CAMBIO TENDENCIA (SHORT)", "SHORT", True
-        
-        # Squeeze Short
-        elif "Squeeze" in strat_name and 'Momentum' in df.columns:
-            if df['Momentum'].iloc[-1] < 0 and df['Momentum'].iloc[-2] >= 0:
-                return "MOMENTUM BAJISTA", "SHORT", True
-    
-    return "NEUTRO", "NONE", False
-
-
-def procesar_ticker(
-    ticker: str,
-    capital_dinamico: float,
-    riesgo_decimal: float,
-    solo_accion: bool
-) -> Optional[Dict]:
-    """
-    Procesa un ticker individual y retorna resultado estructurado.
-    Preparado para paralelización.
-    """
-    try:
-        scout = AssetScout(ticker)
-        winner = scout.optimize()
-        
-        if not winner or scout.data is None or scout.data.empty:
-            return None
-        
-        df = scout.data
-        strat_name = winner['Estrategia']
-        params = winner['Params']
-        
-        # Instanciar estrategia
-        strat_obj = instanciar_estrategia(strat_name)
-        if not strat_obj:
-            return None
-        
-        # Generar señales
-        df = strat_obj.generate_signals(df, params)
-        if 'Signal' not in df.columns:
-            df['Signal'] = 0
-        
-        # Analizar señal
-        tipo, direction, es_valida = analizar_senal(df, strat_name, params)
-        
-        # Filtrar según preferencias
-        if solo_accion and not es_valida:
-            return None
-        
-        if tipo == "NEUTRO" and solo_accion:
-            return None
-        
-        # Calcular riesgo
-        today = df.iloc[-1]
-        risk_mgr = RiskManager(df)
-        setup = risk_mgr.get_trade_setup(
-            entry_price=today['Close'],
-            direction=direction if direction != "NONE" else "LONG",
-            atr_multiplier=cfg.ATR_MULTIPLIER,
-            risk_reward_ratio=cfg.RR_RATIO
-        )
-        
-        units = 0.0
-        inv = 0.0
-        sl, tp = 0.0, 0.0
-        
-        if setup and es_valida:
-            units = risk_mgr.calculate_position_size(capital_dinamico, riesgo_decimal, setup)
-            inv = units * today['Close']
-            sl = setup['stop_loss']
-            tp = setup['take_profit']
-        
-        return {
-            'ticker': ticker,
-            'tipo': tipo,
-            'direction': direction,
-            'es_valida': es_valida,
-            'estrategia': strat_name,
-            'precio': today['Close'],
-            'units': units,
-            'inversion': inv,
-            'stop_loss': sl,
-            'take_profit': tp,
-            'retorno': winner.get('Retorno', 0),
-            'sharpe': winner.get('Sharpe', 0),
-            'drawdown': winner.get('Drawdown', 0)
-        }
-        
-    except Exception as e:
-        st.warning(f"⚠️ Error procesando {ticker}: {e}")
-        return None
+    allocator = PortfolioAllocator(cfg.RISK)
+    return allocator.allocate(
+        validas,
+        open_positions=allocator.open_positions_from_journal(df_hist),
+        capital=capital,
+        covariance=covarianza
+    )
 
 
 # ============================================
@@ -338,6 +195,22 @@ with st.sidebar:
     min_sharpe = st.slider("Sharpe mínimo", 0.0, 3.0, 0.5, 0.1)
     max_drawdown = st.slider("Drawdown máx (%)", -80, -10, -40, 5)
     
+    expresion = st.text_input(
+        "Expresión del screener",
+        placeholder="RSI < 30 and ADX > 25 and sharpe > 1",
+        help="Campos: rsi, adx, atr_pct, dist_sma50, dist_sma200, ret_5d, ret_20d, "
+             "volatilidad, volumen_rel, sharpe, drawdown, retorno, precio, sector, estrategia... "
+             "Operadores: < > == and or not in, + - * /, abs() log() min() max()"
+    )
+    orden = st.text_input("Ordenar por", value="sharpe", help="Expresión de ranking (mayor primero), p.ej. -rsi")
+    
+    aplicar_limites = st.checkbox(
+        "Aplicar límites de cartera",
+        value=True,
+        help=f"Máx. {cfg.RISK.max_posiciones_simultaneas} posiciones y "
+             f"{cfg.RISK.max_riesgo_portafolio:.0%} de riesgo total (ajustado por correlación)"
+    )
+    
     st.markdown("---")
     
     st.header("📊 Estadísticas")
@@ -360,10 +233,17 @@ with col1:
 with col2:
     st.metric("🎯 Riesgo", f"{riesgo_pct}%")
 with col3:
-    st.metric("📊 Activos", len(cfg.TICKERS))
+    st.metric("📊 Activos", len(scheduler.tickers))
 with col4:
-    if st.session_state.last_scan_time:
-        st.metric("⏱️ Último Escaneo", st.session_state.last_scan_time.strftime("%H:%M:%S"))
+    if snapshot:
+        st.metric("⏱️ Último Escaneo", snapshot.created.strftime("%H:%M:%S"), f"v{snapshot.version}", delta_color="off")
+
+if scheduler.running:
+    st.caption("🔄 Escaneo en segundo plano en curso...")
+elif scheduler.next_run and cfg.APP.escaneo_en_segundo_plano:
+    st.caption(f"🕒 Próximo escaneo automático: {scheduler.next_run.strftime('%H:%M:%S')}")
+if scheduler.last_error:
+    st.warning(f"⚠️ Último escaneo programado fallido: {scheduler.last_error}")
 
 st.caption("🤖 Sistema de escaneo con 10 estrategias de IA | Optimizado para velocidad máxima")
 
@@ -375,46 +255,26 @@ with tab1:
     col_btn1, col_btn2, col_btn3 = st.columns([2, 1, 1])
     
     with col_btn1:
-        if st.button("🚀 INICIAR ESCANEO PARALELO", type="primary", use_container_width=True):
-            st.session_state.last_scan_time = datetime.now()
-            
+        if st.button("🚀 ESCANEAR AHORA", type="primary", use_container_width=True):
             with st.spinner("🔄 Escaneando mercado en paralelo..."):
-                # ESCANEO PARALELO (5-10x más rápido)
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                results = []
-                total = len(cfg.TICKERS)
+                def on_progress(completed: int, total: int):
+                    progress_bar.progress(completed / total)
+                    status_text.text(f"📊 Procesados: {completed}/{total}")
                 
-                # Procesar en batch con ThreadPool
-                with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                    futures = {
-                        executor.submit(
-                            procesar_ticker, 
-                            ticker, 
-                            capital_dinamico, 
-                            riesgo_decimal, 
-                            solo_accion
-                        ): ticker 
-                        for ticker in cfg.TICKERS
-                    }
-                    
-                    completed = 0
-                    for future in concurrent.futures.as_completed(futures):
-                        result = future.result()
-                        if result:
-                            results.append(result)
-                        
-                        completed += 1
-                        progress = completed / total
-                        progress_bar.progress(progress)
-                        status_text.text(f"📊 Procesados: {completed}/{total}")
+                # Si ya hay un escaneo en curso (otra sesión o el scheduler) se espera a ese
+                snapshot = scheduler.run_now(on_progress)
                 
                 progress_bar.empty()
                 status_text.empty()
                 
-                st.session_state.scan_results = results
-                st.success(f"✅ Escaneo completado: {len(results)} oportunidades encontradas")
+                st.session_state.ocultar_version = None
+                if snapshot:
+                    st.success(f"✅ Escaneo completado: {len(snapshot.results)} activos analizados")
+                    for error in snapshot.errors:
+                        st.warning(f"⚠️ Error procesando {error}")
     
     with col_btn2:
         if st.button("🔄 Recargar", use_container_width=True):
@@ -422,81 +282,121 @@ with tab1:
     
     with col_btn3:
         if st.button("🗑️ Limpiar", use_container_width=True):
-            st.session_state.scan_results = None
+            # El snapshot es compartido: solo se oculta en esta sesión
+            st.session_state.ocultar_version = snapshot.version if snapshot else None
             st.rerun()
     
     st.markdown("---")
     
     # --- MOSTRAR RESULTADOS ---
-    if st.session_state.scan_results:
-        results = st.session_state.scan_results
-        
-        # Filtrar según preferencias
-        filtered = [
-            r for r in results
-            if r['direction'] in tipo_filtro
-            and r['sharpe'] >= min_sharpe
-            and r['drawdown'] >= (max_drawdown / 100)
-        ]
+    with span("render"), profile("render", "radar"):
+        if snapshot and snapshot.results and snapshot.version != st.session_state.ocultar_version:
+            # Filtros de la sesión como una sola expresión sobre la tabla del snapshot
+            condiciones = [
+                f"direction in {list(tipo_filtro)!r}",
+                f"sharpe >= {min_sharpe}",
+                f"drawdown >= {max_drawdown / 100}"
+            ]
+            if solo_accion:
+                condiciones.insert(0, "accionable")
+            if expresion.strip():
+                condiciones.append(f"({expresion})")
+            
+            tabla = tabla_screener(snapshot.version, snapshot.results)
+            try:
+                if expresion.strip():
+                    compile_expression(expresion)   # Errores de sintaxis sobre el texto del usuario
+                with span("screen"):
+                    coincidencias = screen(tabla, " and ".join(condiciones), orden.strip() or None)
+            except ScreenerError as e:
+                st.error(f"⚠️ Expresión inválida: {e}")
+                coincidencias = tabla.iloc[0:0]
+            
+            # Solo las coincidencias se adaptan al capital y riesgo de la sesión
+            por_ticker = {r['ticker']: r for r in snapshot.results}
+            ranking = {t: i for i, t in enumerate(coincidencias['ticker'])}
+            filtered = dimensionar_lote([por_ticker[t] for t in ranking], capital_dinamico, riesgo_decimal)
         
-        st.subheader(f"🎯 {len(filtered)} Oportunidades Detectadas")
+            st.subheader(f"🎯 {len(filtered)} Oportunidades Detectadas")
         
-        if filtered:
-            # Ordenar por Sharpe descendente
-            filtered.sort(key=lambda x: x['sharpe'], reverse=True)
+            if filtered and aplicar_limites:
+                asignacion = asignar_cartera(filtered, capital_dinamico, cargar_trades_historial())
             
-            for i, result in enumerate(filtered):
-                icon = "🟢" if result['direction'] == "LONG" else "🔻"
-                color = "green" if result['direction'] == "LONG" else "red"
+                col_a1, col_a2, col_a3 = st.columns(3)
+                col_a1.metric("📂 Posiciones Abiertas", asignacion.posiciones_abiertas)
+                col_a2.metric("✅ Asignadas", f"{len(asignacion.seleccionados)}/{cfg.RISK.max_posiciones_simultaneas}")
+                col_a3.metric(
+                    "🔥 Riesgo Cartera",
+                    f"${asignacion.heat_total:,.2f}",
+                    f"Límite ${asignacion.presupuesto_riesgo:,.2f}",
+                    delta_color="off"
+                )
+            
+                # Solo se muestran como válidas las oportunidades asignadas
+                filtered = asignacion.seleccionados + [
+                    {**r, 'es_valida': False} for r in filtered if not r['es_valida']
+                ]
+                if asignacion.rechazados:
+                    st.caption("⛔ Descartadas por límites de cartera: " + ", ".join(
+                        f"{r['ticker']} ({r['motivo']})" for r in asignacion.rechazados
+                    ))
+        
+            if filtered:
+                # Orden del ranking del screener
+                filtered.sort(key=lambda x: ranking[x['ticker']])
+            
+                for i, result in enumerate(filtered):
+                    icon = "🟢" if result['direction'] == "LONG" else "🔻"
+                    color = "green" if result['direction'] == "LONG" else "red"
                 
-                with st.container(border=True):
-                    col_info, col_metrics, col_action = st.columns([2, 2, 1])
+                    with st.container(border=True):
+                        col_info, col_metrics, col_action = st.columns([2, 2, 1])
                     
-                    with col_info:
-                        st.markdown(f"### {icon} {result['ticker']} | {result['tipo']}")
-                        st.caption(f"**Estrategia:** {result['estrategia']}")
-                        st.caption(f"**Precio:** ${result['precio']:.2f}")
+                        with col_info:
+                            st.markdown(f"### {icon} {result['ticker']} | {result['tipo']}")
+                            st.caption(f"**Estrategia:** {result['estrategia']}")
+                            st.caption(f"**Precio:** ${result['precio']:.2f}")
                     
-                    with col_metrics:
-                        if result['es_valida']:
-                            st.markdown(f"""
-                            **📊 Métricas de Riesgo:**
-                            - 📦 Unidades: **{result['units']:.4f}**
-                            - 💵 Inversión: **${result['inversion']:,.2f}**
-                            - 🛡️ Stop Loss: **${result['stop_loss']:.2f}**
-                            - 🎯 Take Profit: **${result['take_profit']:.2f}**
-                            """)
+                        with col_metrics:
+                            if result['es_valida']:
+                                st.markdown(f"""
+                                **📊 Métricas de Riesgo:**
+                                - 📦 Unidades: **{result['units']:.4f}**
+                                - 💵 Inversión: **${result['inversion']:,.2f}**
+                                - 🛡️ Stop Loss: **${result['stop_loss']:.2f}**
+                                - 🎯 Take Profit: **${result['take_profit']:.2f}**
+                                """)
                         
-                        st.caption(f"Sharpe: {result['sharpe']:.2f} | DD: {result['drawdown']:.2%}")
+                            st.caption(f"Sharpe: {result['sharpe']:.2f} | DD: {result['drawdown']:.2%}")
                     
-                    with col_action:
-                        st.write("")
-                        st.write("")
+                        with col_action:
+                            st.write("")
+                            st.write("")
                         
-                        if result['es_valida']:
-                            btn_key = f"save_{result['ticker']}_{i}"
-                            if st.button("💾 Registrar", key=btn_key, type="primary", use_container_width=True):
-                                trade_data = {
-                                    "Fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                                    "Ticker": result['ticker'],
-                                    "Accion": result['direction'],
-                                    "Estrategia": result['estrategia'],
-                                    "Precio_Entrada": round(result['precio'], 2),
-                                    "Unidades": result['units'],
-                                    "Inversion": round(result['inversion'], 2),
-                                    "Stop_Loss": round(result['stop_loss'], 2),
-                                    "Take_Profit": round(result['take_profit'], 2),
-                                    "Status": "ABIERTA",
-                                    "Precio_Salida": 0.0,
-                                    "Resultado": 0.0
-                                }
+                            if result['es_valida']:
+                                btn_key = f"save_{result['ticker']}_{i}"
+                                if st.button("💾 Registrar", key=btn_key, type="primary", use_container_width=True):
+                                    trade_data = {
+                                        "Fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                        "Ticker": result['ticker'],
+                                        "Accion": result['direction'],
+                                        "Estrategia": result['estrategia'],
+                                        "Precio_Entrada": round(result['precio'], 2),
+                                        "Unidades": result['units'],
+                                        "Inversion": round(result['inversion'], 2),
+                                        "Stop_Loss": round(result['stop_loss'], 2),
+                                        "Take_Profit": round(result['take_profit'], 2),
+                                        "Status": "ABIERTA",
+                                        "Precio_Salida": 0.0,
+                                        "Resultado": 0.0
+                                    }
                                 
-                                if guardar_trade(trade_data):
-                                    st.toast(f"✅ {result['ticker']} registrado exitosamente!")
+                                    if guardar_trade(trade_data):
+                                        st.toast(f"✅ {result['ticker']} registrado exitosamente!")
+            else:
+                st.info("🔍 No hay oportunidades que cumplan los filtros seleccionados")
         else:
-            st.info("🔍 No hay oportunidades que cumplan los filtros seleccionados")
-    else:
-        st.info("👆 Presiona 'INICIAR ESCANEO' para comenzar")
+            st.info("👆 Presiona 'ESCANEAR AHORA' o espera al escaneo automático")
 
 with tab2:
     st.subheader("📋 Historial de Trades")
@@ -579,8 +479,8 @@ with tab3:
     
     with col_c2:
         st.markdown("### 🎯 Activos Monitoreados")
-        st.code(", ".join(cfg.TICKERS[:10]) + "...")
-        st.caption(f"Total: {len(cfg.TICKERS)} activos")
+        st.code(", ".join(scheduler.tickers[:10]) + "...")
+        st.caption(f"Total: {len(scheduler.tickers)} activos")
     
     st.markdown("---")
     st.info("💡 **Tip:** Para modificar parámetros, edita el archivo `config.py`")
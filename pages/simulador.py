@@ -7,11 +7,6 @@ import sys
 
 sys.path.append('.') 
 from classes.scout import AssetScout
-# Importamos las clases para reconstruir la historia del ganador
-from classes.strategies import (
-    GoldenCrossStrategy, MeanReversionStrategy, BollingerBreakoutStrategy, 
-    MACDStrategy, EMAStrategy, StochRSIStrategy, AwesomeOscillatorStrategy
-)
 import config as cfg
 
 st.set_page_config(page_title="Simulador Automático", layout="wide", page_icon="🏆")
@@ -28,13 +23,30 @@ ticker = st.sidebar.selectbox("Selecciona el Activo a Optimizar:", cfg.TICKERS)
 capital_inicial = st.sidebar.number_input("Capital Inicial ($)", value=1000)
 
 if st.sidebar.button(f"🚀 BUSCAR MEJOR ESTRATEGIA PARA {ticker}"):
+    st.session_state.sim_ticker = ticker
+    st.session_state.sim_data = None
+    st.session_state.sim_board_key = None
+
+# El resultado se mantiene entre reruns para ir mostrando el refinamiento
+if st.session_state.get('sim_ticker') == ticker:
     
     # 1. El Scout hace el trabajo sucio (Prueba las 7 estrategias x N parámetros)
     with st.spinner(f"⚡ La IA está simulando miles de días de trading para {ticker}..."):
-        scout = AssetScout(ticker)
-        winner = scout.optimize() # Devuelve el diccionario del ganador
+        if st.session_state.get('sim_data') is None:
+            st.session_state.sim_data = AssetScout(ticker).data
+        scout = AssetScout(ticker, data=st.session_state.sim_data)
+        # Devuelve el mejor resultado dentro del deadline; el resto sigue en segundo plano
+        progress = scout.optimize_anytime()
+        winner = progress["winner"]
         df_data = scout.data      # Los datos históricos descargados
 
+    if not progress["done"]:
+        st.info(
+            f"⏳ Resultado parcial: {progress['evaluated']}/{progress['total']} combinaciones "
+            f"({progress['completeness']:.0%}). El torneo sigue en segundo plano."
+        )
+        st.button("🔄 Actualizar resultado")
+
     if winner and not df_data.empty:
         # Extraemos los datos del campeón
         strat_name = winner['Estrategia']
@@ -55,22 +67,24 @@ if st.sidebar.button(f"🚀 BUSCAR MEJOR ESTRATEGIA PARA {ticker}"):
         st.markdown(f"**⚙️ Configuración Maestra:** `{best_params}`")
         st.markdown("---")
 
-        # --- RECONSTRUCCIÓN VISUAL ---
-        # El Scout nos dice QUIEN ganó, pero para graficar la curva día a día,
-        # necesitamos volver a ejecutar esa estrategia específica con los parámetros ganadores.
-        
-        strat_obj = None
-        if "Golden Cross" in strat_name: strat_obj = GoldenCrossStrategy()
-        elif "Mean Reversion" in strat_name: strat_obj = MeanReversionStrategy()
-        elif "Bollinger" in strat_name: strat_obj = BollingerBreakoutStrategy()
-        elif "MACD" in strat_name: strat_obj = MACDStrategy()
-        elif "EMA" in strat_name: strat_obj = EMAStrategy()
-        elif "Stochastic" in strat_name: strat_obj = StochRSIStrategy()
-        elif "Awesome" in strat_name: strat_obj = AwesomeOscillatorStrategy()
+        if not progress["done"]:
+            st.caption("📊 La curva de capital y la clasificación completa aparecerán al terminar el torneo.")
+            st.stop()
+
+        # --- TORNEO COMPLETO ---
+        # El torneo reutiliza las señales que dejó la optimización (solo se
+        # generan las que falten); la curva del ganador sale de esa misma matriz
+        board_key = (ticker, strat_name, repr(best_params))
+        if st.session_state.get('sim_board_key') != board_key:
+            st.session_state.sim_board = scout.tournament(include=[(strat_name, best_params)])
+            st.session_state.sim_equity = scout.equity_curve(strat_name, best_params)
+            st.session_state.sim_board_key = board_key
+        board = st.session_state.sim_board
         
-        # Corremos el backtest detallado solo del ganador
-        detailed_metrics = strat_obj.backtest(df_data, best_params)
-        equity_curve = detailed_metrics['equity_curve'] * capital_inicial # Escalamos al capital
+        if st.session_state.sim_equity is None:
+            st.error(f"⚠️ No se pudieron generar las señales de {strat_name}")
+            st.stop()
+        equity_curve = st.session_state.sim_equity * capital_inicial # Escalamos al capital
         
         # --- GRÁFICO DE CURVA DE CAPITAL ---
         st.subheader(f"📈 Crecimiento de tu Inversión ({strat_name})")
@@ -108,6 +122,27 @@ if st.sidebar.button(f"🚀 BUSCAR MEJOR ESTRATEGIA PARA {ticker}"):
         )
         st.plotly_chart(fig, use_container_width=True)
         
+        # --- CLASIFICACIÓN ---
+        st.subheader("🏅 Clasificación del Torneo")
+        st.caption("Todas las combinaciones evaluadas. Las que superan el drawdown admitido quedan al final.")
+        
+        df_board = board.copy()
+        df_board["Params"] = df_board["Params"].astype(str)
+        df_board["Retorno"] = df_board["Retorno"] * 100
+        df_board["Drawdown"] = df_board["Drawdown"] * 100
+        df_board["Equity"] = [[v * capital_inicial for v in curve] for curve in df_board["Equity"]]
+        st.dataframe(
+            df_board,
+            column_config={
+                "Retorno": st.column_config.NumberColumn("Retorno (%)", format="%.1f"),
+                "Sharpe": st.column_config.NumberColumn(format="%.2f"),
+                "Drawdown": st.column_config.NumberColumn("Drawdown (%)", format="%.1f"),
+                "Score": st.column_config.NumberColumn(format="%.3f"),
+                "Equity": st.column_config.LineChartColumn("Curva de Capital")
+            },
+            use_container_width=True, hide_index=True
+        )
+        
         # --- ANÁLISIS DEL MENTOR ---
         st.info(f"""
         🧠 **Análisis Automático:**
@@ -1,9 +1,12 @@
 # research_lab.py
 import pandas as pd
 import sys
+import argparse
+from typing import List, Optional
 # Truco para que encuentre las clases
 sys.path.append('.') 
-from classes.scout import AssetScout
+from classes.research import run_research, CHECKPOINT_FILE
+from classes.universe import Universe
 
 # 1. DEFINIR EL UNIVERSO DE ACTIVOS
 # Mezclamos Tech, Defensivas, Crypto y ETFs para ver diferencias
@@ -14,35 +17,66 @@ UNIVERSE = [
     "BTC-USD", "ETH-USD"         # Crypto
 ]
 
-def run_lab():
+def run_lab(universe: List[str] = UNIVERSE, resume: bool = True, workers: Optional[int] = None):
     print("🧪 --- INICIANDO LABORATORIO QUANT --- 🧪")
     print("Objetivo: Clasificar activos por su mejor estrategia matemática.")
+    print(f"Checkpoint: '{CHECKPOINT_FILE}' ({'reanudando' if resume else 'desde cero'})")
     print("-" * 60)
     
-    results = []
-    
-    for ticker in UNIVERSE:
-        # Instanciamos el Scout (Objeto)
-        scout = AssetScout(ticker)
-        
-        # Ejecutamos la optimización
-        winner = scout.optimize()
-        
+    def report(ticker, winner, progress):
         if winner:
-            results.append(winner)
-            print(f"🏆 Ganador para {ticker}: {winner['Estrategia Ganadora']} ({winner['Retorno 5y']})")
-            print(f"   ⚙️ Config: {winner['Mejores Parametros']}")
-            print("-" * 30)
+            print(f"🏆 Ganador para {ticker}: {winner['Estrategia']} ({winner['Retorno']:.2%})")
+            print(f"   ⚙️ Config: {winner['Params']}")
+        else:
+            print(f"⚠️ {ticker}: sin ganador")
+        print(f"   ⏱️ {progress.summary()}")
+        print("-" * 30)
+    
+    # Bloques (ticker, estrategia) en procesos; cada combinación evaluada queda en el checkpoint
+    df_results = run_research(universe, resume=resume, max_workers=workers, on_progress=report)
+    
+    for ticker, error in df_results.attrs.get("errors", {}).items():
+        print(f"❌ {ticker}: {error} (se reintentará al reanudar)")
+    
+    if df_results.empty:
+        print("⚠️ Sin resultados")
+        return
 
     # 2. GENERAR REPORTE FINAL
-    df_results = pd.DataFrame(results)
-    
     print("\n\n📑 --- REPORTE DE CLASIFICACIÓN FINAL ---")
-    print(df_results.sort_values(by="Estrategia Ganadora"))
+    print(df_results.sort_values(by="Estrategia"))
     
     # Guardar en CSV para que el bot lo use luego
     df_results.to_csv("data/optimized_portfolio.csv", index=False)
     print("\n✅ Configuración optimizada guardada en 'data/optimized_portfolio.csv'")
 
+def run_walk_forward_lab(universe: List[str] = UNIVERSE):
+    from classes.walk_forward import run_walk_forward
+
+    print("🧪 --- WALK-FORWARD (FUERA DE MUESTRA) --- 🧪")
+    print("Ventanas: 1 año de entrenamiento / 1 trimestre de test")
+    print("-" * 60)
+
+    df_wf = run_walk_forward(universe, period="5y")
+    if df_wf.empty:
+        print("⚠️ Sin resultados")
+        return
+
+    print(df_wf[["Ticker", "Estrategia", "Folds", "Retorno_OOS", "Sharpe_OOS", "Drawdown_OOS", "Score_OOS"]])
+
+    df_wf.to_csv("data/walk_forward_results.csv", index=False)
+    print("\n✅ Resultados walk-forward guardados en 'data/walk_forward_results.csv'")
+
 if __name__ == "__main__":
-    run_lab()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Laboratorio quant")
+    parser.add_argument("--walk-forward", action="store_true", help="Validación walk-forward")
+    parser.add_argument("--fresh", action="store_true", help="Descartar el checkpoint y empezar de cero")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo")
+    parser.add_argument("--universe", help="Fichero de universo (txt, CSV o JSON) en lugar de UNIVERSE")
+    args = parser.parse_args()
+    
+    universe = Universe.from_file(args.universe).symbols if args.universe else UNIVERSE
+    if args.walk_forward:
+        run_walk_forward_lab(universe)
+    else:
+        run_lab(universe, resume=not args.fresh, workers=args.workers)
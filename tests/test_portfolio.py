@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+import config as cfg
+from classes.portfolio import PortfolioAllocator, RollingCovariance
+
+
+def _candidate(ticker, direction, units=10.0, precio=100.0, stop_loss=95.0):
+    # Riesgo por candidato: |100 - 95| * 10 = 50 $
+    return {
+        'ticker': ticker, 'direction': direction, 'units': units,
+        'precio': precio, 'stop_loss': stop_loss, 'sharpe': 1.0
+    }
+
+
+def _allocator():
+    # Presupuesto de riesgo: 1000 * 0.08 = 80 $
+    return PortfolioAllocator(
+        cfg.RiskConfig(capital_total=1000, max_riesgo_portafolio=0.08, max_posiciones_simultaneas=5),
+        min_fraccion=0.25
+    )
+
+
+def test_long_short_sin_covarianza_no_se_compensan():
+    result = _allocator().allocate([_candidate("AAA", "LONG"), _candidate("BBB", "SHORT")])
+
+    assert result.heat_total <= result.presupuesto_riesgo + 1e-6
+    riesgo = sum(c['riesgo_usd'] for c in result.seleccionados)
+    assert riesgo <= result.presupuesto_riesgo + 1e-6
+    # El segundo solo cabe recortado (30 de 50 $)
+    assert result.seleccionados[1]['fraccion_asignada'] < 1.0
+
+
+def test_long_short_con_tickers_desconocidos_en_la_covarianza():
+    retornos = pd.DataFrame(np.random.default_rng(0).normal(0, 0.01, (60, 2)), columns=["XXX", "YYY"])
+    covariance = RollingCovariance.from_returns(retornos, window=60)
+
+    result = _allocator().allocate(
+        [_candidate("AAA", "LONG"), _candidate("BBB", "SHORT")],
+        covariance=covariance
+    )
+
+    assert result.heat_total <= result.presupuesto_riesgo + 1e-6
+    assert sum(c['riesgo_usd'] for c in result.seleccionados) <= result.presupuesto_riesgo + 1e-6
+
+
+def test_cobertura_con_correlacion_conocida():
+    base = np.random.default_rng(1).normal(0, 0.01, 60)
+    retornos = pd.DataFrame({"AAA": base, "BBB": base})
+    covariance = RollingCovariance.from_returns(retornos, window=60)
+
+    result = _allocator().allocate(
+        [_candidate("AAA", "LONG"), _candidate("BBB", "SHORT")],
+        covariance=covariance
+    )
+
+    # Correlación 1 medida: el SHORT cubre al LONG y ambos entran completos
+    assert [c['fraccion_asignada'] for c in result.seleccionados] == [1.0, 1.0]
+    assert result.heat_total < 1e-3
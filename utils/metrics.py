@@ -0,0 +1,367 @@
+# utils/metrics.py - MÉTRICAS OPERATIVAS (FORMATO PROMETHEUS)
+import concurrent.futures
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import config as cfg
+from utils.telemetry import BUCKETS, TELEMETRY, Histogram, get_logger
+
+"""
+Registro de métricas del proceso para monitorizar el escáner:
+1. Counter / Gauge / Histograma con etiquetas (thread-safe)
+2. Métricas de descargas (ok/error/throttled), caches (hit/miss), latencia
+   de escaneos y etapas, evaluaciones del grid search y saturación de pools
+3. Exposición en texto Prometheus por HTTP local (APP.metrics_port, ruta
+   /metrics) y en fichero periódico PATHS.LOGS_DIR/metrics.prom (formato del
+   textfile collector de node_exporter)
+4. Las duraciones de escaneo y etapa llegan desde utils.telemetry (suscripción)
+"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_FILE = cfg.PATHS.LOGS_DIR / "metrics.prom"
+
+logger = get_logger("metrics")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ============================================
+# TIPOS DE MÉTRICA
+# ============================================
+
+class Metric:
+    """Familia de métricas con etiquetas (un valor por combinación)"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, object] = {}
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class HistogramMetric(Metric):
+    """Histograma Prometheus sobre utils.telemetry.Histogram (buckets acumulados al exportar)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            hist = self._values.get(key)
+            if hist is None:
+                hist = self._values[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labels, hist in sorted(self._values.items(), key=lambda kv: kv[0]):
+                cumulative = 0
+                for upper, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    le = ("le", _format_value(upper))
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(hist.sum)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines)
+
+
+# ============================================
+# REGISTRO
+# ============================================
+
+class Registry:
+    """Métricas del proceso, en orden de registro"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrica '{name}' ya registrada como {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = BUCKETS) -> HistogramMetric:
+        return self._get_or_create(HistogramMetric, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        """Exposición en formato de texto Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# Datos
+FETCHES = REGISTRY.counter("tradexpert_data_fetches_total", "Descargas de datos por origen y resultado")
+THROTTLES = REGISTRY.counter("tradexpert_data_throttles_total", "Descargas rechazadas por límite de peticiones")
+FETCH_SECONDS = REGISTRY.histogram("tradexpert_data_fetch_seconds", "Latencia de las descargas de datos")
+
+# Caches (st.cache_data, configuración guardada, indicadores, retornos del torneo...)
+CACHE_REQUESTS = REGISTRY.counter("tradexpert_cache_requests_total", "Consultas a caches por resultado (hit/miss)")
+
+# Escaneos
+SCAN_SECONDS = REGISTRY.histogram("tradexpert_scan_duration_seconds", "Duración de escaneos completos")
+STAGE_SECONDS = REGISTRY.histogram("tradexpert_stage_duration_seconds", "Duración de cada etapa instrumentada")
+SCAN_ERRORS = REGISTRY.counter("tradexpert_scan_errors_total", "Tickers con error durante un escaneo")
+
+# Optimización
+EVALUATIONS = REGISTRY.counter("tradexpert_grid_evaluations_total", "Backtests de candidatos del grid por resultado")
+EVALUATIONS_PER_SECOND = REGISTRY.gauge("tradexpert_grid_evaluations_per_second", "Ritmo del último grid search")
+
+# Pools de hilos
+POOL_WORKERS = REGISTRY.gauge("tradexpert_pool_workers", "Hilos máximos del pool")
+POOL_ACTIVE = REGISTRY.gauge("tradexpert_pool_active_tasks", "Tareas en ejecución")
+POOL_QUEUED = REGISTRY.gauge("tradexpert_pool_queued_tasks", "Tareas enviadas aún sin hilo libre")
+POOL_TASKS = REGISTRY.counter("tradexpert_pool_tasks_total", "Tareas completadas por pool")
+
+
+def _on_telemetry(kind: str, name: str, seconds: float):
+    if kind == "stage":
+        STAGE_SECONDS.observe(seconds, stage=name)
+    elif kind == "scan":
+        SCAN_SECONDS.observe(seconds, scan=name)
+    elif kind == "error":
+        SCAN_ERRORS.inc()
+
+
+TELEMETRY.subscribe(_on_telemetry)
+
+
+# ============================================
+# INSTRUMENTACIÓN
+# ============================================
+
+def is_throttle(error: Exception) -> bool:
+    """Errores de límite de peticiones (yfinance YFRateLimitError / HTTP 429)"""
+    text = f"{type(error).__name__} {error}"
+    return "RateLimit" in text or "429" in text or "Too Many Requests" in text
+
+
+@contextmanager
+def track_fetch(source: str) -> Iterator[None]:
+    """Cuenta y cronometra una descarga; las excepciones se propagan"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        if is_throttle(e):
+            THROTTLES.inc(source=source)
+            FETCHES.inc(source=source, result="throttled")
+        else:
+            FETCHES.inc(source=source, result="error")
+        raise
+    else:
+        FETCHES.inc(source=source, result="ok")
+    finally:
+        FETCH_SECONDS.observe(time.perf_counter() - t0, source=source)
+
+
+def cache_hit(cache: str):
+    CACHE_REQUESTS.inc(cache=cache, result="hit")
+
+
+def cache_miss(cache: str):
+    CACHE_REQUESTS.inc(cache=cache, result="miss")
+
+
+_local = threading.local()
+
+
+def mark_cache_miss():
+    """Llamar dentro de una función @st.cache_data: solo se ejecuta en un fallo"""
+    _local.miss = True
+
+
+def track_st_cache(cache: str) -> Callable:
+    """
+    Decorador (por fuera de @st.cache_data) que cuenta aciertos y fallos;
+    la función cacheada debe llamar a mark_cache_miss().
+    """
+    def decorator(cached_fn: Callable) -> Callable:
+        @functools.wraps(cached_fn)
+        def wrapper(*args, **kwargs):
+            _local.miss = False
+            result = cached_fn(*args, **kwargs)
+            (cache_miss if _local.miss else cache_hit)(cache)
+            return result
+
+        if hasattr(cached_fn, "clear"):
+            wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorator
+
+
+class MonitoredThreadPool(concurrent.futures.ThreadPoolExecutor):
+    """ThreadPoolExecutor que publica hilos, tareas activas y en cola"""
+
+    def __init__(self, pool: str, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(max_workers=max_workers, **kwargs)
+        self.pool = pool
+        POOL_WORKERS.set(self._max_workers, pool=pool)
+
+    def submit(self, fn, /, *args, **kwargs):
+        POOL_QUEUED.inc(pool=self.pool)
+
+        def task():
+            POOL_QUEUED.dec(pool=self.pool)
+            POOL_ACTIVE.inc(pool=self.pool)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                POOL_ACTIVE.dec(pool=self.pool)
+                POOL_TASKS.inc(pool=self.pool)
+
+        return super().submit(task)
+
+
+# ============================================
+# EXPORTACIÓN
+# ============================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics %s", format % args)
+
+
+_exporter_lock = threading.Lock()
+_http_server: Optional[ThreadingHTTPServer] = None
+_http_failed = False
+_file_thread: Optional[threading.Thread] = None
+
+
+def write_metrics_file(path=METRICS_FILE):
+    """Escritura atómica (tmp + rename) para que el lector nunca vea medio fichero"""
+    tmp = path.with_suffix(".prom.tmp")
+    tmp.write_text(REGISTRY.render(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _file_loop(interval: float):
+    while True:
+        try:
+            write_metrics_file()
+        except OSError as e:
+            logger.warning("No se pudo escribir %s: %s", METRICS_FILE, e)
+        time.sleep(interval)
+
+
+def start_exporter(port: Optional[int] = None, file_interval: Optional[float] = None):
+    """
+    Arranca (una vez por proceso) el endpoint HTTP en 127.0.0.1:port y el
+    volcado periódico a METRICS_FILE. 0 desactiva cada salida.
+    """
+    global _http_server, _http_failed, _file_thread
+    port = cfg.APP.metrics_port if port is None else port
+    file_interval = cfg.APP.metrics_file_interval_s if file_interval is None else file_interval
+
+    with _exporter_lock:
+        if port and _http_server is None and not _http_failed:
+            try:
+                _http_server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+                threading.Thread(target=_http_server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info("Métricas en http://127.0.0.1:%d/metrics", port)
+            except OSError as e:
+                # Puerto ocupado (otro proceso de la app): queda el fichero
+                logger.warning("No se pudo abrir el puerto de métricas %d: %s", port, e)
+                _http_failed = True
+        if file_interval and _file_thread is None:
+            _file_thread = threading.Thread(target=_file_loop, args=(file_interval,), name="metrics-file", daemon=True)
+            _file_thread.start()
+
+
+def exporter_url() -> Optional[str]:
+    if _http_server is None:
+        return None
+    return f"http://127.0.0.1:{_http_server.server_address[1]}/metrics"
@@ -0,0 +1,258 @@
+# utils/profiler.py - CAPTURA DE PERFILES BAJO DEMANDA (CPU / MEMORIA)
+import csv
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import config as cfg
+from utils.telemetry import get_logger
+
+"""
+Perfilado de una ejecución concreta sin tocar código ni adjuntar depurador:
+1. Modo "cpu": muestreo periódico de las pilas (sys._current_frames) del hilo
+   que lanza la ejecución y de los hilos creados durante ella (workers)
+2. Modo "mem": tracemalloc durante la ejecución y snapshot al final
+3. Salida en PATHS.LOGS_DIR/profiles: pilas colapsadas (formato de
+   flamegraph.pl / speedscope) y tabla top-N de funciones (CSV)
+4. Activación: variable de entorno TRADEXPERT_PROFILE=cpu|mem (todas las
+   ejecuciones) o arm() desde la página de Diagnóstico (solo la siguiente)
+
+Las ejecuciones instrumentadas son escaneos ("scan"), optimizaciones
+("optimize") y renders de página ("render").
+"""
+
+PROFILE_ENV = "TRADEXPERT_PROFILE"
+PROFILES_DIR = cfg.PATHS.LOGS_DIR / "profiles"
+MODES = ("cpu", "mem")
+TARGETS = ("scan", "optimize", "render")
+
+SAMPLE_INTERVAL = 0.005   # 5 ms entre muestras
+MAX_DEPTH = 128           # Profundidad máxima de pila muestreada
+TOP_N = 50
+TRACEMALLOC_FRAMES = 25
+
+logger = get_logger("profiler")
+
+
+# ============================================
+# ACTIVACIÓN
+# ============================================
+
+_lock = threading.Lock()
+_armed: Dict[str, str] = {}   # target -> modo (captura única)
+_running = False              # Un solo perfil a la vez
+
+
+def arm(mode: str, target: str):
+    """Perfila la siguiente ejecución de `target` en modo `mode`"""
+    if mode not in MODES or target not in TARGETS:
+        raise ValueError(f"Modo/objetivo no válido: {mode}/{target}")
+    with _lock:
+        _armed[target] = mode
+
+
+def disarm(target: Optional[str] = None):
+    with _lock:
+        if target is None:
+            _armed.clear()
+        else:
+            _armed.pop(target, None)
+
+
+def armed() -> Dict[str, str]:
+    with _lock:
+        return dict(_armed)
+
+
+def _requested_mode(target: str) -> Optional[str]:
+    """Modo a usar para esta ejecución (consume la captura armada)"""
+    env = os.environ.get(PROFILE_ENV, "").strip().lower()
+    with _lock:
+        mode = _armed.pop(target, None)
+    if mode:
+        return mode
+    return env if env in MODES else None
+
+
+# ============================================
+# MUESTREO DE PILAS (CPU)
+# ============================================
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Muestrea en un hilo aparte las pilas de los hilos observados"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._owner = threading.get_ident()
+        self._ignored: set = set()
+
+    def start(self):
+        # Se ignoran los hilos previos (servidor de Streamlit, etc.) salvo el que perfila
+        self._ignored = set(sys._current_frames()) - {self._owner}
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == own or tid in self._ignored:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                if tid not in names:
+                    names[tid] = next((t.name for t in threading.enumerate() if t.ident == tid), str(tid))
+                stack.append(names[tid])
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top(self, n: int = TOP_N) -> List[Dict]:
+        """Funciones con más muestras propias (self) e inclusivas (total)"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]   # Sin el nombre del hilo
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        n_total = sum(self.stacks.values()) or 1
+        return [
+            {"function": name, "self": own[name], "self_pct": 100 * own[name] / n_total,
+             "total": total[name], "total_pct": 100 * total[name] / n_total}
+            for name, _ in own.most_common(n)
+        ]
+
+
+# ============================================
+# CAPTURA
+# ============================================
+
+def _write_collapsed(path: Path, stacks: Dict[str, int]):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, weight in sorted(stacks.items()):
+            if weight > 0:
+                f.write(f"{stack} {weight}\n")
+
+
+def _write_top(path: Path, rows: List[Dict]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if not rows:
+            return
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _memory_report(snapshot: tracemalloc.Snapshot, n: int = TOP_N):
+    """Pilas colapsadas ponderadas por KB y top-N de líneas que más reservan"""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    stacks: Counter = Counter()
+    for stat in snapshot.statistics("traceback"):
+        frames = [f"{Path(fr.filename).name}:{fr.lineno}" for fr in stat.traceback]
+        stacks[";".join(reversed(frames))] += max(stat.size // 1024, 1)
+
+    total_kb = sum(stat.size for stat in snapshot.statistics("filename")) / 1024 or 1
+    top = [
+        {"line": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+         "size_kb": stat.size / 1024, "size_pct": 100 * stat.size / 1024 / total_kb, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:n]
+    ]
+    return stacks, top
+
+
+@contextmanager
+def profile(target: str, label: str = "") -> Iterator[Optional[Path]]:
+    """
+    Perfila el bloque si hay captura armada para `target` o TRADEXPERT_PROFILE
+    está definida; si no, no hace nada (coste: una consulta al entorno).
+    Devuelve el prefijo de los ficheros generados (o None).
+    """
+    global _running
+    mode = _requested_mode(target)
+    with _lock:
+        if mode and _running:
+            # Ejecuciones anidadas o concurrentes: solo se perfila la exterior
+            mode = None
+        if mode:
+            _running = True
+    if not mode:
+        yield None
+        return
+
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    prefix = PROFILES_DIR / f"{stamp}_{target}{'_' + label if label else ''}_{mode}"
+
+    sampler = StackSampler() if mode == "cpu" else None
+    started_tracemalloc = False
+    if sampler:
+        sampler.start()
+    elif not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        started_tracemalloc = True
+
+    t0 = time.perf_counter()
+    try:
+        yield prefix
+    finally:
+        elapsed = time.perf_counter() - t0
+        try:
+            if sampler:
+                sampler.stop()
+                _write_collapsed(prefix.with_suffix(".collapsed"), sampler.stacks)
+                _write_top(Path(f"{prefix}_top.csv"), sampler.top())
+                logger.info("Perfil CPU %s: %.2fs, %d muestras -> %s", target, elapsed, sampler.samples, prefix)
+            else:
+                peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+                stacks, top = _memory_report(tracemalloc.take_snapshot())
+                if started_tracemalloc:
+                    tracemalloc.stop()
+                _write_collapsed(prefix.with_suffix(".collapsed"), stacks)
+                _write_top(Path(f"{prefix}_top.csv"), top)
+                logger.info("Perfil memoria %s: %.2fs, pico %.1f MB -> %s", target, elapsed, peak_mb, prefix)
+        except OSError as e:
+            logger.warning("No se pudo guardar el perfil %s: %s", prefix, e)
+        finally:
+            with _lock:
+                _running = False
+
+
+def list_profiles() -> List[Dict]:
+    """Perfiles guardados (más reciente primero)"""
+    if not PROFILES_DIR.exists():
+        return []
+    profiles = []
+    for collapsed in sorted(PROFILES_DIR.glob("*.collapsed"), reverse=True):
+        top = Path(f"{collapsed.with_suffix('')}_top.csv")
+        profiles.append({
+            "name": collapsed.stem,
+            "collapsed": collapsed,
+            "top": top if top.exists() else None,
+            "size_kb": collapsed.stat().st_size / 1024
+        })
+    return profiles
@@ -0,0 +1,266 @@
+# utils/telemetry.py - INSTRUMENTACIÓN POR ETAPAS (SPANS + HISTOGRAMAS)
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import config as cfg
+
+"""
+Telemetría ligera y siempre activa:
+1. span(etapa, ticker): mide una etapa (descarga, grid search, señales,
+   riesgo, render...) con perf_counter; coste ~microsegundos
+2. Histogramas por etapa con buckets fijos (count, sum, min, max, cuantiles)
+3. scan(nombre, tickers): agrupa los spans de un escaneo (de cualquier hilo)
+   con duración por ticker y por etapa; se guardan los últimos N
+4. Exportación JSONL de cada escaneo en PATHS.LOGS_DIR (APP.log_to_file)
+   y logging con APP.log_level
+"""
+
+# Límites superiores de los buckets (segundos); el último es +inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+TELEMETRY_FILE = cfg.PATHS.LOGS_DIR / "telemetry.jsonl"
+MAX_SCANS = 20
+
+
+# ============================================
+# LOGGING
+# ============================================
+
+_LOGGING_CONFIGURED = False
+
+
+def get_logger(name: str = "tradexpert") -> logging.Logger:
+    """Logger de la app con APP.log_level y, si APP.log_to_file, fichero en LOGS_DIR"""
+    global _LOGGING_CONFIGURED
+    root = logging.getLogger("tradexpert")
+    if not _LOGGING_CONFIGURED:
+        root.setLevel(getattr(logging, cfg.APP.log_level.upper(), logging.INFO))
+        formatter = logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+        handler: logging.Handler = logging.StreamHandler()
+        if cfg.APP.log_to_file:
+            handler = logging.FileHandler(cfg.PATHS.LOGS_DIR / "tradexpert.log", encoding="utf-8")
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+        root.propagate = False
+        _LOGGING_CONFIGURED = True
+    return root if name == "tradexpert" else root.getChild(name)
+
+
+logger = get_logger("telemetry")
+
+
+# ============================================
+# HISTOGRAMA
+# ============================================
+
+class Histogram:
+    """Histograma acumulativo de duraciones con buckets fijos"""
+
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Cuantil estimado por interpolación lineal dentro del bucket"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, n in zip(self.buckets, self.counts):
+            if n and seen + n >= target:
+                lo, hi = max(lower, self.min), min(upper, self.max)
+                return lo + (hi - lo) * (target - seen) / n
+            seen += n
+            lower = upper
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_s": self.sum,
+            "mean_s": self.sum / self.count if self.count else 0.0,
+            "p50_s": self.quantile(0.50),
+            "p95_s": self.quantile(0.95),
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max
+        }
+
+
+# ============================================
+# TELEMETRÍA
+# ============================================
+
+class ScanRecord:
+    """Spans de un escaneo agregados por etapa y por ticker"""
+
+    def __init__(self, name: str, tickers: Optional[List[str]] = None):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.tickers = list(tickers or [])
+        self.started = datetime.now()
+        self.duration = 0.0
+        self.stages: Dict[str, Histogram] = {}
+        self.per_ticker: Dict[str, Dict[str, float]] = {}
+        self.errors: List[str] = []
+
+    def add(self, stage: str, seconds: float, ticker: Optional[str]):
+        self.stages.setdefault(stage, Histogram()).observe(seconds)
+        if ticker:
+            stages = self.per_ticker.setdefault(ticker, {})
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "duration_s": self.duration,
+            "tickers": len(self.tickers) or len(self.per_ticker),
+            "errors": self.errors,
+            "stages": {stage: h.summary() for stage, h in self.stages.items()},
+            "per_ticker": self.per_ticker
+        }
+
+
+class Telemetry:
+    """Registro de spans del proceso (compartido entre hilos y páginas)"""
+
+    def __init__(self, max_scans: int = MAX_SCANS):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.scans: deque = deque(maxlen=max_scans)
+        self._active: Optional[ScanRecord] = None
+        self._listeners: List[Callable[[str, str, float], None]] = []
+
+    def subscribe(self, listener: Callable[[str, str, float], None]):
+        """listener(tipo, nombre, segundos) con tipo "stage", "scan" o "error" (p.ej. utils.metrics)"""
+        self._listeners.append(listener)
+
+    def _notify(self, kind: str, name: str, seconds: float):
+        for listener in self._listeners:
+            try:
+                listener(kind, name, seconds)
+            except Exception as e:
+                logger.debug("listener de telemetría falló: %s", e)
+
+    def record(self, stage: str, seconds: float, ticker: Optional[str] = None):
+        with self._lock:
+            self.histograms.setdefault(stage, Histogram()).observe(seconds)
+            if self._active is not None:
+                self._active.add(stage, seconds, ticker)
+        self._notify("stage", stage, seconds)
+        logger.debug("%s %s %.4fs", stage, ticker or "", seconds)
+
+    @contextmanager
+    def span(self, stage: str, ticker: Optional[str] = None) -> Iterator[None]:
+        """Mide el bloque y lo registra en la etapa (también si lanza excepción)"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0, ticker)
+
+    @contextmanager
+    def scan(self, name: str, tickers: Optional[List[str]] = None) -> Iterator[ScanRecord]:
+        """
+        Agrupa los spans de un escaneo. Los spans de los hilos worker se
+        asignan al escaneo activo; si ya hay uno (escaneo anidado), se
+        reutiliza el exterior.
+        """
+        with self._lock:
+            nested = self._active is not None
+            if not nested:
+                self._active = ScanRecord(name, tickers)
+            record = self._active
+
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            if not nested:
+                record.duration = time.perf_counter() - t0
+                with self._lock:
+                    self._active = None
+                    self.scans.append(record)
+                    self.histograms.setdefault(f"scan:{name}", Histogram()).observe(record.duration)
+                self._notify("scan", name, record.duration)
+                self._export(record)
+
+    def error(self, ticker: str, message: str):
+        with self._lock:
+            if self._active is not None:
+                self._active.errors.append(f"{ticker}: {message}")
+        self._notify("error", ticker, 0.0)
+        logger.warning("%s: %s", ticker, message)
+
+    def _export(self, record: ScanRecord):
+        data = record.to_dict()
+        logger.info("scan %s (%s): %.2fs, %d tickers", record.name, record.id, record.duration, data["tickers"])
+        if not cfg.APP.log_to_file:
+            return
+        try:
+            with open(TELEMETRY_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(data) + "\n")
+        except OSError as e:
+            logger.warning("No se pudo escribir %s: %s", TELEMETRY_FILE, e)
+
+    # ----------------------------------------
+    # Consultas
+    # ----------------------------------------
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {stage: h.summary() for stage, h in self.histograms.items()}
+
+    def recent_scans(self) -> List[Dict]:
+        """Últimos escaneos del proceso (más reciente primero)"""
+        with self._lock:
+            return [r.to_dict() for r in reversed(self.scans)]
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.scans.clear()
+
+
+def load_scans(n: int = MAX_SCANS) -> List[Dict]:
+    """Últimos n escaneos exportados en JSONL (más reciente primero)"""
+    if not TELEMETRY_FILE.exists():
+        return []
+    with open(TELEMETRY_FILE, encoding="utf-8") as f:
+        lines = deque(f, maxlen=n)
+    scans = []
+    for line in reversed(lines):
+        try:
+            scans.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return scans
+
+
+# Instancia del proceso
+TELEMETRY = Telemetry()
+span = TELEMETRY.span
+scan = TELEMETRY.scan